@@ -0,0 +1,41 @@
+import functools
+import os
+from typing import Optional
+
+# Prompt-cache checkpoints on the agents' static prefix (tools, system prompt) and
+# conversation so far, so later turns of an agent loop read it from the cache
+BEDROCK_PROMPT_CACHING = os.getenv("BEDROCK_PROMPT_CACHING", "0") == "1"
+
+
+@functools.lru_cache(maxsize=None)
+def get_bedrock_model(
+    model_id: str,
+    region_name: str,
+    temperature: Optional[float] = None,
+    prompt_caching: bool = BEDROCK_PROMPT_CACHING,
+):
+    """
+    Return the shared Strands BedrockModel for a configuration, built on first use.
+
+    strands is imported here rather than at module level so that importing the worker
+    stays fast; agents built from the same configuration share one model and client.
+    The model is rate limited together with every other Bedrock call in the process.
+    """
+    from .bedrock_client import get_bedrock_runtime_client
+    from .rate_limited_model import RateLimitedBedrockModel
+
+    cache_options = {}
+    if prompt_caching:
+        from strands.models import CacheConfig
+
+        cache_options["cache_config"] = CacheConfig(strategy="auto", tools_ttl=True)
+
+    model = RateLimitedBedrockModel(
+        model_id=model_id,
+        region_name=region_name,
+        temperature=temperature,
+        **cache_options,
+    )
+    # Share the process-wide client and its connection pool with the LLM activities
+    model.client = get_bedrock_runtime_client(region_name)
+    return model
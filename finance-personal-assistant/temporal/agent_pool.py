@@ -0,0 +1,109 @@
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, Optional
+
+from . import telemetry
+
+if TYPE_CHECKING:
+    from strands import Agent
+
+# Agents kept per pool, i.e. the number of concurrent sessions each agent type can serve.
+# Defaults to the worker's agent concurrency so every activity thread can hold an agent.
+AGENT_POOL_SIZE = int(os.getenv("AGENT_POOL_SIZE", os.getenv("AGENT_CONCURRENCY", "16")))
+
+
+class AgentPool:
+    """
+    Bounded pool of Strands agents, checked out by one activity at a time.
+
+    Agents are built on demand up to `size` and reused afterwards. Each agent is
+    reset to a clean state when it is returned, so no conversation history leaks
+    between unrelated requests and per-call context stays constant. Pool sizes are
+    exported as gauges, and checkouts and waits as counters, on the runtime meter.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], "Agent"], size: int = AGENT_POOL_SIZE):
+        self.name = name
+        self.size = size
+        self._factory = factory
+        self._idle: "queue.LifoQueue[Agent]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._in_use = 0
+        self._checkouts = 0
+        self._waits = 0
+
+    @contextmanager
+    def checkout(self, timeout: Optional[float] = None) -> Iterator["Agent"]:
+        """Borrow a clean agent, waiting up to `timeout` seconds if all are in use."""
+        agent = self._acquire(timeout)
+        self._publish()
+        try:
+            yield agent
+        finally:
+            self._reset(agent)
+            with self._lock:
+                self._in_use -= 1
+            self._idle.put(agent)
+            self._publish()
+
+    def resize(self, size: int) -> None:
+        """Change the maximum number of agents the pool builds."""
+        with self._lock:
+            self.size = size
+        self._publish()
+
+    def stats(self) -> Dict[str, int]:
+        """Pool-size metrics."""
+        with self._lock:
+            return {
+                "size": self.size,
+                "created": self._created,
+                "in_use": self._in_use,
+                "idle": self._idle.qsize(),
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+            }
+
+    def _publish(self) -> None:
+        telemetry.record_agent_pool(self.name, self.stats())
+
+    def _acquire(self, timeout: Optional[float]) -> "Agent":
+        build = waited = False
+        with self._lock:
+            self._checkouts += 1
+            self._in_use += 1
+            if self._idle.empty() and self._created < self.size:
+                self._created += 1
+                build = True
+            elif self._idle.empty():
+                self._waits += 1
+                waited = True
+        telemetry.record_agent_checkout(self.name, waited)
+        if build:
+            try:
+                return self._factory()
+            except BaseException:
+                with self._lock:
+                    self._created -= 1
+                    self._in_use -= 1
+                raise
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            with self._lock:
+                self._in_use -= 1
+            raise TimeoutError(f"No {self.name} agent available after {timeout}s")
+
+    @staticmethod
+    def _reset(agent: "Agent") -> None:
+        from strands.agent.state import AgentState
+        from strands.telemetry.metrics import EventLoopMetrics
+
+        agent.messages.clear()
+        agent.state = AgentState()
+        agent.event_loop_metrics = EventLoopMetrics()
+        if hasattr(agent.conversation_manager, "removed_message_count"):
+            agent.conversation_manager.removed_message_count = 0
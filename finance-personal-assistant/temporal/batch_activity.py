@@ -0,0 +1,23 @@
+import asyncio
+import itertools
+import json
+from typing import List
+
+from temporalio import activity
+from .models import BatchPage, BatchPrompt
+
+
+def _read_page(page: BatchPage) -> List[BatchPrompt]:
+    with open(page.path, encoding="utf-8") as f:
+        lines = (line for line in f if line.strip())
+        return [
+            BatchPrompt(**json.loads(line))
+            for line in itertools.islice(lines, page.offset, page.offset + page.limit)
+        ]
+
+
+@activity.defn
+async def load_batch_prompts(page: BatchPage) -> List[BatchPrompt]:
+    """Activity that reads one page of BatchPrompt entries from a JSONL file."""
+    activity.logger.info(f"Loading batch prompts {page.offset}-{page.offset + page.limit} from {page.path}")
+    return await asyncio.to_thread(_read_page, page)
@@ -0,0 +1,97 @@
+import asyncio
+from datetime import timedelta
+from typing import List
+
+from temporalio import workflow
+from temporalio.exceptions import ApplicationError, ChildWorkflowError, WorkflowAlreadyStartedError
+from .models import BatchFailure, BatchInput, BatchPage, BatchPrompt, BatchSummary
+
+# Failures recorded in the summary; the rest are only counted
+MAX_RECORDED_FAILURES = 100
+
+
+@workflow.defn
+class FinancialAssistantBatchWorkflow:
+    """Workflow that fans a batch of prompts out to FinancialAssistantWorkflow children."""
+
+    def __init__(self):
+        self.summary = BatchSummary()
+        self.in_flight = 0
+
+    @workflow.query
+    def get_summary(self) -> BatchSummary:
+        """Query handler to get the summary of the entries processed so far."""
+        return self.summary
+
+    @workflow.run
+    async def run(self, batch: BatchInput) -> BatchSummary:
+        if batch.max_in_flight < 1 or batch.continue_as_new_every < 1:
+            # Either would wait or continue as new forever without running a child
+            raise ApplicationError(
+                f"max_in_flight ({batch.max_in_flight}) and continue_as_new_every"
+                f" ({batch.continue_as_new_every}) must be at least 1",
+                type="InvalidBatchInput",
+                non_retryable=True,
+            )
+        self.summary = batch.summary
+        workflow.logger.info(f"🚀 Batch workflow started at entry {batch.start_index}")
+
+        # Load this run's page of entries
+        if batch.jsonl_path:
+            entries: List[BatchPrompt] = await workflow.execute_activity(
+                "load_batch_prompts",
+                args=[BatchPage(path=batch.jsonl_path, offset=batch.start_index, limit=batch.continue_as_new_every)],
+                start_to_close_timeout=timedelta(seconds=60),
+                result_type=List[BatchPrompt],
+            )
+            has_more = len(entries) == batch.continue_as_new_every
+        else:
+            entries = batch.prompts[:batch.continue_as_new_every]
+            has_more = len(batch.prompts) > batch.continue_as_new_every
+
+        # Fan out with at most max_in_flight children running at once
+        children = []
+        for offset, entry in enumerate(entries):
+            await workflow.wait_condition(lambda: self.in_flight < batch.max_in_flight)
+            self.in_flight += 1
+            children.append(asyncio.create_task(self._run_child(batch.start_index + offset, entry)))
+        await workflow.wait_condition(lambda: self.in_flight == 0)
+        workflow.logger.info(f"✅ Processed batch entries up to {batch.start_index + len(entries)}")
+
+        if has_more:
+            next_batch = batch.model_copy(update={
+                "prompts": batch.prompts[len(entries):],
+                "start_index": batch.start_index + len(entries),
+                "summary": self.summary,
+            })
+            workflow.continue_as_new(next_batch)
+
+        workflow.logger.info("✅ Batch workflow finished")
+        return self.summary
+
+    async def _run_child(self, index: int, entry: BatchPrompt) -> None:
+        """Run one child workflow to completion and record its outcome."""
+        workflow_id = f"{workflow.info().workflow_id}-{entry.id or index}"
+        try:
+            handle = await workflow.start_child_workflow(
+                "FinancialAssistantWorkflow",
+                entry.prompt,
+                id=workflow_id,
+                task_queue=workflow.info().task_queue,
+            )
+            await handle.signal("set_investment_amount", entry.investment_amount)
+            await handle
+            self.summary.succeeded += 1
+        except (ChildWorkflowError, WorkflowAlreadyStartedError) as e:
+            self._record_failure(index, workflow_id, str(e.cause or e))
+        except Exception as e:
+            # Anything else, such as a failed signal, fails this entry rather than the batch
+            self._record_failure(index, workflow_id, f"{type(e).__name__}: {e}")
+        finally:
+            self.summary.total += 1
+            self.in_flight -= 1
+
+    def _record_failure(self, index: int, workflow_id: str, error: str) -> None:
+        self.summary.failed += 1
+        if len(self.summary.failures) < MAX_RECORDED_FAILURES:
+            self.summary.failures.append(BatchFailure(index=index, workflow_id=workflow_id, error=error))
@@ -0,0 +1,77 @@
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Upper bound on concurrent blocking Bedrock calls per worker process
+BEDROCK_MAX_WORKERS = int(os.getenv("BEDROCK_MAX_WORKERS", "32"))
+
+# Alternative bedrock-runtime endpoint, e.g. the local fake in temporal.fake_bedrock
+BEDROCK_ENDPOINT_URL = os.getenv("BEDROCK_ENDPOINT_URL") or None
+
+_clients: Dict[str, Any] = {}
+_clients_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_bedrock_runtime_client(region_name: str) -> Any:
+    """
+    Return the process-wide bedrock-runtime client for a region, creating it on first use.
+
+    boto3 clients are thread-safe once built, but building them through the default
+    session is not, so creation is serialized behind a lock.
+    """
+    client = _clients.get(region_name)
+    if client is None:
+        # boto3 takes a noticeable share of worker start-up, so import it on first use
+        import boto3
+        from botocore.config import Config
+
+        with _clients_lock:
+            client = _clients.get(region_name)
+            if client is None:
+                client = boto3.session.Session().client(
+                    "bedrock-runtime",
+                    region_name=region_name,
+                    endpoint_url=BEDROCK_ENDPOINT_URL,
+                    config=Config(
+                        max_pool_connections=BEDROCK_MAX_WORKERS,
+                        # No retries inside botocore: throttles must reach the rate limiter
+                        # so it backs off, and the Temporal retry policy retries the call
+                        retries={"total_max_attempts": 1, "mode": "standard"},
+                    ),
+                )
+                _clients[region_name] = client
+    return client
+
+
+def set_bedrock_runtime_client(region_name: str, client: Any) -> None:
+    """Install a client for a region (used by benchmarks to swap in stubs)."""
+    with _clients_lock:
+        _clients[region_name] = client
+
+
+def get_bedrock_executor() -> ThreadPoolExecutor:
+    """Return the bounded thread pool that runs blocking Bedrock I/O."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=BEDROCK_MAX_WORKERS,
+                    thread_name_prefix="bedrock",
+                )
+    return _executor
+
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking callable on the Bedrock executor without stalling the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_bedrock_executor(), functools.partial(func, *args, **kwargs)
+    )
@@ -0,0 +1,77 @@
+"""
+Measure invoke_bedrock_model throughput as the number of concurrent activities grows.
+
+Bedrock is replaced by a stub client whose invoke_model blocks for a fixed latency,
+so the numbers reflect how well the activity keeps the worker's event loop free. The
+Bedrock rate limiter is replaced by one with the given limits, by default high enough
+that it never delays a call.
+
+    uv run python -m temporal.benchmarks.bedrock_client_throughput --latency 0.2
+"""
+import argparse
+import asyncio
+import io
+import json
+import time
+
+from temporalio.testing import ActivityEnvironment
+
+from ..bedrock_client import set_bedrock_runtime_client
+from ..llm_activity import invoke_bedrock_model
+from ..models import BedrockInvocationRequest
+from ..rate_limiter import RateLimiter, set_rate_limiter
+
+
+class StubBedrockRuntime:
+    """Blocking stand-in for the bedrock-runtime client."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def invoke_model(self, **kwargs):
+        time.sleep(self.latency)
+        body = {
+            "content": [{"type": "text", "text": "formatted report"}],
+            "usage": {"input_tokens": 300, "output_tokens": 150},
+        }
+        return {"body": io.BytesIO(json.dumps(body).encode())}
+
+
+async def measure(concurrency: int, rounds: int) -> float:
+    """Return completed invocations per second at the given concurrency."""
+    env = ActivityEnvironment()
+    request = BedrockInvocationRequest(prompt="Format this report")
+    started = time.perf_counter()
+    for _ in range(rounds):
+        await asyncio.gather(
+            *(env.run(invoke_bedrock_model, request) for _ in range(concurrency))
+        )
+    elapsed = time.perf_counter() - started
+    return (concurrency * rounds) / elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", type=float, default=0.2, help="Stub latency in seconds")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--requests-per-minute", type=float, default=1e6, help="Bedrock rate limit applied to the calls")
+    parser.add_argument("--tokens-per-minute", type=float, default=1e9)
+    args = parser.parse_args()
+
+    set_bedrock_runtime_client("us-west-2", StubBedrockRuntime(args.latency))
+    default_request = BedrockInvocationRequest()
+    set_rate_limiter(
+        default_request.model_id,
+        default_request.region_name,
+        RateLimiter(args.requests_per_minute, args.tokens_per_minute),
+    )
+
+    print(f"{'concurrency':>12} {'invocations/s':>14}")
+    for concurrency in args.concurrency:
+        throughput = await measure(concurrency, args.rounds)
+        print(f"{concurrency:>12} {throughput:>14.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
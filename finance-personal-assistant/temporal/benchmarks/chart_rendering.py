@@ -0,0 +1,53 @@
+"""
+Render many distinct charts in parallel and check that memory stays flat.
+
+Charts go to a temporary blob store. The script prints peak RSS after each round, which
+should level off instead of growing with the number of charts rendered.
+
+    uv run python -m temporal.benchmarks.chart_rendering --charts 200 --threads 8
+"""
+import argparse
+import resource
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ..blob_store import LocalBlobStore, set_blob_store
+from ..charts import render_pie_chart_cached
+
+
+def rss_mb() -> float:
+    """Peak resident set size of this process in MB (Linux reports KB)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--charts", type=int, default=200, help="Charts per round")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        set_blob_store(LocalBlobStore(root))
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            print(f"{'round':>6} {'charts/s':>9} {'cached/s':>9} {'peak RSS (MB)':>14}")
+            for round_number in range(args.rounds):
+                charts = [
+                    ({"Needs": 50 + i, "Wants": 30, "Savings": 20}, f"Budget {round_number}-{i}")
+                    for i in range(args.charts)
+                ]
+                started = time.perf_counter()
+                list(pool.map(lambda chart: render_pie_chart_cached(*chart), charts))
+                rendered = args.charts / (time.perf_counter() - started)
+
+                # The same charts again are served from the blob store
+                started = time.perf_counter()
+                list(pool.map(lambda chart: render_pie_chart_cached(*chart), charts))
+                cached = args.charts / (time.perf_counter() - started)
+
+                print(f"{round_number:>6} {rendered:>9.1f} {cached:>9.1f} {rss_mb():>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Compare the old per-ticker compare_stock_performance path with the batched tool.
+
+- per-ticker: the path the tool had before batching, one history request per symbol and
+  the period return computed one scalar at a time
+- tool: the compare_stock_performance tool the financial analysis agent calls, which
+  fetches all symbols through MarketDataStore.close_matrix in one request and computes
+  return, volatility and drawdown column-wise
+
+Both paths read the same fixture files through FixtureFetcher, behind a fixed latency
+per request, and every run starts from an empty in-memory store. Without --fixtures,
+synthetic fixtures are written to a temporary directory first. The returns of the two
+paths are checked to agree.
+
+    uv run python -m temporal.benchmarks.compare_stock_performance --latency 0.2
+    uv run python -m temporal.benchmarks.compare_stock_performance --fixtures fixtures/ --tickers 5 20
+"""
+import argparse
+import os
+import re
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from ..financial_analysis_tools import compare_stock_performance
+from ..market_data import BAR_COLUMNS, FixtureFetcher, MarketDataStore, period_start, set_market_data_store
+
+PERIOD = "1y"
+
+
+class LatencyFetcher(FixtureFetcher):
+    """FixtureFetcher that costs one round trip per request, however many symbols it covers."""
+
+    def __init__(self, directory: str, latency: float):
+        super().__init__(directory)
+        self.latency = latency
+
+    def history(self, symbol: str, start: date) -> pd.DataFrame:
+        time.sleep(self.latency)
+        return super().history(symbol, start)
+
+    def history_many(self, symbols: List[str], start: date) -> Dict[str, pd.DataFrame]:
+        time.sleep(self.latency)
+        return {
+            symbol: FixtureFetcher.history(self, symbol, start)
+            for symbol in symbols
+            if os.path.exists(os.path.join(self.directory, f"{symbol.upper()}.csv"))
+        }
+
+
+def write_fixtures(directory: str, count: int) -> List[str]:
+    """Write synthetic daily bars for count symbols in the FixtureFetcher format."""
+    index = pd.bdate_range(start=date.today() - timedelta(days=400), end=date.today(), name="Date")
+    rng = np.random.default_rng(0)
+    symbols = [f"T{i:03d}" for i in range(count)]
+    for symbol in symbols:
+        close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, len(index))))
+        pd.DataFrame(
+            {"Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close, "Volume": 1e6},
+            index=index,
+        )[BAR_COLUMNS].round(4).to_csv(os.path.join(directory, f"{symbol}.csv"))
+    return symbols
+
+
+def per_ticker(fetcher: FixtureFetcher, symbols: List[str]) -> Dict[str, float]:
+    """Period return per symbol the way the tool computed it before batching."""
+    performance = {}
+    start = period_start(PERIOD)
+    for symbol in symbols:
+        hist = fetcher.history(symbol, start)
+        if not hist.empty:
+            start_price = hist["Close"].iloc[0]
+            end_price = hist["Close"].iloc[-1]
+            performance[symbol] = ((end_price - start_price) / start_price) * 100
+    return performance
+
+
+def tool_returns(text: str) -> Dict[str, float]:
+    return {symbol: float(value) for symbol, value in re.findall(r"• (\S+): ([+-][\d.]+)%", text)}
+
+
+def run(directory: str, symbols: List[str], tickers: List[int], latency: float) -> None:
+    print(f"{'tickers':>8} {'per-ticker (s)':>15} {'tool (s)':>9} {'speedup':>8}")
+    for count in tickers:
+        chosen = symbols[:count]
+
+        started = time.perf_counter()
+        expected = per_ticker(LatencyFetcher(directory, latency), chosen)
+        old = time.perf_counter() - started
+
+        set_market_data_store(MarketDataStore(":memory:", fetcher=LatencyFetcher(directory, latency)))
+        started = time.perf_counter()
+        text = compare_stock_performance(symbols=chosen, period=PERIOD)
+        new = time.perf_counter() - started
+
+        returns = tool_returns(text)
+        assert returns.keys() == expected.keys(), text
+        assert all(abs(returns[symbol] - round(expected[symbol], 2)) <= 0.01 for symbol in expected), text
+        print(f"{len(chosen):>8} {old:>15.2f} {new:>9.2f} {old / new:>7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", type=float, default=0.2, help="Latency per fetch request in seconds")
+    parser.add_argument("--tickers", type=int, nargs="+", default=[1, 5, 10, 50, 100])
+    parser.add_argument("--fixtures", help="Directory of recorded fixtures (record_fixtures) to use instead of synthetic ones")
+    args = parser.parse_args()
+
+    if args.fixtures:
+        symbols = sorted(name[:-len(".csv")] for name in os.listdir(args.fixtures) if name.endswith(".csv"))
+        run(args.fixtures, symbols, args.tickers, args.latency)
+        return
+    with tempfile.TemporaryDirectory() as directory:
+        symbols = write_fixtures(directory, max(args.tickers))
+        run(directory, symbols, args.tickers, args.latency)
+
+
+if __name__ == "__main__":
+    main()
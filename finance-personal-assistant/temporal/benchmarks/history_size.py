@@ -0,0 +1,190 @@
+"""
+Measure the payload bytes one FinancialAssistantWorkflow writes to history, with and
+without the payload codec.
+
+Workflow history is dominated by payloads: the workflow input and result, every
+activity's arguments and result, and the streamed report chunks signalled back to the
+workflow. This script builds those payloads for a run with LLM formatting, using an
+analysis that covers --stocks tickers, and encodes them with each converter setup.
+It reports bytes per workflow, the largest single payload, how many payloads were
+claim-checked to the blob store and the codec's encode plus decode time. A second run
+with an analysis of --large-stocks tickers makes the analysis payloads large enough,
+even compressed, to be claim-checked at the worker's default threshold. No Temporal
+server is needed.
+
+    uv run python -m temporal.benchmarks.history_size --stocks 20 --large-stocks 1000
+"""
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from typing import Any, List
+
+from temporalio.contrib.pydantic import pydantic_data_converter
+from temporalio.converter import DataConverter
+
+from ..blob_store import LocalBlobStore, set_blob_store
+from ..models import (
+    BedrockInvocationRequest,
+    BedrockInvocationResult,
+    BudgetAgentResult,
+    FinancialAnalysisResult,
+    FinancialAssistantOptions,
+    ModelUsage,
+    ReportChunk,
+)
+from ..payload_codec import (
+    CLAIM_CHECK_ENCODING,
+    PAYLOAD_CLAIM_CHECK_THRESHOLD_BYTES,
+    CompressionCodec,
+    data_converter,
+)
+from .report_formatting import REPORT
+
+MODEL_ID = "us.anthropic.claude-3-7-sonnet-20250219-v1:0"
+PROMPT = "Generate a comprehensive financial report for someone earning $6000/month with $800 dining expenses."
+# Characters per append_report_chunk signal while streaming
+CHUNK_CHARS = 200
+
+
+def analysis_text(stocks: int, rng: random.Random) -> str:
+    """Agent output shaped like the real analysis: a section per ticker plus a summary."""
+    sections = []
+    for i in range(stocks):
+        symbol = "".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(4))
+        price, change, volatility = rng.uniform(20, 900), rng.uniform(-40, 80), rng.uniform(10, 60)
+        sections.append(
+            f"## {symbol}\n"
+            f"- Current price: ${price:,.2f}\n"
+            f"- 1 year return: {change:+.2f}%\n"
+            f"- Annualized volatility: {volatility:.1f}%\n"
+            f"- Sharpe ratio: {change / volatility:.2f}\n"
+            f"- Suggested allocation: {rng.uniform(2, 25):.1f}% (${rng.uniform(10, 200):,.2f})\n"
+            f"{symbol} has {'outperformed' if change > 10 else 'lagged'} the index over the period, "
+            f"with a maximum drawdown of {rng.uniform(5, 45):.1f}% and average daily volume of "
+            f"{rng.randint(1, 90)}M shares. Position sizing reflects its volatility relative to the portfolio.\n"
+        )
+    sections.append(
+        "## Summary\nThe portfolio balances growth and income holdings for a moderate risk profile. "
+        "Rebalance quarterly and keep six months of expenses in cash before investing further.\n"
+    )
+    return "\n".join(sections)
+
+
+def chunks(step: str, text: str) -> List[ReportChunk]:
+    return [
+        ReportChunk(step=step, offset=i, text=text[i:i + CHUNK_CHARS])
+        for i in range(0, len(text), CHUNK_CHARS)
+    ]
+
+
+def workflow_payloads(stocks: int, seed: int = 0) -> List[Any]:
+    """Every value one workflow run puts into history, in order."""
+    rng = random.Random(seed)
+    usage = ModelUsage(model_id=MODEL_ID, model_calls=3, input_tokens=2400, output_tokens=800, latency_seconds=4.2)
+    report_prompt = (
+        "Please format the following financial report data into clear, readable text:\n\n"
+        + REPORT.model_dump_json(indent=2)
+    )
+    formatted_report = "# Financial Report\n\n" + "\n".join(
+        f"- **{c.name}**: ${c.amount:,.2f} ({c.percentage}% of income)" for c in REPORT.budget_categories
+    ) * 3
+    analysis = analysis_text(stocks, rng)
+    formatted_analysis = "# Investment Analysis\n\n" + analysis.replace("- ", "* ")
+    return [
+        PROMPT,
+        FinancialAssistantOptions(),
+        "moderate",
+        stocks,
+        BudgetAgentResult(report=REPORT, usage=usage),
+        BedrockInvocationRequest(prompt=report_prompt, system_prompt="You format financial reports.",
+                                 model_id=MODEL_ID, max_tokens=2000, use_cache=True, report_step="budget_report"),
+        *chunks("budget_report", formatted_report),
+        BedrockInvocationResult(text=formatted_report, usage=usage),
+        500.0,
+        FinancialAnalysisResult(text=analysis, usage=usage),
+        BedrockInvocationRequest(prompt=analysis, system_prompt="You format financial analysis results.",
+                                 model_id=MODEL_ID, max_tokens=2000, report_step="financial_analysis"),
+        *chunks("financial_analysis", formatted_analysis),
+        BedrockInvocationResult(text=formatted_analysis, usage=usage),
+        f"{formatted_report}\n\n{formatted_analysis}",
+    ]
+
+
+async def measure(converter: DataConverter, values: List[Any], rounds: int) -> dict:
+    sizes: List[int] = []
+    offloaded = 0
+    started = time.perf_counter()
+    for _ in range(rounds):
+        sizes, offloaded = [], 0
+        for value in values:
+            payloads = await converter.encode([value])
+            sizes.append(sum(p.ByteSize() for p in payloads))
+            offloaded += sum(p.metadata.get("encoding") == CLAIM_CHECK_ENCODING for p in payloads)
+            decoded = await converter.decode(payloads, [type(value)])
+            assert decoded == [value]
+    elapsed = (time.perf_counter() - started) / rounds
+    return {"bytes": sum(sizes), "largest": max(sizes), "offloaded": offloaded, "ms": elapsed * 1000}
+
+
+async def report(title: str, setups: dict, values: List[Any], rounds: int) -> None:
+    print(f"{title}: {len(values)} payloads per workflow")
+    print(f"{'converter':<30} {'history bytes':>14} {'vs plain':>9} {'largest':>9} {'offloaded':>10} {'codec ms':>9}")
+    baseline = None
+    for name, converter in setups.items():
+        result = await measure(converter, values, rounds)
+        baseline = baseline or result["bytes"]
+        print(
+            f"{name:<30} {result['bytes']:>14,} {result['bytes'] / baseline:>8.0%} "
+            f"{result['largest']:>9,} {result['offloaded']:>10} {result['ms']:>9.2f}"
+        )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--stocks", type=int, default=10, help="Tickers covered by the analysis")
+    parser.add_argument("--large-stocks", type=int, default=4000,
+                        help="Tickers covered by the analysis of the claim-check run")
+    parser.add_argument("--rounds", type=int, default=20, help="Encode/decode rounds to time")
+    parser.add_argument("--compression-threshold", type=int, default=2048)
+    parser.add_argument("--claim-check-threshold", type=int, default=1024,
+                        help="Claim-check threshold of the first run, below its largest compressed payload so that it takes effect")
+    args = parser.parse_args()
+
+    set_blob_store(LocalBlobStore(tempfile.mkdtemp(prefix="history-size-")))
+    values = workflow_payloads(args.stocks)
+    setups = {"pydantic (no codec)": pydantic_data_converter}
+    # CompressionCodec falls back to gzip when zstandard is not installed
+    zstd_available = CompressionCodec("zstd").algorithm == "zstd"
+    algorithms = ["gzip"] + (["zstd"] if zstd_available else [])
+    for algorithm in algorithms:
+        setups[algorithm] = data_converter(
+            compression=algorithm, compression_threshold=args.compression_threshold, claim_check_threshold=0
+        )
+    setups[f"{algorithms[-1]} + claim-check {args.claim_check_threshold:,}"] = data_converter(
+        compression=algorithms[-1],
+        compression_threshold=args.compression_threshold,
+        claim_check_threshold=args.claim_check_threshold,
+    )
+    if not zstd_available:
+        print("zstandard is not installed, so only gzip is measured")
+
+    await report(f"Analysis of {args.stocks} stocks", setups, values, args.rounds)
+
+    # At the worker's default threshold only payloads that stay large compressed are offloaded
+    default_claim_check = f"{algorithms[-1]} + claim-check {PAYLOAD_CLAIM_CHECK_THRESHOLD_BYTES:,}"
+    large_setups = {
+        "pydantic (no codec)": pydantic_data_converter,
+        algorithms[-1]: setups[algorithms[-1]],
+        default_claim_check: data_converter(
+            compression=algorithms[-1], compression_threshold=args.compression_threshold
+        ),
+    }
+    print()
+    large_values = workflow_payloads(args.large_stocks)
+    await report(f"Analysis of {args.large_stocks} stocks", large_setups, large_values, args.rounds)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,148 @@
+"""
+Compare report latency and tokens with LLM formatting versus the local template renderer.
+
+Both modes run FinancialAssistantWorkflow end to end, with the real workers from
+temporal.worker, against a local Temporal dev server. Every Bedrock call goes to the
+in-process fake Bedrock server (temporal.fake_bedrock), so both modes use the same
+budget agent and differ only in the formatting step. In "llm" mode that step is the
+workflow's streaming, cached formatting activity. In "template" mode the report is
+rendered in the workflow. The investment amount (--amount, default 0) is signalled
+with the start, so a run ends after the budget report unless an analysis is asked for.
+The response cache starts empty for each run unless --warm-cache is given.
+
+The dev server is downloaded on first use; pass --dev-server-path to use an installed
+`temporal` CLI, or --address to target a server that is already running.
+
+    uv run python -m temporal.benchmarks.report_formatting --latency fixed:1.0 --chunk-interval fixed:0.04
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+import uuid
+from contextlib import ExitStack
+
+from temporalio.client import Client
+from temporalio.testing import WorkflowEnvironment
+
+from .. import bedrock_client, llm_cache, worker
+from ..fake_bedrock import FakeBedrockConfig, FakeBedrockServer, Latency
+from ..llm_cache import ResponseCache
+from ..market_data import MarketDataStore, set_market_data_store
+from ..models import BedrockInvocationRequest, BudgetCategory, FinancialAssistantOptions, FinancialReport, UsageReport
+from ..payload_codec import data_converter
+from ..rate_limiter import RateLimiter, set_rate_limiter
+from ..report_templates import render_financial_report
+from ..task_queues import WORKFLOW_TASK_QUEUE
+from .workflow_load import PROMPT, StubFetcher, _ExistingServer
+
+REPORT = FinancialReport(
+    monthly_income=6000,
+    budget_categories=[
+        BudgetCategory(name="Housing", amount=1800, percentage=30),
+        BudgetCategory(name="Dining", amount=800, percentage=13.3),
+        BudgetCategory(name="Transportation", amount=600, percentage=10),
+        BudgetCategory(name="Utilities", amount=400, percentage=6.7),
+        BudgetCategory(name="Savings", amount=1200, percentage=20),
+        BudgetCategory(name="Other", amount=1200, percentage=20),
+    ],
+    recommendations=[
+        "Reduce dining out to $500 per month",
+        "Build an emergency fund covering six months of expenses",
+        "Automate monthly transfers to savings",
+    ],
+    financial_health_score=7,
+    recommended_investment_amount=700,
+)
+
+
+async def run_once(client: Client, mode: str, amount: float, warm_cache: bool) -> tuple[float, UsageReport]:
+    """Return the end-to-end seconds and the usage report of one workflow."""
+    if not warm_cache:
+        llm_cache._cache = ResponseCache()
+    started = time.perf_counter()
+    handle = await client.start_workflow(
+        "FinancialAssistantWorkflow",
+        args=[PROMPT, FinancialAssistantOptions(formatting_mode=mode, speculative_analysis=False)],
+        id=f"report-formatting-{uuid.uuid4()}",
+        task_queue=WORKFLOW_TASK_QUEUE,
+    )
+    await handle.signal("set_investment_amount", amount)
+    await handle.result()
+    elapsed = time.perf_counter() - started
+    return elapsed, await handle.query("get_usage", result_type=UsageReport)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--latency", type=Latency.parse, default=Latency("fixed", [1.0]),
+                        help="Fake model time to first byte, e.g. fixed:1.0 or lognormal:1.0,0.3")
+    parser.add_argument("--chunk-interval", type=Latency.parse, default=Latency("fixed", [0.04]),
+                        help="Delay between streamed chunks of three words, same syntax as --latency")
+    parser.add_argument("--amount", type=float, default=0.0, help="Investment amount to signal (0 skips the analysis)")
+    parser.add_argument("--warm-cache", action="store_true", help="Keep the response cache across runs")
+    parser.add_argument("--address", help="Use a running Temporal server instead of starting a dev server")
+    parser.add_argument("--dev-server-path", help="Existing `temporal` CLI binary to run the dev server with")
+    args = parser.parse_args()
+
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "fake")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "fake")
+    default_request = BedrockInvocationRequest()
+    set_rate_limiter(default_request.model_id, default_request.region_name, RateLimiter(1e6, 1e9))
+    set_market_data_store(
+        MarketDataStore(os.path.join(tempfile.mkdtemp(prefix="report-formatting-"), "market_data.sqlite3"),
+                        fetcher=StubFetcher(0.0))
+    )
+
+    started = time.perf_counter()
+    for _ in range(10000):
+        render_financial_report(REPORT)
+    render_us = (time.perf_counter() - started) / 10000 * 1e6
+    print(f"template render: {render_us:.1f} µs per report\n")
+
+    # The budget agent answers with REPORT; formatting streams a report of the same length
+    config = FakeBedrockConfig(
+        latency=args.latency,
+        chunk_interval=args.chunk_interval,
+        text=render_financial_report(REPORT),
+        script=[{"tool_input": REPORT.model_dump()}],
+        seed=0,
+    )
+    with FakeBedrockServer(config) as server:
+        # Must be set before the first Bedrock client is created
+        bedrock_client.BEDROCK_ENDPOINT_URL = server.url
+        if args.address:
+            env = _ExistingServer(await Client.connect(args.address, data_converter=data_converter()))
+        else:
+            env = await WorkflowEnvironment.start_local(
+                data_converter=data_converter(), dev_server_existing_path=args.dev_server_path
+            )
+        async with env:
+            with ExitStack() as stack:
+                workers = worker.build_workers(env.client, worker.build_parser().parse_args([]), stack)
+                worker_tasks = [asyncio.create_task(w.run()) for w in workers]
+                try:
+                    print(f"{args.runs} runs per mode, fake model latency {args.latency}")
+                    print(f"{'mode':>10} {'p50 s':>8} {'max s':>8} {'calls':>6} {'input tok':>10} {'output tok':>11}")
+                    for mode in ("llm", "template"):
+                        results = [
+                            await run_once(env.client, mode, args.amount, args.warm_cache) for _ in range(args.runs)
+                        ]
+                        latencies = [elapsed for elapsed, _ in results]
+                        usage = results[-1][1]
+                        calls = sum(step.model_calls for step in usage.steps)
+                        print(
+                            f"{mode:>10} {statistics.median(latencies):>8.2f} {max(latencies):>8.2f}"
+                            f" {calls:>6} {usage.input_tokens:>10} {usage.output_tokens:>11}"
+                        )
+                finally:
+                    for w in workers:
+                        await w.shutdown()
+                    await asyncio.gather(*worker_tasks, return_exceptions=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
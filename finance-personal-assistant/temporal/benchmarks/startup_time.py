@@ -0,0 +1,70 @@
+"""
+Guard the cold-start import time of the worker and the CLI client.
+
+Each module is imported in a fresh interpreter with `-X importtime`. The script reports
+the cumulative import time and the slowest imports, fails if any module exceeds its
+budget, and fails if a heavy dependency is imported eagerly.
+
+    uv run python -m temporal.benchmarks.startup_time --budget-ms 1500
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ENTRY_POINTS = ["temporal.worker", "temporal.start_workflow"]
+
+# Dependencies that must only be imported when an activity first needs them
+DEFERRED_MODULES = ["boto3", "matplotlib", "numpy", "pandas", "strands", "strands_tools", "yfinance"]
+
+# Cumulative import time allowed per entry point; also the threshold of tests/test_startup.py
+STARTUP_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "1500"))
+
+
+def import_times(module: str) -> dict:
+    """Return {module: cumulative microseconds} for a cold import of module."""
+    package_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=package_root,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS, help="Maximum cumulative import time per entry point")
+    parser.add_argument("--top", type=int, default=5, help="Slowest imports to list")
+    args = parser.parse_args()
+
+    failed = False
+    for entry_point in ENTRY_POINTS:
+        times = import_times(entry_point)
+        total_ms = times[entry_point] / 1000
+        status = "✅" if total_ms <= args.budget_ms else "❌"
+        failed |= total_ms > args.budget_ms
+        print(f"{status} {entry_point}: {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+
+        top_level = {name: us for name, us in times.items() if "." not in name and name != entry_point}
+        for name, us in sorted(top_level.items(), key=lambda item: item[1], reverse=True)[: args.top]:
+            print(f"    {name}: {us / 1000:.0f} ms")
+
+        eager = [name for name in DEFERRED_MODULES if name in times]
+        if eager:
+            failed = True
+            print(f"❌ {entry_point} imports deferred dependencies eagerly: {', '.join(eager)}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+"""
+Measure how many FinancialAssistantWorkflow executions per second a worker sustains.
+
+The real workers from temporal.worker run in this process against a local Temporal
+dev server. Bedrock (the formatting activities and both agents) and Yahoo Finance are
+replaced by stubs with configurable latency. The driver keeps --concurrency workflows
+in flight, signals each one with an investment amount after --think-time seconds, and
+reports throughput, end-to-end latency, activity schedule-to-start latency and the
+process's CPU and memory. Results are also written as JSON for regression tracking.
+
+The dev server is downloaded on first use; pass --dev-server-path to use an installed
+`temporal` CLI, or --address to target a server that is already running. Options not
+listed here (for example --agent-concurrency) are passed to the worker.
+
+    uv run python -m temporal.benchmarks.workflow_load --workflows 200 --concurrency 50
+"""
+import argparse
+import asyncio
+import functools
+import io
+import json
+import os
+import platform
+import resource
+import statistics
+import tempfile
+import time
+import uuid
+from contextlib import ExitStack
+from datetime import date
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from temporalio.client import Client
+from temporalio.runtime import MetricBuffer, Runtime, TelemetryConfig
+from temporalio.testing import WorkflowEnvironment
+
+from .. import worker
+from ..bedrock_client import set_bedrock_runtime_client
+from ..market_data import BAR_COLUMNS, MarketDataStore, set_market_data_store
+from ..models import BedrockInvocationRequest, FinancialAssistantOptions
+from ..payload_codec import data_converter
+from ..rate_limiter import RateLimiter, set_rate_limiter
+from ..task_queues import WORKFLOW_TASK_QUEUE
+
+PROMPT = "Generate a comprehensive financial report for someone earning $6000/month with $800 dining expenses."
+
+FINANCIAL_REPORT = {
+    "monthly_income": 6000,
+    "budget_categories": [
+        {"name": "Needs", "amount": 3000, "percentage": 50},
+        {"name": "Wants", "amount": 1800, "percentage": 30},
+        {"name": "Savings", "amount": 1200, "percentage": 20},
+    ],
+    "recommendations": ["Reduce dining out", "Automate savings"],
+    "financial_health_score": 7,
+    "recommended_investment_amount": 500,
+}
+
+SCHEDULE_TO_START_METRIC = "financial_assistant_activity_schedule_to_start_latency"
+
+
+class StubFetcher:
+    """Market data fetcher that returns synthetic daily bars for any symbol after a fixed latency per request."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    @staticmethod
+    @functools.lru_cache
+    def _index(start: date) -> pd.DatetimeIndex:
+        return pd.bdate_range(start=start, end=date.today(), name="Date")
+
+    def _bars(self, symbol: str, start: date) -> pd.DataFrame:
+        index = self._index(start)
+        rng = np.random.default_rng(abs(hash(symbol)) % 2**32)
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(index))))
+        return pd.DataFrame(
+            {"Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close, "Volume": 1e6},
+            index=index,
+        )[BAR_COLUMNS]
+
+    def history(self, symbol, start):
+        time.sleep(self.latency)
+        return self._bars(symbol, start)
+
+    def history_many(self, symbols, start):
+        time.sleep(self.latency)
+        return {symbol: self._bars(symbol, start) for symbol in symbols}
+
+    def info(self, symbol):
+        return {}
+
+
+class StubBedrockRuntime:
+    """
+    Blocking stand-in for bedrock-runtime covering the calls the worker makes:
+    invoke_model and its streaming variant for formatting, converse_stream for agents.
+    Structured-output requests (a forced tool choice) get a FinancialReport tool call.
+    """
+
+    class meta:
+        region_name = "us-west-2"
+
+    def __init__(self, latency: float, text: str = "Formatted report. " * 20):
+        self.latency = latency
+        self.text = text
+
+    def invoke_model(self, **kwargs):
+        time.sleep(self.latency)
+        body = {
+            "content": [{"type": "text", "text": self.text}],
+            "usage": {"input_tokens": 300, "output_tokens": 150},
+        }
+        return {"body": io.BytesIO(json.dumps(body).encode())}
+
+    def invoke_model_with_response_stream(self, **kwargs):
+        def events():
+            yield self._chunk({"type": "message_start", "message": {"usage": {"input_tokens": 300}}})
+            words = self.text.split(" ")
+            for word in words:
+                time.sleep(self.latency / len(words))
+                yield self._chunk({"type": "content_block_delta", "delta": {"type": "text_delta", "text": word + " "}})
+            yield self._chunk({"type": "message_delta", "usage": {"output_tokens": 150}})
+
+        return {"body": events()}
+
+    def converse_stream(self, **kwargs):
+        time.sleep(self.latency)
+        tool_config = kwargs.get("toolConfig", {})
+        if "any" in tool_config.get("toolChoice", {}) or "tool" in tool_config.get("toolChoice", {}):
+            name = tool_config["tools"][0]["toolSpec"]["name"]
+            content = [
+                {"contentBlockStart": {"start": {"toolUse": {"toolUseId": uuid.uuid4().hex, "name": name}}}},
+                {"contentBlockDelta": {"delta": {"toolUse": {"input": json.dumps(FINANCIAL_REPORT)}}}},
+                {"contentBlockStop": {}},
+            ]
+            stop_reason = "tool_use"
+        else:
+            content = [
+                {"contentBlockDelta": {"delta": {"text": self.text}}},
+                {"contentBlockStop": {}},
+            ]
+            stop_reason = "end_turn"
+        return {
+            "stream": [
+                {"messageStart": {"role": "assistant"}},
+                *content,
+                {"messageStop": {"stopReason": stop_reason}},
+                {"metadata": {"usage": {"inputTokens": 500, "outputTokens": 200, "totalTokens": 700}, "metrics": {"latencyMs": int(self.latency * 1000)}}},
+            ]
+        }
+
+    @staticmethod
+    def _chunk(payload: dict) -> dict:
+        return {"chunk": {"bytes": json.dumps(payload).encode()}}
+
+
+def percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    if not values:
+        return {"p50": None, "p95": None, "p99": None}
+    if len(values) == 1:
+        return {"p50": values[0], "p95": values[0], "p99": values[0]}
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return {"p50": round(cuts[49], 2), "p95": round(cuts[94], 2), "p99": round(cuts[98], 2)}
+
+
+def rss_mb() -> float:
+    """Current resident set size (Linux), falling back to the peak."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class ScheduleToStartCollector:
+    """Drains the runtime's metric buffer, keeping schedule-to-start samples per task queue."""
+
+    def __init__(self, buffer: MetricBuffer):
+        self.buffer = buffer
+        self.samples: Dict[str, List[float]] = {}
+
+    def drain(self) -> None:
+        for update in self.buffer.retrieve_updates():
+            if update.metric.name == SCHEDULE_TO_START_METRIC:
+                queue = str(update.attributes.get("task_queue"))
+                self.samples.setdefault(queue, []).append(float(update.value))
+
+    async def run(self) -> None:
+        while True:
+            self.drain()
+            await asyncio.sleep(0.5)
+
+
+async def run_workflow(client: Client, amount: float, think_time: float, options: FinancialAssistantOptions) -> float:
+    """Run one workflow to completion and return its end-to-end latency in milliseconds."""
+    started = time.perf_counter()
+    handle = await client.start_workflow(
+        "FinancialAssistantWorkflow",
+        args=[PROMPT, options],
+        id=f"load-test-{uuid.uuid4()}",
+        task_queue=WORKFLOW_TASK_QUEUE,
+    )
+    await asyncio.sleep(think_time)
+    await handle.signal("set_investment_amount", amount)
+    await handle.result()
+    return (time.perf_counter() - started) * 1000
+
+
+async def drive(client: Client, args: argparse.Namespace) -> dict:
+    """Keep args.concurrency workflows in flight until args.workflows have finished."""
+    options = FinancialAssistantOptions(
+        formatting_mode=args.formatting_mode, speculative_analysis=not args.no_speculation
+    )
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies: List[float] = []
+    errors: List[str] = []
+
+    async def one() -> None:
+        async with semaphore:
+            try:
+                latencies.append(await run_workflow(client, args.amount, args.think_time, options))
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+
+    cpu_started = time.process_time()
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(args.workflows)))
+    elapsed = time.perf_counter() - started
+    cpu = time.process_time() - cpu_started
+    return {
+        "elapsed_seconds": round(elapsed, 3),
+        "completed": len(latencies),
+        "failed": len(errors),
+        "errors": errors[:10],
+        "throughput_per_second": round(len(latencies) / elapsed, 3),
+        "latency_ms": percentiles(latencies),
+        "cpu_seconds": round(cpu, 3),
+        "cpu_percent": round(100 * cpu / elapsed, 1),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workflows", type=int, default=100, help="Workflows to run in total")
+    parser.add_argument("--concurrency", type=int, default=20, help="Workflows in flight at once")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Seconds before the investment amount is signalled")
+    parser.add_argument("--amount", type=float, default=500.0, help="Investment amount to signal (0 skips the analysis)")
+    parser.add_argument("--bedrock-latency", type=float, default=0.5, help="Stub latency per Bedrock call in seconds")
+    parser.add_argument("--market-data-latency", type=float, default=0.3, help="Stub latency per market data request")
+    parser.add_argument("--requests-per-minute", type=float, default=1e6, help="Bedrock rate limit applied by the worker")
+    parser.add_argument("--tokens-per-minute", type=float, default=1e9)
+    parser.add_argument("--formatting-mode", choices=["llm", "template"], default="llm")
+    parser.add_argument("--no-speculation", action="store_true")
+    parser.add_argument("--address", help="Use a running Temporal server instead of starting a dev server")
+    parser.add_argument("--dev-server-path", help="Existing `temporal` CLI binary to run the dev server with")
+    parser.add_argument("--output", default="workflow_load.json", help="Where to write the JSON results")
+    args, worker_argv = parser.parse_known_args()
+    worker_args = worker.build_parser().parse_args(worker_argv)
+
+    # Stubs must be installed before any agent or model is built
+    set_bedrock_runtime_client("us-west-2", StubBedrockRuntime(args.bedrock_latency))
+    default_request = BedrockInvocationRequest()
+    set_rate_limiter(
+        default_request.model_id,
+        default_request.region_name,
+        RateLimiter(args.requests_per_minute, args.tokens_per_minute),
+    )
+    cache_dir = tempfile.mkdtemp(prefix="workflow-load-")
+    os.environ.setdefault("LLM_CACHE_PATH", os.path.join(cache_dir, "llm_responses.sqlite3"))
+    set_market_data_store(
+        MarketDataStore(os.path.join(cache_dir, "market_data.sqlite3"), fetcher=StubFetcher(args.market_data_latency))
+    )
+
+    # Buffer the worker's metrics in memory so schedule-to-start latency can be read back
+    buffer = MetricBuffer(100_000)
+    runtime = Runtime(telemetry=TelemetryConfig(metrics=buffer))
+    collector = ScheduleToStartCollector(buffer)
+
+    if args.address:
+        env = _ExistingServer(
+            await Client.connect(args.address, data_converter=data_converter(), runtime=runtime)
+        )
+    else:
+        env = await WorkflowEnvironment.start_local(
+            data_converter=data_converter(),
+            runtime=runtime,
+            dev_server_existing_path=args.dev_server_path,
+        )
+    async with env:
+        client = env.client
+        with ExitStack() as stack:
+            workers = worker.build_workers(client, worker_args, stack)
+            worker_tasks = [asyncio.create_task(w.run()) for w in workers]
+            collector_task = asyncio.create_task(collector.run())
+            rss_before = rss_mb()
+            try:
+                results = await drive(client, args)
+            finally:
+                collector_task.cancel()
+                for w in workers:
+                    await w.shutdown()
+                await asyncio.gather(*worker_tasks, return_exceptions=True)
+    collector.drain()
+
+    results.update(
+        {
+            "config": {
+                **{k: v for k, v in vars(args).items() if k not in ("output", "dev_server_path", "address")},
+                "worker": {k: v for k, v in vars(worker_args).items() if k not in ("metrics_address",)},
+            },
+            "schedule_to_start_ms": {queue: percentiles(samples) for queue, samples in sorted(collector.samples.items())},
+            "rss_mb": {"before": round(rss_before, 1), "after": round(rss_mb(), 1)},
+            "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+        }
+    )
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"completed {results['completed']} / failed {results['failed']} in {results['elapsed_seconds']}s")
+    print(f"throughput: {results['throughput_per_second']} workflows/s")
+    print(f"end-to-end latency ms: {results['latency_ms']}")
+    for queue, stats in results["schedule_to_start_ms"].items():
+        print(f"schedule-to-start ms ({queue}): {stats}")
+    print(f"cpu: {results['cpu_percent']}%  rss: {results['rss_mb']} MB  peak: {results['peak_rss_mb']} MB")
+    print(f"results written to {args.output}")
+
+
+class _ExistingServer:
+    """Async context manager with the same shape as WorkflowEnvironment for --address."""
+
+    def __init__(self, client: Client):
+        self.client = client
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
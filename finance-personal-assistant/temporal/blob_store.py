@@ -0,0 +1,210 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Optional, Protocol, Tuple
+
+# References handed out by blob stores look like blob://<namespace>/<key>
+BLOB_REF_PREFIX = "blob://"
+
+# Where blobs are stored: a directory (optionally file://...) or s3://bucket/prefix.
+# Unset, blobs go to BLOB_STORE_PATH, a directory local to the process's host.
+BLOB_STORE_URL = os.getenv("BLOB_STORE_URL", "")
+# Blobs not written for this long are deleted by the worker; 0 (the default) keeps them
+# forever, since open workflows and retained histories may still reference any of them
+BLOB_RETENTION_SECONDS = float(os.getenv("BLOB_RETENTION_SECONDS", "0"))
+BLOB_CLEANUP_INTERVAL_SECONDS = float(os.getenv("BLOB_CLEANUP_INTERVAL_SECONDS", "3600"))
+
+
+class BlobStore(Protocol):
+    """Content store for payloads too large or too binary to pass around inline."""
+
+    def put(self, namespace: str, key: str, data: bytes) -> str:
+        """Store data and return its reference."""
+        ...
+
+    def get(self, ref: str) -> bytes:
+        """Return the data for a reference returned by put."""
+        ...
+
+    def exists(self, namespace: str, key: str) -> bool:
+        """Whether data is already stored under namespace/key."""
+        ...
+
+    def ref(self, namespace: str, key: str) -> str:
+        """Reference for data stored under namespace/key."""
+        ...
+
+    def cleanup(self, max_age_seconds: float) -> int:
+        """Delete blobs last written more than max_age_seconds ago; return how many."""
+        ...
+
+
+class LocalBlobStore:
+    """BlobStore backed by a directory on the local filesystem."""
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+
+    def put(self, namespace: str, key: str, data: bytes) -> str:
+        path = self._path(namespace, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file first so readers never see a partial blob
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        return self.ref(namespace, key)
+
+    def get(self, ref: str) -> bytes:
+        namespace, key = self.parse_ref(ref)
+        with open(self._path(namespace, key), "rb") as f:
+            return f.read()
+
+    def exists(self, namespace: str, key: str) -> bool:
+        return os.path.exists(self._path(namespace, key))
+
+    def cleanup(self, max_age_seconds: float) -> int:
+        cutoff = time.time() - max_age_seconds
+        deleted = 0
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                path = os.path.join(directory, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        deleted += 1
+                except FileNotFoundError:
+                    # Deleted or replaced by another process in the meantime
+                    pass
+        return deleted
+
+    @staticmethod
+    def ref(namespace: str, key: str) -> str:
+        return f"{BLOB_REF_PREFIX}{namespace}/{key}"
+
+    @staticmethod
+    def parse_ref(ref: str) -> Tuple[str, str]:
+        if not ref.startswith(BLOB_REF_PREFIX):
+            raise ValueError(f"Not a blob reference: {ref}")
+        namespace, _, key = ref[len(BLOB_REF_PREFIX):].partition("/")
+        return namespace, key
+
+    def _path(self, namespace: str, key: str) -> str:
+        if not namespace or not key or ".." in namespace or "/" in key or ".." in key:
+            raise ValueError(f"Invalid blob location: {namespace}/{key}")
+        return os.path.join(self.root, namespace, key)
+
+
+class S3BlobStore:
+    """BlobStore backed by an S3 bucket, shared by every process that can reach it."""
+
+    def __init__(self, bucket: str, prefix: str = "", client: Any = None):
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        if client is None:
+            # boto3 is only needed when an S3 store is configured
+            import boto3
+
+            client = boto3.session.Session().client("s3")
+        self.client = client
+
+    def put(self, namespace: str, key: str, data: bytes) -> str:
+        self.client.put_object(Bucket=self.bucket, Key=self._key(namespace, key), Body=data)
+        return self.ref(namespace, key)
+
+    def get(self, ref: str) -> bytes:
+        namespace, key = LocalBlobStore.parse_ref(ref)
+        return self.client.get_object(Bucket=self.bucket, Key=self._key(namespace, key))["Body"].read()
+
+    def exists(self, namespace: str, key: str) -> bool:
+        from botocore.exceptions import ClientError
+
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._key(namespace, key))
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def cleanup(self, max_age_seconds: float) -> int:
+        cutoff = time.time() - max_age_seconds
+        deleted = 0
+        pages = self.client.get_paginator("list_objects_v2").paginate(
+            Bucket=self.bucket, Prefix=f"{self.prefix}/" if self.prefix else ""
+        )
+        for page in pages:
+            expired = [
+                {"Key": item["Key"]} for item in page.get("Contents", [])
+                if item["LastModified"].timestamp() < cutoff
+            ]
+            if expired:
+                self.client.delete_objects(Bucket=self.bucket, Delete={"Objects": expired, "Quiet": True})
+                deleted += len(expired)
+        return deleted
+
+    @staticmethod
+    def ref(namespace: str, key: str) -> str:
+        return LocalBlobStore.ref(namespace, key)
+
+    def _key(self, namespace: str, key: str) -> str:
+        if not namespace or not key or "/" in namespace or "/" in key:
+            raise ValueError(f"Invalid blob location: {namespace}/{key}")
+        return f"{self.prefix}/{namespace}/{key}" if self.prefix else f"{namespace}/{key}"
+
+
+def blob_store_from_url(url: str) -> BlobStore:
+    """BlobStore for s3://bucket/prefix, file:///path or a plain directory path."""
+    if url.startswith("s3://"):
+        bucket, _, prefix = url[len("s3://"):].partition("/")
+        return S3BlobStore(bucket, prefix)
+    return LocalBlobStore(url[len("file://"):] if url.startswith("file://") else url)
+
+
+_store: Optional[BlobStore] = None
+_store_shared = bool(BLOB_STORE_URL)
+_store_lock = threading.Lock()
+
+
+def get_blob_store() -> BlobStore:
+    """Return the process-wide blob store (BLOB_STORE_URL, else BLOB_STORE_PATH, default .cache/blobs)."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = blob_store_from_url(BLOB_STORE_URL or os.getenv("BLOB_STORE_PATH", ".cache/blobs"))
+    return _store
+
+
+def set_blob_store(store: BlobStore) -> None:
+    """Replace the process-wide blob store, e.g. with an S3-backed implementation."""
+    global _store, _store_shared
+    with _store_lock:
+        _store = store
+        _store_shared = True
+
+
+def blob_store_is_shared() -> bool:
+    """
+    Whether the blob store was configured explicitly (BLOB_STORE_URL or set_blob_store),
+    and so can be taken to be the one every client and worker reads from.
+    """
+    return _store_shared
+
+
+async def expire_blobs(
+    max_age_seconds: float = BLOB_RETENTION_SECONDS, interval_seconds: float = BLOB_CLEANUP_INTERVAL_SECONDS
+) -> None:
+    """Delete expired blobs from the blob store every interval_seconds, until cancelled."""
+    if max_age_seconds <= 0:
+        return
+    while True:
+        try:
+            deleted = await asyncio.to_thread(get_blob_store().cleanup, max_age_seconds)
+            if deleted:
+                print(f"🧹 Deleted {deleted} blobs older than {max_age_seconds:.0f}s")
+        except Exception as e:
+            print(f"⚠️ Blob store cleanup failed: {e}")
+        await asyncio.sleep(interval_seconds)
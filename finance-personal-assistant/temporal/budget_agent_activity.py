@@ -1,11 +1,12 @@
 
 from temporalio import activity
 
-from strands import Agent, tool
-from strands.models import BedrockModel
-from strands_tools import calculator
-import matplotlib.pyplot as plt
-from .models import FinancialReport
+from .agent_models import get_bedrock_model
+from .agent_pool import AgentPool
+from .models import BudgetAgentResult, FinancialReport
+from .rate_limiter import bedrock_application_error
+from .telemetry import ToolMetricsHook
+from .usage import track_usage
 
 
 # Enhanced system prompt for structured outputs
@@ -22,70 +23,52 @@ Please determine whether the user is in a position where they can afford to inve
 
 Use structured output when requested to provide comprehensive financial reports."""
 
-# Continue with previous configurations
-bedrock_model = BedrockModel(
-    model_id="us.anthropic.claude-3-7-sonnet-20250219-v1:0",
-    region_name="us-west-2",
-    temperature=0.0,  # Deterministic responses for financial advice
-)
-
-
-@tool
-def calculate_budget(monthly_income: float) -> str:
-    """Calculate 50/30/20 budget breakdown for the given monthly income."""
-    needs = monthly_income * 0.50
-    wants = monthly_income * 0.30
-    savings = monthly_income * 0.20
-    return f"💰 Budget for ${monthly_income:,.0f}/month:\n• Needs: ${needs:,.0f} (50%)\n• Wants: ${wants:,.0f} (30%)\n• Savings: ${savings:,.0f} (20%)"
-
-
-@tool
-def create_financial_chart(
-    data_dict: dict, chart_title: str = "Financial Chart"
-) -> str:
-    """Create a pie chart visualization from financial data dictionary."""
-    if not data_dict:
-        return "❌ No data provided for chart"
-
-    labels = list(data_dict.keys())
-    values = list(data_dict.values())
-    colors = ["#FF6B6B", "#4ECDC4", "#45B7D1", "#96CEB4", "#FECA57", "#FF9FF3"]
-
-    plt.figure(figsize=(8, 6))
-    plt.pie(
-        values,
-        labels=labels,
-        autopct="%1.1f%%",
-        colors=colors[: len(values)],
-        startangle=90,
-    )
-    plt.title(f"📊 {chart_title}", fontsize=14, fontweight="bold")
-    plt.axis("equal")
-    plt.tight_layout()
-    plt.show()
 
-    return f"✅ {chart_title} visualization created!"
+def create_budget_agent():
+    """Create our complete financial agent. Strands and the tools are imported on first use."""
+    from strands import Agent
+    from strands_tools import calculator
+    from .budget_tools import calculate_budget, create_financial_chart
+
+    return Agent(
+        model=get_bedrock_model(
+            model_id="us.anthropic.claude-3-7-sonnet-20250219-v1:0",
+            region_name="us-west-2",
+            temperature=0.0,  # Deterministic responses for financial advice
+        ),
+        system_prompt=BUDGET_SYSTEM_PROMPT,
+        tools=[calculate_budget, create_financial_chart, calculator],
+        callback_handler=None,
+        hooks=[ToolMetricsHook("budget")],
+    )
 
 
-# Create our complete financial agent
-budget_agent = Agent(
-    model=bedrock_model,
-    system_prompt=BUDGET_SYSTEM_PROMPT,
-    tools=[calculate_budget, create_financial_chart, calculator],
-    callback_handler=None,
-)
+# Each activity borrows its own agent, so concurrent requests never share history
+budget_agent_pool = AgentPool("budget", create_budget_agent)
 
 @activity.defn
-async def budget_agent_activity(prompt: str) -> FinancialReport:
-    """Activity that uses the budget agent to generate a financial report."""
+def budget_agent_activity(prompt: str) -> BudgetAgentResult:
+    """
+    Activity that uses the budget agent to generate a financial report.
+
+    The agent loop is synchronous, so this runs on the worker's activity thread pool
+    rather than on the event loop.
+    """
     activity.logger.info("Budget Agent Activity started")
 
         # Test structured output using structured_output_async
     print("\nStructured financial report:")
-    structured_response = budget_agent.structured_output(
-        output_model=FinancialReport,
-        prompt=prompt,
-    )
+    with budget_agent_pool.checkout() as budget_agent, track_usage() as usage:
+        try:
+            structured_response = budget_agent.structured_output(
+                output_model=FinancialReport,
+                prompt=prompt,
+            )
+        except Exception as e:
+            error = bedrock_application_error(e, budget_agent.model.rate_limiter)
+            if error:
+                raise error from e
+            raise
     print(f"Income: ${structured_response.monthly_income:,.0f}")
     for category in structured_response.budget_categories:
         print(
@@ -96,5 +79,5 @@ async def budget_agent_activity(prompt: str) -> FinancialReport:
     for i, rec in enumerate(structured_response.recommendations, 1):
         print(f"{i}. {rec}")
 
-    activity.logger.info("✅ Budget Agent Activity completed")
-    return structured_response
\ No newline at end of file
+    activity.logger.info(f"✅ Budget Agent Activity completed (pool: {budget_agent_pool.stats()}, usage: {usage})")
+    return BudgetAgentResult(report=structured_response, usage=usage)
\ No newline at end of file
@@ -0,0 +1,29 @@
+"""Tools used by the budget agent."""
+
+from strands import tool
+from .charts import render_pie_chart_cached
+
+
+@tool
+def calculate_budget(monthly_income: float) -> str:
+    """Calculate 50/30/20 budget breakdown for the given monthly income."""
+    needs = monthly_income * 0.50
+    wants = monthly_income * 0.30
+    savings = monthly_income * 0.20
+    return f"💰 Budget for ${monthly_income:,.0f}/month:\n• Needs: ${needs:,.0f} (50%)\n• Wants: ${wants:,.0f} (30%)\n• Savings: ${savings:,.0f} (20%)"
+
+
+@tool
+def create_financial_chart(
+    data_dict: dict, chart_title: str = "Financial Chart", image_format: str = "png"
+) -> str:
+    """Create a pie chart (png or svg) from a financial data dictionary and return a reference to the image."""
+    if not data_dict:
+        return "❌ No data provided for chart"
+
+    try:
+        ref = render_pie_chart_cached(data_dict, chart_title, image_format)
+    except Exception as e:
+        return f"❌ Unable to create chart: {str(e)}"
+
+    return f"✅ {chart_title} visualization created: {ref}"
@@ -0,0 +1,62 @@
+import hashlib
+import io
+import json
+
+from .blob_store import get_blob_store
+from .telemetry import record_cache_lookup
+
+CHART_COLORS = ["#FF6B6B", "#4ECDC4", "#45B7D1", "#96CEB4", "#FECA57", "#FF9FF3"]
+
+CHART_FORMATS = ("png", "svg")
+
+
+def chart_key(data: dict, title: str, fmt: str) -> str:
+    """Content hash of everything that determines a rendered chart."""
+    canonical = json.dumps({"data": data, "title": title}, sort_keys=True, separators=(",", ":"))
+    return f"{hashlib.sha256(canonical.encode('utf-8')).hexdigest()}.{fmt}"
+
+
+def render_pie_chart(data: dict, title: str, fmt: str = "png") -> bytes:
+    """
+    Render a pie chart to PNG or SVG bytes.
+
+    Uses an object-oriented Figure on the Agg canvas rather than pyplot, so it needs no
+    display, touches no global figure state and is safe to call from many threads.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    figure = Figure(figsize=(8, 6))
+    FigureCanvasAgg(figure)
+    try:
+        axes = figure.add_subplot()
+        values = list(data.values())
+        axes.pie(
+            values,
+            labels=list(data.keys()),
+            autopct="%1.1f%%",
+            colors=CHART_COLORS[: len(values)],
+            startangle=90,
+        )
+        axes.set_title(title, fontsize=14, fontweight="bold")
+        axes.axis("equal")
+        figure.tight_layout()
+
+        buffer = io.BytesIO()
+        figure.savefig(buffer, format=fmt)
+        return buffer.getvalue()
+    finally:
+        figure.clear()
+
+
+def render_pie_chart_cached(data: dict, title: str, fmt: str = "png") -> str:
+    """Render a pie chart once per distinct data/title/format and return its blob reference."""
+    if fmt not in CHART_FORMATS:
+        raise ValueError(f"Unsupported chart format '{fmt}', use one of: {', '.join(CHART_FORMATS)}")
+    store = get_blob_store()
+    key = chart_key(data, title, fmt)
+    cached = store.exists("charts", key)
+    record_cache_lookup("charts", cached)
+    if cached:
+        return store.ref("charts", key)
+    return store.put("charts", key, render_pie_chart(data, title, fmt))
@@ -0,0 +1,550 @@
+"""
+Local fake of the bedrock-runtime API for performance and failure testing.
+
+Serves InvokeModel, InvokeModelWithResponseStream, Converse and ConverseStream over
+HTTP with the same wire format as AWS, so the worker's boto3 client and the Strands
+agents talk to it unchanged once BEDROCK_ENDPOINT_URL points here. Responses are canned
+or scripted, and every request can be delayed, throttled or failed at configurable
+rates. Prompt-cache checkpoints (cachePoint blocks and cache_control) are honoured:
+usage reports cache writes for new prefixes and cache reads for repeated ones.
+Requests are not authenticated, but botocore still signs them, so any credentials
+will do:
+
+    uv run python -m temporal.fake_bedrock --port 8787 --latency lognormal:0.8,0.4 --throttle-rate 0.1
+    AWS_ACCESS_KEY_ID=fake AWS_SECRET_ACCESS_KEY=fake \\
+        BEDROCK_ENDPOINT_URL=http://127.0.0.1:8787 uv run python -m temporal.worker
+"""
+import argparse
+import base64
+import hashlib
+import itertools
+import json
+import random
+import struct
+import threading
+import time
+import uuid
+import zlib
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+from urllib.parse import unquote
+
+# Token counts use the rate limiter's estimate, so they match what callers reserve
+from .rate_limiter import estimate_tokens
+
+DEFAULT_TEXT = "This is a response from the fake Bedrock server. " * 4
+
+# Fault name -> (HTTP status, AWS error code)
+FAULTS = {
+    "throttle": (429, "ThrottlingException"),
+    "error": (500, "InternalServerException"),
+    "unavailable": (503, "ServiceUnavailableException"),
+    "validation": (400, "ValidationException"),
+}
+
+
+@dataclass
+class Latency:
+    """
+    Latency distribution in seconds, parsed from "fixed:0.2", "uniform:0.1,0.5",
+    "normal:mean,stddev", "lognormal:median,sigma" or "exponential:mean".
+    """
+
+    kind: str = "fixed"
+    params: List[float] = field(default_factory=lambda: [0.0])
+
+    @classmethod
+    def parse(cls, spec: str) -> "Latency":
+        kind, _, values = spec.partition(":")
+        if not values:
+            kind, values = "fixed", kind
+        latency = cls(kind, [float(v) for v in values.split(",")])
+        latency.sample()  # Fail fast on a bad spec
+        return latency
+
+    def sample(self, rng: random.Random = random) -> float:
+        p = self.params
+        if self.kind == "fixed":
+            value = p[0]
+        elif self.kind == "uniform":
+            value = rng.uniform(p[0], p[1])
+        elif self.kind == "normal":
+            value = rng.gauss(p[0], p[1])
+        elif self.kind == "lognormal":
+            value = p[0] * rng.lognormvariate(0, p[1])
+        elif self.kind == "exponential":
+            value = rng.expovariate(1 / p[0])
+        else:
+            raise ValueError(f"Unknown latency distribution '{self.kind}'")
+        return max(0.0, value)
+
+
+@dataclass
+class FakeBedrockConfig:
+    """Behaviour of the fake server."""
+
+    latency: Latency = field(default_factory=Latency)
+    # Delay between streamed chunks
+    chunk_interval: Latency = field(default_factory=lambda: Latency("fixed", [0.02]))
+    words_per_chunk: int = 3
+    text: str = DEFAULT_TEXT
+    # Probability that a request fails with each fault before any output
+    throttle_rate: float = 0.0
+    error_rate: float = 0.0
+    # Probability that a streaming response breaks off halfway through
+    stream_failure_rate: float = 0.0
+    # Scripted responses, used in order and then repeated from the start. Each entry may
+    # set "text", "tool_input", "latency" (seconds) or "fault" (a key of FAULTS).
+    script: List[Dict[str, Any]] = field(default_factory=list)
+    # Prompt-cache checkpoints with a shorter prefix are ignored, as on Bedrock
+    prompt_cache_min_tokens: int = 1024
+    seed: Optional[int] = None
+
+
+class PromptUsage(NamedTuple):
+    """Input tokens of one request, split by prompt-cache outcome."""
+    input_tokens: int
+    cache_read_input_tokens: int
+    cache_write_input_tokens: int
+
+
+class FakeBedrock:
+    """Request handling shared by the server threads: fault injection, responses and stats."""
+
+    def __init__(self, config: FakeBedrockConfig):
+        self.config = config
+        self._rng = random.Random(config.seed)
+        self._script = itertools.cycle(config.script) if config.script else None
+        self._lock = threading.Lock()
+        self._prompt_cache: set = set()
+        self.stats: Dict[str, int] = {}
+
+    def set_script(self, script: List[Dict[str, Any]]) -> None:
+        """Replace the scripted responses; later requests start from its first entry."""
+        with self._lock:
+            self.config.script = script
+            self._script = itertools.cycle(script) if script else None
+
+    def next_step(self) -> Dict[str, Any]:
+        """Decide what the next request gets: a scripted entry or a sampled fault and latency."""
+        with self._lock:
+            if self._script:
+                step = dict(next(self._script))
+            else:
+                roll = self._rng.random()
+                step = {}
+                if roll < self.config.throttle_rate:
+                    step["fault"] = "throttle"
+                elif roll < self.config.throttle_rate + self.config.error_rate:
+                    step["fault"] = "error"
+            step.setdefault("latency", self.config.latency.sample(self._rng))
+            step.setdefault("text", self.config.text)
+            step["break_stream"] = self._rng.random() < self.config.stream_failure_rate
+            return step
+
+    def count(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self.stats[key] = self.stats.get(key, 0) + n
+
+    def prompt_usage(self, model_id: str, segments: List[Tuple[str, bool]]) -> PromptUsage:
+        """
+        Input token counts for a prompt, given as (text, checkpoint follows) segments in
+        cache order. The longest prefix that ends at a checkpoint and was seen before is a
+        cache read; the rest of the prefix up to the last checkpoint is a cache write.
+        """
+        prefixes = []
+        text = model_id
+        for segment, checkpoint in segments:
+            text += segment
+            if checkpoint and estimate_tokens(text) >= self.config.prompt_cache_min_tokens:
+                prefixes.append((hashlib.sha256(text.encode()).hexdigest(), estimate_tokens(text)))
+        total = estimate_tokens(text)
+        read = write = 0
+        with self._lock:
+            read = max((tokens for key, tokens in prefixes if key in self._prompt_cache), default=0)
+            if prefixes and prefixes[-1][0] not in self._prompt_cache:
+                write = prefixes[-1][1] - read
+            self._prompt_cache.update(key for key, _ in prefixes)
+        self.count("cache_read_tokens", read)
+        self.count("cache_write_tokens", write)
+        return PromptUsage(total - read - write, read, write)
+
+    def chunks(self, text: str) -> Iterator[str]:
+        words = text.split(" ")
+        size = self.config.words_per_chunk
+        for i in range(0, len(words), size):
+            yield " ".join(words[i:i + size]) + (" " if i + size < len(words) else "")
+
+    def chunk_delay(self) -> float:
+        with self._lock:
+            return self.config.chunk_interval.sample(self._rng)
+
+
+def converse_segments(request: dict) -> List[Tuple[str, bool]]:
+    """Converse prompt blocks in cache order: tools, system, then messages."""
+    blocks = list((request.get("toolConfig") or {}).get("tools", []))
+    blocks += request.get("system") or []
+    for message in request.get("messages", []):
+        blocks += message.get("content", [])
+    segments: List[Tuple[str, bool]] = []
+    for block in blocks:
+        if "cachePoint" in block:
+            if segments:
+                segments[-1] = (segments[-1][0], True)
+        else:
+            segments.append((json.dumps(block), False))
+    return segments
+
+
+def anthropic_segments(request: dict) -> List[Tuple[str, bool]]:
+    """InvokeModel (Anthropic) prompt blocks in cache order, checkpointed by cache_control."""
+    system = request.get("system") or []
+    blocks = list(request.get("tools", []))
+    blocks += [{"type": "text", "text": system}] if isinstance(system, str) else system
+    for message in request.get("messages", []):
+        content = message.get("content", [])
+        blocks += [{"type": "text", "text": content}] if isinstance(content, str) else content
+    return [
+        (json.dumps({k: v for k, v in block.items() if k != "cache_control"}), "cache_control" in block)
+        for block in blocks
+    ]
+
+
+def example_from_schema(schema: dict, definitions: Optional[dict] = None) -> Any:
+    """Smallest value that satisfies a JSON schema, used as a forced tool call's input."""
+    definitions = definitions if definitions is not None else schema.get("$defs", {})
+    if "$ref" in schema:
+        return example_from_schema(definitions[schema["$ref"].split("/")[-1]], definitions)
+    for combinator in ("anyOf", "oneOf", "allOf"):
+        if combinator in schema:
+            return example_from_schema(schema[combinator][0], definitions)
+    kind = schema.get("type", "object")
+    if isinstance(kind, list):
+        kind = next((k for k in kind if k != "null"), "null")
+    if kind == "null":
+        return None
+    if kind == "object":
+        return {
+            name: example_from_schema(prop, definitions)
+            for name, prop in schema.get("properties", {}).items()
+        }
+    if kind == "array":
+        return [example_from_schema(schema.get("items", {}), definitions)]
+    if kind in ("integer", "number"):
+        value = schema.get("minimum", schema.get("exclusiveMinimum", 0) + 1)
+        return int(value) if kind == "integer" else float(value)
+    if kind == "boolean":
+        return True
+    return schema.get("enum", ["example"])[0]
+
+
+# --- AWS event stream encoding (application/vnd.amazon.eventstream) ---
+
+def _encode_headers(headers: Dict[str, str]) -> bytes:
+    encoded = b""
+    for name, value in headers.items():
+        name_bytes, value_bytes = name.encode(), value.encode()
+        # Header value type 7 is a UTF-8 string
+        encoded += struct.pack(">B", len(name_bytes)) + name_bytes
+        encoded += struct.pack(">BH", 7, len(value_bytes)) + value_bytes
+    return encoded
+
+
+def encode_event(headers: Dict[str, str], payload: bytes) -> bytes:
+    """Encode one event stream message: prelude, prelude CRC, headers, payload, message CRC."""
+    header_bytes = _encode_headers(headers)
+    total_length = 12 + len(header_bytes) + len(payload) + 4
+    prelude = struct.pack(">II", total_length, len(header_bytes))
+    message = prelude + struct.pack(">I", zlib.crc32(prelude)) + header_bytes + payload
+    return message + struct.pack(">I", zlib.crc32(message))
+
+
+def event(event_type: str, body: dict) -> bytes:
+    return encode_event(
+        {":event-type": event_type, ":content-type": "application/json", ":message-type": "event"},
+        json.dumps(body).encode(),
+    )
+
+
+def exception_event(exception_type: str, message: str) -> bytes:
+    return encode_event(
+        {":exception-type": exception_type, ":content-type": "application/json", ":message-type": "exception"},
+        json.dumps({"message": message}).encode(),
+    )
+
+
+# --- Responses ---
+
+def anthropic_usage(prompt: PromptUsage, output_tokens: int) -> dict:
+    return {
+        "input_tokens": prompt.input_tokens,
+        "cache_read_input_tokens": prompt.cache_read_input_tokens,
+        "cache_creation_input_tokens": prompt.cache_write_input_tokens,
+        "output_tokens": output_tokens,
+    }
+
+
+def invoke_response(prompt: PromptUsage, text: str) -> dict:
+    return {
+        "id": f"msg_{uuid.uuid4().hex}",
+        "type": "message",
+        "role": "assistant",
+        "content": [{"type": "text", "text": text}],
+        "stop_reason": "end_turn",
+        "usage": anthropic_usage(prompt, estimate_tokens(text)),
+    }
+
+
+def invoke_stream_events(prompt: PromptUsage, chunks: List[str]) -> Iterator[dict]:
+    """Anthropic streaming events, as carried in InvokeModelWithResponseStream chunks."""
+    yield {
+        "type": "message_start",
+        "message": {
+            "id": f"msg_{uuid.uuid4().hex}",
+            "type": "message",
+            "role": "assistant",
+            "content": [],
+            "usage": anthropic_usage(prompt, 1),
+        },
+    }
+    yield {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}}
+    for chunk in chunks:
+        yield {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": chunk}}
+    yield {"type": "content_block_stop", "index": 0}
+    yield {
+        "type": "message_delta",
+        "delta": {"stop_reason": "end_turn"},
+        "usage": {"output_tokens": estimate_tokens("".join(chunks))},
+    }
+    yield {"type": "message_stop"}
+
+
+def _converse_tool(request: dict) -> Optional[dict]:
+    """The tool spec a Converse request forces (structured output), if any."""
+    tool_config = request.get("toolConfig") or {}
+    choice = tool_config.get("toolChoice") or {}
+    tools = [t["toolSpec"] for t in tool_config.get("tools", []) if "toolSpec" in t]
+    if "tool" in choice:
+        return next((t for t in tools if t["name"] == choice["tool"]["name"]), None)
+    if "any" in choice and tools:
+        return tools[0]
+    return None
+
+
+def converse_content(request: dict, step: Dict[str, Any]) -> tuple:
+    """(content blocks, stop reason) for a Converse request."""
+    tool = _converse_tool(request)
+    if tool is None:
+        return [{"text": step["text"]}], "end_turn"
+    tool_input = step.get("tool_input") or example_from_schema(tool.get("inputSchema", {}).get("json", {}))
+    return [{"toolUse": {"toolUseId": f"tooluse_{uuid.uuid4().hex}", "name": tool["name"], "input": tool_input}}], "tool_use"
+
+
+def converse_usage(prompt: PromptUsage, content: List[dict], latency: float) -> dict:
+    output_tokens = estimate_tokens(json.dumps(content))
+    return {
+        "usage": {
+            "inputTokens": prompt.input_tokens,
+            "outputTokens": output_tokens,
+            "totalTokens": sum(prompt) + output_tokens,
+            "cacheReadInputTokens": prompt.cache_read_input_tokens,
+            "cacheWriteInputTokens": prompt.cache_write_input_tokens,
+        },
+        "metrics": {"latencyMs": int(latency * 1000)},
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "FakeBedrockServer"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        if self.path == "/_stats":
+            self._send_json(200, self.server.fake.stats)
+        else:
+            self._send_error(404, "UnknownOperationException", self.path)
+
+    def do_POST(self) -> None:
+        fake = self.server.fake
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        parts = self.path.split("/")
+        if len(parts) != 4 or parts[1] != "model":
+            self._send_error(404, "UnknownOperationException", self.path)
+            return
+        operation = parts[3]
+        model_id = unquote(parts[2])
+        fake.count(operation)
+
+        step = fake.next_step()
+        time.sleep(step["latency"])
+        if step.get("fault"):
+            status, code = FAULTS[step["fault"]]
+            fake.count(step["fault"])
+            self._send_error(status, code, f"Injected {code} for {model_id}")
+            return
+
+        if operation.startswith("invoke"):
+            prompt = fake.prompt_usage(model_id, anthropic_segments(request))
+        else:
+            prompt = fake.prompt_usage(model_id, converse_segments(request))
+
+        if operation == "invoke":
+            self._send_json(200, invoke_response(prompt, step["text"]))
+        elif operation == "converse":
+            content, stop_reason = converse_content(request, step)
+            self._send_json(200, {
+                "output": {"message": {"role": "assistant", "content": content}},
+                "stopReason": stop_reason,
+                **converse_usage(prompt, content, step["latency"]),
+            })
+        elif operation == "invoke-with-response-stream":
+            chunks = list(fake.chunks(step["text"]))
+            events = (
+                event("chunk", {"bytes": base64.b64encode(json.dumps(e).encode()).decode()})
+                for e in invoke_stream_events(prompt, chunks)
+            )
+            self._stream(events, step["break_stream"])
+        elif operation == "converse-stream":
+            self._stream(self._converse_stream_events(request, prompt, step), step["break_stream"])
+        else:
+            self._send_error(404, "UnknownOperationException", operation)
+
+    def _converse_stream_events(self, request: dict, prompt: PromptUsage, step: Dict[str, Any]) -> Iterator[bytes]:
+        content, stop_reason = converse_content(request, step)
+        yield event("messageStart", {"role": "assistant"})
+        block = content[0]
+        if "toolUse" in block:
+            tool_use = block["toolUse"]
+            yield event("contentBlockStart", {
+                "contentBlockIndex": 0,
+                "start": {"toolUse": {"toolUseId": tool_use["toolUseId"], "name": tool_use["name"]}},
+            })
+            yield event("contentBlockDelta", {
+                "contentBlockIndex": 0, "delta": {"toolUse": {"input": json.dumps(tool_use["input"])}},
+            })
+        else:
+            for chunk in self.server.fake.chunks(block["text"]):
+                yield event("contentBlockDelta", {"contentBlockIndex": 0, "delta": {"text": chunk}})
+        yield event("contentBlockStop", {"contentBlockIndex": 0})
+        yield event("messageStop", {"stopReason": stop_reason})
+        yield event("metadata", converse_usage(prompt, content, step["latency"]))
+
+    def _stream(self, events: Iterator[bytes], break_stream: bool) -> None:
+        messages = list(events)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/vnd.amazon.eventstream")
+        self.send_header("x-amzn-RequestId", str(uuid.uuid4()))
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        cut = len(messages) // 2 if break_stream else len(messages)
+        for message in messages[:cut]:
+            self._write_chunk(message)
+            time.sleep(self.server.fake.chunk_delay())
+        if break_stream:
+            self.server.fake.count("stream_failure")
+            self._write_chunk(exception_event("modelStreamErrorException", "Injected mid-stream failure"))
+        self._write_chunk(b"")
+
+    def _write_chunk(self, data: bytes) -> None:
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _send_json(self, status: int, body: Any) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("x-amzn-RequestId", str(uuid.uuid4()))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_error(self, status: int, code: str, message: str) -> None:
+        payload = json.dumps({"message": message}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("x-amzn-ErrorType", code)
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class FakeBedrockServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server for the fake. Use it as a context manager to run it on a
+    background thread, for example from a benchmark:
+
+        with FakeBedrockServer(FakeBedrockConfig(throttle_rate=0.2)) as server:
+            os.environ["BEDROCK_ENDPOINT_URL"] = server.url
+    """
+
+    daemon_threads = True
+
+    def __init__(self, config: FakeBedrockConfig, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), _Handler)
+        self.fake = FakeBedrock(config)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "FakeBedrockServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="fake-bedrock", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--latency", type=Latency.parse, default=Latency(),
+                        help="Time to first byte: fixed:S, uniform:A,B, normal:M,SD, lognormal:MEDIAN,SIGMA or exponential:MEAN")
+    parser.add_argument("--chunk-interval", type=Latency.parse, default=Latency("fixed", [0.02]),
+                        help="Delay between streamed chunks, same syntax as --latency")
+    parser.add_argument("--text", default=DEFAULT_TEXT, help="Canned response text")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests rejected with ThrottlingException")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failed with InternalServerException")
+    parser.add_argument("--stream-failure-rate", type=float, default=0.0, help="Fraction of streams broken off halfway")
+    parser.add_argument("--script", help="JSON file with a list of scripted responses, replayed in order")
+    parser.add_argument("--prompt-cache-min-tokens", type=int, default=1024,
+                        help="Shortest prefix a prompt-cache checkpoint applies to")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    script = []
+    if args.script:
+        with open(args.script) as f:
+            script = json.load(f)
+    config = FakeBedrockConfig(
+        latency=args.latency,
+        chunk_interval=args.chunk_interval,
+        text=args.text,
+        throttle_rate=args.throttle_rate,
+        error_rate=args.error_rate,
+        stream_failure_rate=args.stream_failure_rate,
+        script=script,
+        prompt_cache_min_tokens=args.prompt_cache_min_tokens,
+        seed=args.seed,
+    )
+    server = FakeBedrockServer(config, args.host, args.port)
+    print(f"Fake bedrock-runtime listening on {server.url} (stats at {server.url}/_stats)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
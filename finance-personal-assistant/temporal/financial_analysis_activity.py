@@ -1,11 +1,14 @@
 # Export financial analysis agent to standalone Python file
 
 from temporalio import activity
+from temporalio.exceptions import CancelledError
 
-import yfinance as yf
-from strands import Agent, tool
-from typing import List
-from strands.models import BedrockModel
+from .agent_models import get_bedrock_model
+from .agent_pool import AgentPool
+from .models import FinancialAnalysisResult
+from .rate_limiter import bedrock_application_error
+from .telemetry import ToolMetricsHook
+from .usage import track_usage
 
 # Financial Analysis Agent System Prompt
 FINANCIAL_ANALYSIS_PROMPT = """You are a specialized financial analysis agent focused on investment research and portfolio recommendations. Your role is to:
@@ -14,140 +17,76 @@ FINANCIAL_ANALYSIS_PROMPT = """You are a specialized financial analysis agent fo
 2. Create diversified investment portfolios
 3. Provide data-driven investment recommendations
 
+Use the analyze_portfolio tool for portfolio return, risk and efficient-frontier figures rather than computing them yourself.
+
 You do not provide specific investment advice but rather present analytical data to help users make informed decisions. Always include disclaimers about market risks and the importance of consulting financial advisors."""
 
-bedrock_model = BedrockModel(
-    model_id="us.anthropic.claude-3-7-sonnet-20250219-v1:0",
-    region_name="us-west-2",
-    temperature=0.0,  # Deterministic responses for financial advice
-)
-
-
-# Tool 1: Get Stock Analysis
-@tool
-def get_stock_analysis(symbol: str) -> str:
-    """Get comprehensive analysis for a specific stock symbol."""
-    try:
-        stock = yf.Ticker(symbol)
-        info = stock.info
-        hist = stock.history(period="1y")
-
-        # Calculate key metrics
-        current_price = hist["Close"].iloc[-1]
-        year_high = hist["High"].max()
-        year_low = hist["Low"].min()
-        avg_volume = hist["Volume"].mean()
-        price_change = (
-            (current_price - hist["Close"].iloc[0]) / hist["Close"].iloc[0]
-        ) * 100
-
-        return f"""
-📊 Stock Analysis for {symbol.upper()}:
-• Current Price: ${current_price:.2f}
-• 52-Week High: ${year_high:.2f}
-• 52-Week Low: ${year_low:.2f}
-• Year-to-Date Change: {price_change:.2f}%
-• Average Daily Volume: {avg_volume:,.0f} shares
-• Company: {info.get("longName", "N/A")}
-• Sector: {info.get("sector", "N/A")}
-"""
-    except Exception as e:
-        return f"❌ Unable to retrieve data for {symbol}: {str(e)}"
-
-
-# Tool 2: Create Diversified Portfolio
-@tool
-def create_diversified_portfolio(risk_level: str, investment_amount: float) -> str:
-    """Create a diversified portfolio based on risk level (conservative, moderate, aggressive) and investment amount."""
-
-    portfolios = {
-        "conservative": {
-            "stocks": ["AAPL", "MSFT", "JNJ", "PG", "KO"],
-            "weights": [0.25, 0.25, 0.20, 0.15, 0.15],
-            "description": "Focus on large-cap, dividend-paying stocks",
-        },
-        "moderate": {
-            "stocks": ["AAPL", "GOOGL", "AMZN", "TSLA", "NVDA"],
-            "weights": [0.30, 0.25, 0.20, 0.15, 0.10],
-            "description": "Balanced mix of growth and stability",
-        },
-        "aggressive": {
-            "stocks": ["TSLA", "NVDA", "AMZN", "GOOGL", "META"],
-            "weights": [0.30, 0.25, 0.20, 0.15, 0.10],
-            "description": "High-growth potential stocks",
-        },
-    }
-
-    if risk_level.lower() not in portfolios:
-        return "❌ Risk level must be: conservative, moderate, or aggressive"
-
-    portfolio = portfolios[risk_level.lower()]
-
-    result = f"""
-🎯 {risk_level.upper()} Portfolio Recommendation (${investment_amount:,.0f}):
-{portfolio["description"]}
-
-Portfolio Allocation:
-"""
-
-    for stock, weight in zip(portfolio["stocks"], portfolio["weights"]):
-        allocation = investment_amount * weight
-        result += f"• {stock}: {weight * 100:.0f}% (${allocation:,.0f})\n"
-
-    result += "\n⚠️ Disclaimer: This is for educational purposes only. Consult a financial advisor before investing."
-    return result
-
-
-# Tool 3: Compare Stock Performance
-@tool
-def compare_stock_performance(symbols: List[str], period: str = "1y") -> str:
-    """Compare performance of multiple stocks over a specified period (1y, 6m, 3m, 1m)."""
-    if len(symbols) > 5:
-        return "❌ Please limit comparison to 5 stocks maximum"
-
-    try:
-        performance_data = {}
-
-        for symbol in symbols:
-            stock = yf.Ticker(symbol)
-            hist = stock.history(period=period)
-            if not hist.empty:
-                start_price = hist["Close"].iloc[0]
-                end_price = hist["Close"].iloc[-1]
-                performance = ((end_price - start_price) / start_price) * 100
-                performance_data[symbol] = performance
-
-        result = f"📈 Stock Performance Comparison ({period}):\n"
-        sorted_stocks = sorted(
-            performance_data.items(), key=lambda x: x[1], reverse=True
-        )
-
-        for stock, performance in sorted_stocks:
-            result += f"• {stock}: {performance:+.2f}%\n"
-
-        return result
-
-    except Exception as e:
-        return f"❌ Error comparing stocks: {str(e)}"
-
-
-# Create the Financial Analysis Agent
-financial_analysis_agent = Agent(
-    model=bedrock_model,  # Using the same bedrock_model from Step 1
-    system_prompt=FINANCIAL_ANALYSIS_PROMPT,
-    tools=[get_stock_analysis, create_diversified_portfolio, compare_stock_performance],
-    callback_handler=None,
-)
+
+def heartbeat_callback_handler(**_kwargs) -> None:
+    """
+    Strands callback handler that heartbeats on every streamed agent event.
+
+    The agent loop gives the activity no other point to notice a cancellation, so a
+    cancelled analysis (such as a discarded speculative one) stops at the next event
+    instead of running to completion.
+    """
+    if not activity.in_activity():
+        return
+    activity.heartbeat()
+    if activity.is_cancelled():
+        raise CancelledError("Financial analysis activity cancelled")
+
+
+def create_financial_analysis_agent():
+    """Create the Financial Analysis Agent. Strands and the tools are imported on first use."""
+    from strands import Agent
+    from .financial_analysis_tools import (
+        analyze_portfolio_tool,
+        compare_stock_performance,
+        create_diversified_portfolio,
+        get_stock_analysis,
+    )
+
+    return Agent(
+        model=get_bedrock_model(
+            model_id="us.anthropic.claude-3-7-sonnet-20250219-v1:0",
+            region_name="us-west-2",
+            temperature=0.0,  # Deterministic responses for financial advice
+        ),
+        system_prompt=FINANCIAL_ANALYSIS_PROMPT,
+        tools=[get_stock_analysis, create_diversified_portfolio, compare_stock_performance, analyze_portfolio_tool],
+        callback_handler=heartbeat_callback_handler,
+        hooks=[ToolMetricsHook("financial_analysis")],
+    )
+
+
+# Each activity borrows its own agent, so concurrent requests never share history
+financial_analysis_agent_pool = AgentPool("financial_analysis", create_financial_analysis_agent)
 
 @activity.defn
-async def financial_analysis_activity(amount: float) -> str:
-    """Activity that uses the financial analysis agent to create a diversified portfolio and analyze stock performance."""
+def financial_analysis_activity(amount: float, risk_level: str = "moderate") -> FinancialAnalysisResult:
+    """
+    Activity that uses the financial analysis agent to create a diversified portfolio and analyze stock performance.
+
+    The agent loop is synchronous, so this runs on the worker's activity thread pool
+    rather than on the event loop.
+    """
     activity.logger.info("Financial Analysis Activity started")
 
-    response = financial_analysis_agent(
-        prompt=f"Create a moderate risk portfolio for {amount} per month and analyze Apple stock",
-    )
+    with financial_analysis_agent_pool.checkout() as financial_analysis_agent, track_usage() as usage:
+        try:
+            response = financial_analysis_agent(
+                prompt=f"Create a {risk_level} risk portfolio for {amount} per month and analyze Apple stock",
+            )
+        except Exception as e:
+            error = bedrock_application_error(e, financial_analysis_agent.model.rate_limiter)
+            if error:
+                raise error from e
+            raise
 
     response_text = response.message["content"][0]["text"]
     print(response_text)
-    return response_text
\ No newline at end of file
+    activity.logger.info(
+        f"✅ Financial Analysis Activity completed (pool: {financial_analysis_agent_pool.stats()}, usage: {usage})"
+    )
+    return FinancialAnalysisResult(text=response_text, usage=usage)
\ No newline at end of file
@@ -0,0 +1,103 @@
+"""Tools used by the financial analysis agent."""
+
+from typing import List
+
+from strands import tool
+from .market_data import get_market_data_store, performance_summary
+from .portfolio_analytics import PORTFOLIOS, analyze_portfolio
+
+
+# Tool 1: Get Stock Analysis
+@tool
+def get_stock_analysis(symbol: str) -> str:
+    """Get comprehensive analysis for a specific stock symbol."""
+    try:
+        store = get_market_data_store()
+        info = store.info(symbol)
+        hist = store.history(symbol, period="1y")
+
+        # Calculate key metrics
+        current_price = hist["Close"].iloc[-1]
+        year_high = hist["High"].max()
+        year_low = hist["Low"].min()
+        avg_volume = hist["Volume"].mean()
+        price_change = (
+            (current_price - hist["Close"].iloc[0]) / hist["Close"].iloc[0]
+        ) * 100
+
+        return f"""
+📊 Stock Analysis for {symbol.upper()}:
+• Current Price: ${current_price:.2f}
+• 52-Week High: ${year_high:.2f}
+• 52-Week Low: ${year_low:.2f}
+• Year-to-Date Change: {price_change:.2f}%
+• Average Daily Volume: {avg_volume:,.0f} shares
+• Company: {info.get("longName", "N/A")}
+• Sector: {info.get("sector", "N/A")}
+"""
+    except Exception as e:
+        return f"❌ Unable to retrieve data for {symbol}: {str(e)}"
+
+
+# Tool 2: Create Diversified Portfolio
+@tool
+def create_diversified_portfolio(risk_level: str, investment_amount: float) -> str:
+    """Create a diversified portfolio based on risk level (conservative, moderate, aggressive) and investment amount."""
+    if risk_level.lower() not in PORTFOLIOS:
+        return "❌ Risk level must be: conservative, moderate, or aggressive"
+
+    portfolio = PORTFOLIOS[risk_level.lower()]
+
+    result = f"""
+🎯 {risk_level.upper()} Portfolio Recommendation (${investment_amount:,.0f}):
+{portfolio["description"]}
+
+Portfolio Allocation:
+"""
+
+    for stock, weight in zip(portfolio["stocks"], portfolio["weights"]):
+        allocation = investment_amount * weight
+        result += f"• {stock}: {weight * 100:.0f}% (${allocation:,.0f})\n"
+
+    result += "\n⚠️ Disclaimer: This is for educational purposes only. Consult a financial advisor before investing."
+    return result
+
+
+# Tool 3: Compare Stock Performance
+@tool
+def compare_stock_performance(symbols: List[str], period: str = "1y") -> str:
+    """Compare performance, volatility and max drawdown of any number of stocks over a specified period (1y, 6m, 3m, 1m)."""
+    try:
+        # One batched fetch and one aligned price matrix for all symbols
+        closes = get_market_data_store().close_matrix(symbols, period=period)
+        summary = performance_summary(closes).sort_values("return_pct", ascending=False)
+
+        result = f"📈 Stock Performance Comparison ({period}):\n"
+        for stock, row in summary.iterrows():
+            result += (
+                f"• {stock}: {row.return_pct:+.2f}% "
+                f"(volatility {row.volatility_pct:.1f}%, max drawdown {row.max_drawdown_pct:.1f}%)\n"
+            )
+
+        missing = [symbol.upper() for symbol in symbols if symbol.upper() not in summary.index]
+        if missing:
+            result += f"⚠️ No data for: {', '.join(missing)}\n"
+
+        return result
+
+    except Exception as e:
+        return f"❌ Error comparing stocks: {str(e)}"
+
+
+# Tool 4: Portfolio Analytics
+@tool(name="analyze_portfolio")
+def analyze_portfolio_tool(risk_level: str, investment_amount: float, period: str = "1y") -> dict:
+    """Compute expected return, volatility, covariance, Sharpe ratio, max drawdown and an efficient frontier for the conservative, moderate or aggressive portfolio using historical prices over a period (1y, 6m, 3m, 1m)."""
+    if risk_level.lower() not in PORTFOLIOS:
+        return {"error": "Risk level must be: conservative, moderate, or aggressive"}
+
+    try:
+        closes = get_market_data_store().close_matrix(PORTFOLIOS[risk_level.lower()]["stocks"], period=period)
+        return analyze_portfolio(risk_level, investment_amount, closes).model_dump()
+    except Exception as e:
+        return {"error": f"Unable to analyze portfolio: {str(e)}"}
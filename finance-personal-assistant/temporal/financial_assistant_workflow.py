@@ -1,8 +1,38 @@
 
 import asyncio
 from datetime import timedelta, datetime
+from typing import Optional
 from temporalio import workflow
-from .models import FinancialReport, BedrockInvocationRequest
+from temporalio.common import RetryPolicy
+from temporalio.exceptions import ActivityError
+from .models import (
+    FinancialReport,
+    BedrockInvocationRequest,
+    BedrockInvocationResult,
+    BudgetAgentResult,
+    FinancialAnalysisResult,
+    FinancialAssistantOptions,
+    ModelUsage,
+    PartialReport,
+    ReportChunk,
+    SpeculationStats,
+    StepUsage,
+    UsageReport,
+)
+from .pricing import estimate_cost
+from .report_templates import render_financial_analysis, render_financial_report
+from .task_queues import AGENT_TASK_QUEUE, LLM_FORMAT_TASK_QUEUE, MARKET_DATA_TASK_QUEUE
+
+# Report steps in the order they appear in the final result
+REPORT_STEPS = ["budget_report", "financial_analysis"]
+
+# Retry policy for activities that call Bedrock. Throttled attempts carry their own
+# retry delay from the worker's rate limiter; invalid requests are never retried.
+BEDROCK_RETRY_POLICY = RetryPolicy(
+    initial_interval=timedelta(seconds=2),
+    maximum_interval=timedelta(seconds=60),
+    non_retryable_error_types=["ValidationException", "AccessDeniedException"],
+)
 
 @workflow.defn
 class FinancialAssistantWorkflow:
@@ -11,6 +41,15 @@ class FinancialAssistantWorkflow:
     def __init__(self):
         self.recommended_investment_amount: float | None = None
         self.requested_investment_amount: float | None = None
+        self.stage = "budget"
+        self.report_sections: dict[str, str] = {}
+        self.report_attempts: dict[str, int] = {}
+        self.speculation = SpeculationStats()
+        self.speculation_started_at: datetime | None = None
+        self.formatting_mode = "llm"
+        self.risk_level = "moderate"
+        self.market_data_refresh: Optional[asyncio.Task] = None
+        self.usage: dict[str, StepUsage] = {}
 
     @workflow.signal
     async def set_investment_amount(self, amount: float) -> None:
@@ -18,44 +57,145 @@ class FinancialAssistantWorkflow:
         self.requested_investment_amount = amount
         workflow.logger.info(f"✅ Received signal: requested_investment_amount set to {amount}")
 
+    @workflow.signal
+    def append_report_chunk(self, chunk: ReportChunk) -> None:
+        """Signal handler that appends streamed text to a report step."""
+        attempt = self.report_attempts.get(chunk.step, 0)
+        if chunk.attempt < attempt:
+            # Late signal from an attempt that has since been retried
+            return
+        if chunk.attempt > attempt:
+            # A retried attempt is a new completion, so its text replaces the partial text
+            self.report_attempts[chunk.step] = chunk.attempt
+            self.report_sections[chunk.step] = ""
+        current = self.report_sections.get(chunk.step, "")
+        # Within an attempt, keep only the text past what has already arrived
+        if chunk.offset <= len(current) < chunk.offset + len(chunk.text):
+            self.report_sections[chunk.step] = current + chunk.text[len(current) - chunk.offset:]
+
+    @workflow.query
+    def get_partial_report(self) -> PartialReport:
+        """Query handler to get the report text produced so far."""
+        text = "\n\n".join(
+            self.report_sections[step] for step in REPORT_STEPS if step in self.report_sections
+        )
+        return PartialReport(stage=self.stage, text=text)
+
     @workflow.query
     def get_recommended_investment_amount(self) -> float | None:
         """Query handler to get the recommended investment amount."""
         return self.recommended_investment_amount
 
+    @workflow.query
+    def get_speculation_stats(self) -> SpeculationStats:
+        """Query handler to get the outcome of the speculative financial analysis."""
+        return self.speculation
+
+    @workflow.query
+    def get_usage(self) -> UsageReport:
+        """Query handler to get tokens, latency and estimated cost per step."""
+        steps = list(self.usage.values())
+        return UsageReport(
+            steps=steps,
+            input_tokens=sum(step.input_tokens for step in steps),
+            output_tokens=sum(step.output_tokens for step in steps),
+            cache_read_input_tokens=sum(step.cache_read_input_tokens for step in steps),
+            cache_write_input_tokens=sum(step.cache_write_input_tokens for step in steps),
+            estimated_cost_usd=sum(step.estimated_cost_usd for step in steps),
+        )
+
     @workflow.run
-    async def run(self, prompt: str) -> str:
+    async def run(self, prompt: str, options: Optional[FinancialAssistantOptions] = None) -> str:
+        options = options or FinancialAssistantOptions()
+        self.formatting_mode = options.formatting_mode
+        self.risk_level = options.risk_level
         workflow.logger.info("🚀 Workflow started")
+
+        # If the amount came with the start, warm the market data while the budget agent
+        # runs; otherwise the refresh starts with the first analysis
+        if self.requested_investment_amount:
+            self._start_market_data_refresh()
         
         # First, execute the budget agent activity
-        budget_result = await workflow.execute_activity(
+        started = workflow.now()
+        budget_result: BudgetAgentResult = await workflow.execute_activity(
             "budget_agent_activity",
             args=[prompt],
+            task_queue=AGENT_TASK_QUEUE,
             start_to_close_timeout=timedelta(seconds=10),
+            retry_policy=BEDROCK_RETRY_POLICY,
+            result_type=BudgetAgentResult,
         )
+        self._record_usage("budget_agent", budget_result.usage, started)
         workflow.logger.info("✅ Budget agent activity completed")
-        
-        # Reconstruct FinancialReport from dict (Temporal deserializes Pydantic models to dicts)
-        if isinstance(budget_result, dict):
-            financial_report = FinancialReport(**budget_result)
-        else:
-            financial_report = budget_result
+        financial_report = budget_result.report
         
         # Store the recommended investment amount in local state
         self.recommended_investment_amount = financial_report.recommended_investment_amount
         workflow.logger.info(f"✅ Stored recommended_investment_amount: {self.recommended_investment_amount}")
         
+        self.stage = "formatting_budget"
+        if self.formatting_mode == "template":
+            # Render locally instead of making a second LLM round trip
+            formatted_result = render_financial_report(financial_report)
+            self.report_sections["budget_report"] = formatted_result
+        else:
+            formatted_result = await self._format_budget_report(financial_report)
+
+        # Speculatively analyze the recommended amount while the user decides
+        speculation: Optional[asyncio.Task] = None
+        if (
+            options.speculative_analysis
+            and self.requested_investment_amount is None
+            and self.recommended_investment_amount
+            and self.recommended_investment_amount > 0
+        ):
+            self.speculation = SpeculationStats(speculated=True, amount=self.recommended_investment_amount)
+            self.speculation_started_at = workflow.now()
+            speculation = asyncio.create_task(self._speculate(self.recommended_investment_amount))
+            workflow.logger.info(f"🔮 Speculatively analyzing recommended amount {self.recommended_investment_amount}")
+
+        # Wait for requested_investment_amount to be set via signal
+        self.stage = "awaiting_investment_amount"
+        workflow.logger.info("⏳ Waiting for requested_investment_amount signal...")
+        await workflow.wait_condition(lambda: self.requested_investment_amount is not None)
+        workflow.logger.info(f"✅ Received requested_investment_amount: {self.requested_investment_amount}")
+
+        financial_analysis_formatted_result = None
+        if speculation is not None:
+            self.stage = "analysis"
+            financial_analysis_formatted_result = await self._resolve_speculation(speculation)
+
+        if self.requested_investment_amount > 0:
+            if financial_analysis_formatted_result is None:
+                self.stage = "analysis"
+                financial_analysis_formatted_result = await self._analyze(
+                    self.requested_investment_amount, report_step="financial_analysis"
+                )
+            else:
+                self.report_sections["financial_analysis"] = financial_analysis_formatted_result
+
+            result = f"{formatted_result}\n\n{financial_analysis_formatted_result}"
+        else:
+            result = formatted_result
+        self.stage = "completed"
+        workflow.logger.info("✅ Workflow finished")
+        
+        return result
+
+    async def _format_budget_report(self, financial_report: FinancialReport) -> str:
+        """Format the budget report with the streaming LLM activity."""
         # Convert FinancialReport to JSON string using Pydantic's built-in method
         report_json = financial_report.model_dump_json(indent=2)
-        
+
         # Define system prompt for formatting
         system_prompt = "You are a helpful assistant that formats financial reports in a clear, professional, and easy-to-read format."
-        
+
         # Create user prompt with the financial report data
         user_prompt = f"""Please format the following financial report data into clear, readable text:
 
 {report_json}"""
-        
+
         # Create Bedrock invocation request with separated system prompt and user prompt
         bedrock_request = BedrockInvocationRequest(
             prompt=user_prompt,
@@ -63,49 +203,178 @@ class FinancialAssistantWorkflow:
             model_id="us.anthropic.claude-3-7-sonnet-20250219-v1:0",
             region_name="us-west-2",
             max_tokens=2000,
+            temperature=0.0,
+            use_cache=True,
+            report_step="budget_report",
         )
-        
-        # Then, format the result using the generic LLM activity
-        formatted_result = await workflow.execute_activity(
-            "invoke_bedrock_model",
-            args=[bedrock_request],
+
+        # Then, format the result using the streaming LLM activity
+        formatted_result = await self._stream_format(bedrock_request)
+        workflow.logger.info("✅ LLM format activity for the budget report completed")
+        return formatted_result
+
+    async def _analyze(self, amount: float, report_step: Optional[str]) -> str:
+        """
+        Run the financial analysis for an amount and format it. With a report_step the
+        formatted text is streamed into that report section; without one it is not
+        published until the caller decides to use it.
+        """
+        self._start_market_data_refresh()
+        try:
+            # Shielded so that cancelling a speculative analysis does not cancel the
+            # refresh the rerun for the requested amount still waits on
+            await asyncio.shield(self.market_data_refresh)
+        except ActivityError as e:
+            # The agent's tools fetch whatever is missing themselves
+            workflow.logger.warning(f"⚠️ Market data refresh failed: {e}")
+
+        # Speculative work is accounted separately: it costs tokens even when discarded
+        step_prefix = "" if report_step else "speculative_"
+        started = workflow.now()
+        analysis: FinancialAnalysisResult = await workflow.execute_activity(
+            "financial_analysis_activity",
+            args=[amount, self.risk_level],
+            task_queue=AGENT_TASK_QUEUE,
             start_to_close_timeout=timedelta(seconds=30),
+            # The agent heartbeats on every streamed event, which is how a cancelled
+            # speculative analysis learns that it should stop
+            heartbeat_timeout=timedelta(seconds=10),
+            retry_policy=BEDROCK_RETRY_POLICY,
+            result_type=FinancialAnalysisResult,
         )
-        workflow.logger.info("✅ LLM format activity for the budget report completed")
+        self._record_usage(f"{step_prefix}financial_analysis_agent", analysis.usage, started)
+        workflow.logger.info("✅ Financial analysis activity completed")
+        financial_analysis_result = analysis.text
 
-        # Wait for requested_investment_amount to be set via signal
-        workflow.logger.info("⏳ Waiting for requested_investment_amount signal...")
-        await workflow.wait_condition(lambda: self.requested_investment_amount is not None)
-        workflow.logger.info(f"✅ Received requested_investment_amount: {self.requested_investment_amount}")
+        if self.formatting_mode == "template":
+            formatted = render_financial_analysis(financial_analysis_result)
+            if report_step:
+                self.report_sections[report_step] = formatted
+            return formatted
 
-        if self.requested_investment_amount > 0:
-            financial_analysis_result = await workflow.execute_activity(
-                "financial_analysis_activity",
-                args=[self.requested_investment_amount],
-                start_to_close_timeout=timedelta(seconds=30),
-            )
-            workflow.logger.info("✅ Financial analysis activity completed")
-
-            # Create Bedrock invocation request with separated system prompt and user prompt
-            bedrock_request = BedrockInvocationRequest(
-                prompt=financial_analysis_result,
-                system_prompt="You are a helpful assistant that formats financial analysis results in a clear, professional, and easy-to-read format.",
-                model_id="us.anthropic.claude-3-7-sonnet-20250219-v1:0",
-                region_name="us-west-2",
-                max_tokens=2000,
-            )
-            
-            # Then, format the result using the generic LLM activity
-            financial_analysis_formatted_result = await workflow.execute_activity(
+        # Create Bedrock invocation request with separated system prompt and user prompt
+        bedrock_request = BedrockInvocationRequest(
+            prompt=financial_analysis_result,
+            system_prompt="You are a helpful assistant that formats financial analysis results in a clear, professional, and easy-to-read format.",
+            model_id="us.anthropic.claude-3-7-sonnet-20250219-v1:0",
+            region_name="us-west-2",
+            max_tokens=2000,
+            report_step=report_step,
+        )
+
+        # Then, format the result using the generic LLM activity
+        if report_step:
+            self.stage = "formatting_analysis"
+            formatted = await self._stream_format(bedrock_request)
+        else:
+            started = workflow.now()
+            result: BedrockInvocationResult = await workflow.execute_activity(
                 "invoke_bedrock_model",
                 args=[bedrock_request],
+                task_queue=LLM_FORMAT_TASK_QUEUE,
                 start_to_close_timeout=timedelta(seconds=30),
+                retry_policy=BEDROCK_RETRY_POLICY,
+                result_type=BedrockInvocationResult,
             )
-            workflow.logger.info("✅ LLM format activity for the budget report completed")
+            self._record_result_usage(f"{step_prefix}financial_analysis", result, started)
+            formatted = result.text
+        workflow.logger.info("✅ LLM format activity for the financial analysis completed")
+        return formatted
 
-            result = f"{formatted_result}\n\n{financial_analysis_formatted_result}"
-        else:
-            result = formatted_result
-        workflow.logger.info("✅ Workflow finished")
-        
-        return result
\ No newline at end of file
+    def _start_market_data_refresh(self) -> None:
+        """Start warming the market data for the analysis's portfolio, once per run."""
+        if self.market_data_refresh is None:
+            self.market_data_refresh = workflow.start_activity(
+                "refresh_market_data",
+                args=[self.risk_level],
+                task_queue=MARKET_DATA_TASK_QUEUE,
+                start_to_close_timeout=timedelta(seconds=60),
+                retry_policy=RetryPolicy(maximum_attempts=2),
+            )
+
+    async def _speculate(self, amount: float) -> tuple[str, datetime]:
+        """Speculative analysis; also returns when it finished so the saving can be measured."""
+        formatted = await self._analyze(amount, report_step=None)
+        return formatted, workflow.now()
+
+    async def _resolve_speculation(self, speculation: asyncio.Task) -> Optional[str]:
+        """
+        Use the speculative analysis if the user confirmed the speculated amount, otherwise
+        cancel it. Returns the formatted analysis, or None if it has to be rerun.
+        """
+        answered_at = workflow.now()
+        meter = workflow.metric_meter()
+        if self.requested_investment_amount != self.speculation.amount:
+            speculation.cancel()
+            try:
+                await speculation
+            except (asyncio.CancelledError, ActivityError):
+                pass
+            self.speculation.hit = False
+            meter.create_counter("financial_assistant_speculation_misses", "Speculative analyses discarded").add(1)
+            workflow.logger.info("🔮 Speculation missed; rerunning analysis for the requested amount")
+            return None
+
+        try:
+            formatted, finished_at = await speculation
+        except ActivityError as e:
+            workflow.logger.warning(f"🔮 Speculative analysis failed, rerunning: {e}")
+            return None
+
+        # The analysis is used, so its usage is the analysis step's rather than wasted speculation
+        for step in ("financial_analysis_agent", "financial_analysis"):
+            speculative = self.usage.pop(f"speculative_{step}", None)
+            if speculative is not None:
+                self.usage[step] = speculative.model_copy(update={"step": step})
+
+        saved = (min(answered_at, finished_at) - self.speculation_started_at).total_seconds()
+        self.speculation.hit = True
+        self.speculation.latency_saved_seconds = saved
+        meter.create_counter("financial_assistant_speculation_hits", "Speculative analyses reused").add(1)
+        meter.create_histogram_timedelta(
+            "financial_assistant_speculation_latency_saved", "Analysis time saved by speculation"
+        ).record(timedelta(seconds=saved))
+        workflow.logger.info(f"🔮 Speculation hit; saved {saved:.1f}s")
+        return formatted
+
+    async def _stream_format(self, bedrock_request: BedrockInvocationRequest) -> str:
+        """Format text with the streaming LLM activity and record the final section text."""
+        started = workflow.now()
+        result: BedrockInvocationResult = await workflow.execute_activity(
+            "invoke_bedrock_model_streaming",
+            args=[bedrock_request],
+            task_queue=LLM_FORMAT_TASK_QUEUE,
+            start_to_close_timeout=timedelta(seconds=60),
+            retry_policy=BEDROCK_RETRY_POLICY,
+            heartbeat_timeout=timedelta(seconds=15),
+            result_type=BedrockInvocationResult,
+        )
+        self._record_result_usage(bedrock_request.report_step, result, started)
+        self.report_sections[bedrock_request.report_step] = result.text
+        return result.text
+
+    def _record_result_usage(self, step: str, result: BedrockInvocationResult, started: datetime) -> None:
+        """Record an invocation's usage, and any summary call's usage under its own step and model."""
+        self._record_usage(step, result.usage, started)
+        if result.summary_usage is not None:
+            # The summary's time is already part of the invocation step's duration
+            self._record_usage(f"{step}_summary", result.summary_usage, workflow.now())
+
+    def _record_usage(self, step: str, usage: ModelUsage, started: datetime) -> None:
+        """Add an activity's usage and the step's elapsed time to the step's totals."""
+        totals = self.usage.setdefault(step, StepUsage(step=step))
+        totals.model_id = usage.model_id or totals.model_id
+        totals.model_calls += usage.model_calls
+        totals.input_tokens += usage.input_tokens
+        totals.output_tokens += usage.output_tokens
+        totals.cache_read_input_tokens += usage.cache_read_input_tokens
+        totals.cache_write_input_tokens += usage.cache_write_input_tokens
+        totals.model_latency_seconds += usage.latency_seconds
+        totals.duration_seconds += (workflow.now() - started).total_seconds()
+        totals.estimated_cost_usd += estimate_cost(
+            usage.model_id,
+            usage.input_tokens,
+            usage.output_tokens,
+            usage.cache_read_input_tokens,
+            usage.cache_write_input_tokens,
+        )
\ No newline at end of file
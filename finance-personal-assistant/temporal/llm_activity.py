@@ -1,25 +1,84 @@
+import asyncio
 import json
-import boto3
+import os
+import threading
+import time
+from typing import Iterator, Optional
+
 from temporalio import activity
-from .models import BedrockInvocationRequest
+from temporalio.client import Client
+from .agent_models import BEDROCK_PROMPT_CACHING
+from .bedrock_client import get_bedrock_executor, get_bedrock_runtime_client, run_blocking
+from .llm_cache import cache_key, get_response_cache
+from .message_compaction import (
+    SUMMARY_MAX_TOKENS,
+    conversation_tokens,
+    first_kept_message,
+    prefix_keys,
+    summary_model_id,
+    summary_request,
+    token_budget,
+    with_summary,
+)
+from .models import (
+    BedrockInvocationRequest,
+    BedrockInvocationResult,
+    MessageCompaction,
+    ModelUsage,
+    ReportChunk,
+)
+from .rate_limiter import bedrock_application_error, estimate_tokens, get_rate_limiter
+from .telemetry import record_bedrock_call, record_cache_lookup, record_compaction
 
+# Partial-report signals are batched: one is sent once this much time has passed since
+# the previous one, or once this many new characters are waiting, whichever comes first
+STREAM_SIGNAL_INTERVAL_SECONDS = float(os.getenv("STREAM_SIGNAL_INTERVAL_SECONDS", "1.0"))
+STREAM_SIGNAL_MAX_CHARS = int(os.getenv("STREAM_SIGNAL_MAX_CHARS", "2000"))
 
-@activity.defn
-async def invoke_bedrock_model(request: BedrockInvocationRequest) -> str:
+
+def _invoke_model(bedrock_runtime, model_id: str, body: str) -> dict:
+    """Blocking invoke_model call plus body read; runs on the Bedrock executor."""
+    response = bedrock_runtime.invoke_model(
+        modelId=model_id,
+        contentType="application/json",
+        accept="application/json",
+        body=body
+    )
+    return json.loads(response['body'].read())
+
+
+def _iter_stream_text(bedrock_runtime, model_id: str, body: str, usage: dict) -> Iterator[str]:
     """
-    Generic activity that invokes a Bedrock model with a prompt.
-    
-    Args:
-        request: BedrockInvocationRequest containing prompt/messages, system prompt, and model configuration
-        
-    Returns:
-        The model's response as a string
+    Blocking iterator over the text deltas of invoke_model_with_response_stream.
+    Token counts from the message_start and message_delta events are stored in `usage`.
     """
-    activity.logger.info(f"Invoking Bedrock model: {request.model_id}")
-    
-    # Initialize Bedrock runtime client
-    bedrock_runtime = boto3.client('bedrock-runtime', region_name=request.region_name)
-    
+    response = bedrock_runtime.invoke_model_with_response_stream(
+        modelId=model_id,
+        contentType="application/json",
+        accept="application/json",
+        body=body
+    )
+    try:
+        for event in response['body']:
+            chunk = event.get('chunk')
+            if not chunk:
+                continue
+            payload = json.loads(chunk['bytes'])
+            if payload.get('type') == 'message_start':
+                usage.update(payload.get('message', {}).get('usage', {}))
+            elif payload.get('type') == 'message_delta':
+                usage.update(payload.get('usage', {}))
+            elif payload.get('type') == 'content_block_delta':
+                delta = payload.get('delta', {})
+                if delta.get('type') == 'text_delta':
+                    yield delta.get('text', '')
+    finally:
+        # Release the connection when the reader stops early
+        response['body'].close()
+
+
+def build_request_body(request: BedrockInvocationRequest) -> dict:
+    """Build the Anthropic messages request body for a BedrockInvocationRequest."""
     # Build messages array
     if request.messages:
         # Use provided messages (conversation history)
@@ -45,45 +104,382 @@ async def invoke_bedrock_model(request: BedrockInvocationRequest) -> str:
         ]
     else:
         raise ValueError("Either 'prompt' or 'messages' must be provided")
-    
+
     # Prepare the request body for Claude models
     request_body = {
         "anthropic_version": "bedrock-2023-05-31",
         "max_tokens": request.max_tokens,
         "messages": messages
     }
-    
-    # Add system prompt if provided
-    if request.system_prompt:
+
+    # Add system prompt if provided, as a prompt-cache checkpoint if requested
+    cache_system_prompt = (
+        BEDROCK_PROMPT_CACHING if request.cache_system_prompt is None else request.cache_system_prompt
+    )
+    if request.system_prompt and cache_system_prompt:
+        request_body["system"] = [
+            {"type": "text", "text": request.system_prompt, "cache_control": {"type": "ephemeral"}}
+        ]
+    elif request.system_prompt:
         request_body["system"] = request.system_prompt
-    
+
     # Add temperature if provided
     if request.temperature is not None:
         request_body["temperature"] = request.temperature
-    
+
+    return request_body
+
+
+def _model_usage(model_id: str, usage: dict, latency_seconds: float) -> ModelUsage:
+    """ModelUsage for one call from the Anthropic `usage` block."""
+    return ModelUsage(
+        model_id=model_id,
+        model_calls=1,
+        input_tokens=usage.get('input_tokens', 0),
+        output_tokens=usage.get('output_tokens', 0),
+        cache_read_input_tokens=usage.get('cache_read_input_tokens') or 0,
+        cache_write_input_tokens=usage.get('cache_creation_input_tokens') or 0,
+        latency_seconds=latency_seconds,
+    )
+
+
+def reserved_tokens(request: BedrockInvocationRequest, body: str) -> int:
+    """Tokens to reserve for a call: the estimated input plus the full output allowance."""
+    return estimate_tokens(body) + request.max_tokens
+
+
+async def _summarize(request: BedrockInvocationRequest) -> tuple[str, ModelUsage]:
+    """Rate-limited invoke_model call for a rolling summary."""
+    bedrock_runtime = get_bedrock_runtime_client(request.region_name)
+    body = json.dumps(build_request_body(request))
+    limiter = get_rate_limiter(request.model_id, request.region_name)
+    reserved = reserved_tokens(request, body)
+    await limiter.acquire_async(reserved)
     try:
-        # Invoke the model
-        response = bedrock_runtime.invoke_model(
-            modelId=request.model_id,
-            contentType="application/json",
-            accept="application/json",
-            body=json.dumps(request_body)
+        started = time.monotonic()
+        response_body = await run_blocking(_invoke_model, bedrock_runtime, request.model_id, body)
+        latency = time.monotonic() - started
+    except Exception as e:
+        limiter.record_error(e)
+        raise
+    limiter.on_success()
+    usage = response_body.get('usage', {})
+    record_bedrock_call(
+        request.model_id,
+        "invoke_model",
+        latency,
+        usage.get('input_tokens'),
+        usage.get('output_tokens'),
+        usage.get('cache_read_input_tokens'),
+        usage.get('cache_creation_input_tokens'),
+    )
+    if usage:
+        limiter.settle(reserved, usage.get('input_tokens', 0) + usage.get('output_tokens', 0))
+    text = "".join(
+        block.get('text', '') for block in response_body.get('content', []) if block.get('type') == 'text'
+    )
+    return text.strip(), _model_usage(request.model_id, usage, latency)
+
+
+async def _rolling_summary(
+    request: BedrockInvocationRequest, dropped: list
+) -> tuple[str, Optional[ModelUsage]]:
+    """
+    Summary of the dropped messages, and the usage of the model call that wrote it (None
+    when it was cached). An earlier summary of a prefix of them is extended when found.
+    """
+    cache = get_response_cache()
+    keys = prefix_keys(dropped)
+
+    def lookup() -> tuple[int, Optional[str]]:
+        # The longest prefix of the dropped messages that already has a summary
+        for covered in range(len(keys), 0, -1):
+            summary = cache.get(keys[covered - 1])
+            if summary is not None:
+                return covered, summary
+        return 0, None
+
+    covered, previous = await run_blocking(lookup)
+    record_cache_lookup("message_summary", covered == len(keys))
+    if covered == len(keys):
+        return previous, None
+
+    model_id = summary_model_id(request.region_name)
+    if model_id is None:
+        activity.logger.warning(
+            f"No summary model for region {request.region_name}, summarizing with {request.model_id};"
+            " set MESSAGE_SUMMARY_MODEL_ID to a model available there"
         )
-        
-        # Parse the response
-        response_body = json.loads(response['body'].read())
-        
+        model_id = request.model_id
+    summary, usage = await _summarize(summary_request(request, previous, dropped[covered:], model_id))
+    await run_blocking(cache.put, keys[-1], summary)
+    return summary, usage
+
+
+async def compact_messages(
+    request: BedrockInvocationRequest,
+) -> tuple[BedrockInvocationRequest, Optional[MessageCompaction], Optional[ModelUsage]]:
+    """
+    Fit request.messages in the request's token budget before it is sent.
+
+    Returns the request to send, how it was compacted (None if it already fit) and the
+    usage of any summary call made along the way.
+    """
+    budget = token_budget(request)
+    if not request.messages or budget <= 0:
+        return request, None, None
+    tokens_before = conversation_tokens(request.system_prompt, request.messages)
+    if tokens_before <= budget:
+        return request, None, None
+
+    summarize = request.compaction == "summarize"
+    reserve = SUMMARY_MAX_TOKENS if summarize else 0
+    start = first_kept_message(request.system_prompt, request.messages, budget - reserve)
+    if start == 0:
+        return request, None, None
+
+    messages = request.messages[start:]
+    mode, summary_usage, summary_cached = "drop", None, False
+    if summarize:
+        try:
+            summary, summary_usage = await _rolling_summary(request, request.messages[:start])
+            messages = with_summary(messages, summary)
+            mode, summary_cached = "summarize", summary_usage is None
+        except Exception as e:
+            # Dropping the older turns still lets the call go ahead
+            activity.logger.warning(f"Summarizing older messages failed, dropping them instead: {e}")
+
+    tokens_after = conversation_tokens(request.system_prompt, messages)
+    compaction = MessageCompaction(
+        mode=mode,
+        messages_before=len(request.messages),
+        messages_after=len(messages),
+        tokens_before=tokens_before,
+        tokens_after=tokens_after,
+        tokens_saved=tokens_before - tokens_after,
+        summary_cached=summary_cached,
+    )
+    record_compaction(request.model_id, mode, compaction.tokens_saved)
+    activity.logger.info(
+        f"🗜️ Compacted {compaction.messages_before} messages to {compaction.messages_after} ({mode}),"
+        f" saving ~{compaction.tokens_saved} input tokens"
+    )
+    return request.model_copy(update={"messages": messages}), compaction, summary_usage
+
+
+@activity.defn
+async def invoke_bedrock_model(request: BedrockInvocationRequest) -> BedrockInvocationResult:
+    """
+    Generic activity that invokes a Bedrock model with a prompt.
+
+    Args:
+        request: BedrockInvocationRequest containing prompt/messages, system prompt, and model configuration
+
+    Returns:
+        The model's response and the tokens it used
+    """
+    activity.logger.info(f"Invoking Bedrock model: {request.model_id}")
+
+    if request.use_cache:
+        key = cache_key(request)
+        cached = await run_blocking(get_response_cache().get, key)
+        record_cache_lookup("llm_response", cached is not None)
+        if cached is not None:
+            activity.logger.info("✅ Bedrock model response served from cache")
+            return BedrockInvocationResult(
+                text=cached, usage=ModelUsage(model_id=request.model_id, cached=True)
+            )
+
+    # Fit the conversation in its token budget; the cache key above uses the original
+    request, compaction, summary_usage = await compact_messages(request)
+
+    # Reuse the process-wide Bedrock runtime client for this region
+    bedrock_runtime = get_bedrock_runtime_client(request.region_name)
+    body = json.dumps(build_request_body(request))
+    limiter = get_rate_limiter(request.model_id, request.region_name)
+    reserved = reserved_tokens(request, body)
+    await limiter.acquire_async(reserved)
+
+    try:
+        # Invoke the model off the event loop and parse the response
+        started = time.monotonic()
+        response_body = await run_blocking(
+            _invoke_model, bedrock_runtime, request.model_id, body
+        )
+        latency = time.monotonic() - started
+        limiter.on_success()
+        usage = response_body.get('usage', {})
+        record_bedrock_call(
+            request.model_id,
+            "invoke_model",
+            latency,
+            usage.get('input_tokens'),
+            usage.get('output_tokens'),
+            usage.get('cache_read_input_tokens'),
+            usage.get('cache_creation_input_tokens'),
+        )
+        if usage:
+            limiter.settle(reserved, usage.get('input_tokens', 0) + usage.get('output_tokens', 0))
+
         # Extract the text from Claude's response
         response_text = ""
         if 'content' in response_body:
             for content_block in response_body['content']:
                 if content_block.get('type') == 'text':
                     response_text += content_block.get('text', '')
-        
+
+        if request.use_cache:
+            await run_blocking(get_response_cache().put, key, response_text)
+
         activity.logger.info("✅ Bedrock model invocation completed")
-        return response_text
-        
+        return BedrockInvocationResult(
+            text=response_text,
+            usage=_model_usage(request.model_id, usage, latency),
+            compaction=compaction,
+            summary_usage=summary_usage,
+        )
+
     except Exception as e:
         activity.logger.error(f"Error invoking Bedrock model: {str(e)}")
+        limiter.record_error(e)
+        error = bedrock_application_error(e, limiter)
+        if error:
+            raise error from e
         raise
 
+
+class StreamingBedrockActivities:
+    """
+    Streaming Bedrock activities. They need a Temporal client so that partial text
+    can be pushed to the calling workflow as it is generated.
+    """
+
+    def __init__(self, client: Client):
+        self.client = client
+
+    @activity.defn
+    async def invoke_bedrock_model_streaming(self, request: BedrockInvocationRequest) -> BedrockInvocationResult:
+        """
+        Invoke a Bedrock model with invoke_model_with_response_stream.
+
+        When request.report_step is set, the text is sent to the calling workflow with
+        the append_report_chunk signal, batched by time and size. Bedrock streams cannot
+        be resumed, and a retried attempt produces a different completion, so a retry
+        starts the step over: its first signal is an empty reset chunk carrying the new
+        attempt number, and the workflow discards the text of earlier attempts.
+
+        Returns:
+            The model's full response and the tokens it used
+        """
+        info = activity.info()
+        activity.logger.info(f"Invoking Bedrock model (streaming): {request.model_id}")
+
+        # Reset even when the retry is served from the cache, which may hold a
+        # different completion than the earlier attempt streamed
+        if info.attempt > 1:
+            activity.logger.info(f"Restarting stream for attempt {info.attempt}")
+            await self._send_chunk(request, 0, "", reset=True)
+
+        if request.use_cache:
+            key = cache_key(request)
+            cached = await run_blocking(get_response_cache().get, key)
+            record_cache_lookup("llm_response", cached is not None)
+            if cached is not None:
+                await self._send_chunk(request, 0, cached)
+                activity.logger.info("✅ Bedrock model response served from cache")
+                return BedrockInvocationResult(
+                    text=cached, usage=ModelUsage(model_id=request.model_id, cached=True)
+                )
+
+        request, compaction, summary_usage = await compact_messages(request)
+        bedrock_runtime = get_bedrock_runtime_client(request.region_name)
+        body = json.dumps(build_request_body(request))
+        limiter = get_rate_limiter(request.model_id, request.region_name)
+        reserved = reserved_tokens(request, body)
+        await limiter.acquire_async(reserved)
+
+        # Pump the blocking event stream on the Bedrock executor into an asyncio queue
+        loop = asyncio.get_running_loop()
+        deltas: asyncio.Queue[Optional[str]] = asyncio.Queue()
+        usage: dict = {}
+        stop = threading.Event()
+
+        def pump() -> None:
+            try:
+                for delta in _iter_stream_text(bedrock_runtime, request.model_id, body, usage):
+                    if stop.is_set():
+                        break
+                    loop.call_soon_threadsafe(deltas.put_nowait, delta)
+            finally:
+                loop.call_soon_threadsafe(deltas.put_nowait, None)
+
+        started = time.monotonic()
+        pump_future = loop.run_in_executor(get_bedrock_executor(), pump)
+
+        text = ""
+        signalled = 0
+        last_signal = time.monotonic()
+        try:
+            while (delta := await deltas.get()) is not None:
+                text += delta
+                activity.heartbeat(len(text))
+
+                if (
+                    time.monotonic() - last_signal >= STREAM_SIGNAL_INTERVAL_SECONDS
+                    or len(text) - signalled >= STREAM_SIGNAL_MAX_CHARS
+                ):
+                    await self._send_chunk(request, signalled, text[signalled:])
+                    signalled = len(text)
+                    last_signal = time.monotonic()
+
+            # Surface any error raised while reading the stream
+            await pump_future
+            latency = time.monotonic() - started
+            limiter.on_success()
+            if usage:
+                limiter.settle(reserved, usage.get('input_tokens', 0) + usage.get('output_tokens', 0))
+            record_bedrock_call(
+                request.model_id,
+                "invoke_model_with_response_stream",
+                latency,
+                usage.get('input_tokens'),
+                usage.get('output_tokens'),
+                usage.get('cache_read_input_tokens'),
+                usage.get('cache_creation_input_tokens'),
+            )
+            await self._send_chunk(request, signalled, text[signalled:])
+            if request.use_cache:
+                await run_blocking(get_response_cache().put, key, text)
+        except Exception as e:
+            activity.logger.error(f"Error streaming Bedrock model: {str(e)}")
+            limiter.record_error(e)
+            error = bedrock_application_error(e, limiter)
+            if error:
+                raise error from e
+            raise
+        finally:
+            # Stop the reader thread if we are leaving early (error or cancellation)
+            if not pump_future.done():
+                stop.set()
+                await asyncio.gather(pump_future, return_exceptions=True)
+
+        activity.logger.info("✅ Bedrock model streaming invocation completed")
+        return BedrockInvocationResult(
+            text=text,
+            usage=_model_usage(request.model_id, usage, latency),
+            compaction=compaction,
+            summary_usage=summary_usage,
+        )
+
+    async def _send_chunk(
+        self, request: BedrockInvocationRequest, offset: int, text: str, reset: bool = False
+    ) -> None:
+        """Signal the calling workflow with newly generated text, or an empty reset chunk."""
+        info = activity.info()
+        if not request.report_step or not (text or reset) or not info.workflow_id:
+            return
+        handle = self.client.get_workflow_handle(info.workflow_id, run_id=info.workflow_run_id)
+        await handle.signal(
+            "append_report_chunk",
+            ReportChunk(step=request.report_step, offset=offset, text=text, attempt=info.attempt),
+        )
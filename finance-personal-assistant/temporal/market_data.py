@@ -0,0 +1,335 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Protocol, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Calendar days covered by each supported history period
+PERIOD_DAYS = {
+    "5d": 5,
+    "1m": 31,
+    "1mo": 31,
+    "3m": 92,
+    "3mo": 92,
+    "6m": 183,
+    "6mo": 183,
+    "1y": 365,
+    "2y": 730,
+    "5y": 1826,
+}
+
+BAR_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+def period_start(period: str, today: Optional[date] = None) -> date:
+    """First calendar day of a history period such as '1y' or '6m'."""
+    if period not in PERIOD_DAYS:
+        raise ValueError(f"Unsupported period '{period}', use one of: {', '.join(PERIOD_DAYS)}")
+    return (today or date.today()) - timedelta(days=PERIOD_DAYS[period])
+
+
+def performance_summary(closes: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per-symbol performance over a date-aligned close matrix, computed column-wise.
+
+    Returns a frame indexed by symbol with period return, annualized volatility and
+    maximum drawdown, all in percent.
+    """
+    prices = closes.ffill()
+    first = closes.bfill().iloc[0]
+    daily_returns = prices.pct_change(fill_method=None)
+    return pd.DataFrame({
+        "return_pct": (prices.iloc[-1] / first - 1) * 100,
+        "volatility_pct": daily_returns.std() * np.sqrt(TRADING_DAYS_PER_YEAR) * 100,
+        "max_drawdown_pct": (prices / prices.cummax() - 1).min() * 100,
+    })
+
+
+class MarketDataFetcher(Protocol):
+    """Source of daily bars and company info for the market-data store."""
+
+    def history(self, symbol: str, start: date) -> pd.DataFrame:
+        """Daily bars from start (inclusive) to today, indexed by date."""
+        ...
+
+    def history_many(self, symbols: List[str], start: date) -> Dict[str, pd.DataFrame]:
+        """Daily bars for several symbols, fetched in one batched request where possible."""
+        ...
+
+    def info(self, symbol: str) -> dict:
+        """Company info such as longName and sector."""
+        ...
+
+
+class YFinanceFetcher:
+    """Fetches market data from Yahoo Finance."""
+
+    def history(self, symbol: str, start: date) -> pd.DataFrame:
+        import yfinance as yf
+
+        return yf.Ticker(symbol).history(start=start.isoformat())
+
+    def history_many(self, symbols: List[str], start: date) -> Dict[str, pd.DataFrame]:
+        import yfinance as yf
+
+        bars = yf.download(
+            symbols,
+            start=start.isoformat(),
+            group_by="ticker",
+            auto_adjust=True,
+            threads=True,
+            progress=False,
+        )
+        if bars.empty:
+            return {}
+        return {
+            symbol: bars[symbol].dropna(how="all")
+            for symbol in symbols
+            if symbol in bars.columns.get_level_values(0)
+        }
+
+    def info(self, symbol: str) -> dict:
+        import yfinance as yf
+
+        return yf.Ticker(symbol).info
+
+
+class FixtureFetcher:
+    """
+    Serves recorded market data from a directory, with no network access.
+
+    Each symbol has a `<SYMBOL>.csv` file of daily bars (Date plus BAR_COLUMNS) and
+    an optional `<SYMBOL>.info.json` file. Use record_fixtures to create them.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def history(self, symbol: str, start: date) -> pd.DataFrame:
+        path = os.path.join(self.directory, f"{symbol.upper()}.csv")
+        bars = pd.read_csv(path, index_col="Date", parse_dates=["Date"])
+        return bars[bars.index >= pd.Timestamp(start)]
+
+    def history_many(self, symbols: List[str], start: date) -> Dict[str, pd.DataFrame]:
+        return {
+            symbol: self.history(symbol, start)
+            for symbol in symbols
+            if os.path.exists(os.path.join(self.directory, f"{symbol.upper()}.csv"))
+        }
+
+    def info(self, symbol: str) -> dict:
+        path = os.path.join(self.directory, f"{symbol.upper()}.info.json")
+        if not os.path.exists(path):
+            return {}
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+
+def record_fixtures(symbols: List[str], directory: str, period: str = "5y") -> None:
+    """Record live Yahoo Finance data for symbols into FixtureFetcher files."""
+    os.makedirs(directory, exist_ok=True)
+    fetcher = YFinanceFetcher()
+    for symbol in symbols:
+        bars = fetcher.history(symbol, period_start(period))[BAR_COLUMNS]
+        bars.index = bars.index.tz_localize(None).normalize()
+        bars.index.name = "Date"
+        bars.to_csv(os.path.join(directory, f"{symbol.upper()}.csv"))
+        with open(os.path.join(directory, f"{symbol.upper()}.info.json"), "w", encoding="utf-8") as f:
+            json.dump(fetcher.info(symbol), f, default=str)
+
+
+class MarketDataStore:
+    """
+    Local SQLite store of daily bars and company info, refreshed incrementally.
+
+    A symbol's bars are fetched in full the first time a period reaches further back
+    than the store covers. After that only bars from the last stored date onwards are
+    fetched, at most once per bar_refresh_seconds. Company info has its own TTL.
+    Safe to use from multiple threads.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        fetcher: Optional[MarketDataFetcher] = None,
+        bar_refresh_seconds: float = 3600,
+        info_ttl_seconds: float = 86400,
+    ):
+        self.fetcher = fetcher or YFinanceFetcher()
+        self.bar_refresh_seconds = bar_refresh_seconds
+        self.info_ttl_seconds = info_ttl_seconds
+        self._lock = threading.Lock()
+        self._symbol_locks: Dict[str, threading.Lock] = {}
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS bars (
+                symbol TEXT NOT NULL, date TEXT NOT NULL,
+                open REAL, high REAL, low REAL, close REAL, volume REAL,
+                PRIMARY KEY (symbol, date));
+            CREATE TABLE IF NOT EXISTS coverage (
+                symbol TEXT PRIMARY KEY, covered_from TEXT NOT NULL, fetched_at REAL NOT NULL);
+            CREATE TABLE IF NOT EXISTS info (
+                symbol TEXT PRIMARY KEY, data TEXT NOT NULL, fetched_at REAL NOT NULL);
+            """
+        )
+
+    def history(self, symbol: str, period: str = "1y") -> pd.DataFrame:
+        """Daily bars for the period, with BAR_COLUMNS indexed by date."""
+        symbol = symbol.upper()
+        start = period_start(period)
+        with self._symbol_lock(symbol):
+            self._refresh_bars(symbol, start)
+        with self._lock:
+            bars = pd.read_sql_query(
+                "SELECT date, open, high, low, close, volume FROM bars"
+                " WHERE symbol = ? AND date >= ? ORDER BY date",
+                self._db,
+                params=(symbol, start.isoformat()),
+                parse_dates=["date"],
+                index_col="date",
+            )
+        bars.columns = BAR_COLUMNS
+        bars.index.name = "Date"
+        return bars
+
+    def close_matrix(self, symbols: List[str], period: str = "1y") -> pd.DataFrame:
+        """
+        Closing prices for several symbols as one date-aligned matrix (dates x symbols).
+
+        Symbols that need refreshing are fetched together in a single batched request.
+        Symbols with no data are left out of the result.
+        """
+        symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols))
+        start = period_start(period)
+
+        plans = {symbol: self._refresh_plan(symbol, start) for symbol in symbols}
+        stale = [symbol for symbol, plan in plans.items() if plan is not None]
+        if stale:
+            fetch_from = min(plans[symbol][0] for symbol in stale)
+            fetched = self.fetcher.history_many(stale, fetch_from)
+            for symbol in stale:
+                self._store_bars(symbol, fetched.get(symbol, pd.DataFrame(columns=BAR_COLUMNS)), plans[symbol][1])
+
+        placeholders = ",".join("?" * len(symbols))
+        with self._lock:
+            closes = pd.read_sql_query(
+                f"SELECT symbol, date, close FROM bars"
+                f" WHERE symbol IN ({placeholders}) AND date >= ?",
+                self._db,
+                params=(*symbols, start.isoformat()),
+                parse_dates=["date"],
+            )
+        matrix = closes.pivot(index="date", columns="symbol", values="close").sort_index()
+        matrix.index.name = "Date"
+        return matrix[[symbol for symbol in symbols if symbol in matrix.columns]]
+
+    def info(self, symbol: str) -> dict:
+        """Company info, refetched once it is older than info_ttl_seconds."""
+        symbol = symbol.upper()
+        with self._symbol_lock(symbol):
+            with self._lock:
+                row = self._db.execute(
+                    "SELECT data, fetched_at FROM info WHERE symbol = ?", (symbol,)
+                ).fetchone()
+            if row is not None and time.time() - row[1] < self.info_ttl_seconds:
+                return json.loads(row[0])
+            data = self.fetcher.info(symbol)
+            with self._lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO info (symbol, data, fetched_at) VALUES (?, ?, ?)",
+                    (symbol, json.dumps(data, default=str), time.time()),
+                )
+            return data
+
+    def _refresh_bars(self, symbol: str, start: date) -> None:
+        plan = self._refresh_plan(symbol, start)
+        if plan is not None:
+            fetch_from, covered_from = plan
+            self._store_bars(symbol, self.fetcher.history(symbol, fetch_from), covered_from)
+
+    def _refresh_plan(self, symbol: str, start: date) -> Optional[Tuple[date, date]]:
+        """Return (fetch_from, covered_from) if the symbol needs fetching, else None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT covered_from, fetched_at, (SELECT MAX(date) FROM bars WHERE symbol = ?)"
+                " FROM coverage WHERE symbol = ?",
+                (symbol, symbol),
+            ).fetchone()
+
+        if row is None or row[2] is None or date.fromisoformat(row[0]) > start:
+            # Not cached far enough back, or no bars stored yet: fetch the whole period
+            return start, start
+        if time.time() - row[1] >= self.bar_refresh_seconds and row[2]:
+            # Refetch from the last stored bar, which may have been a partial day
+            return date.fromisoformat(row[2]), date.fromisoformat(row[0])
+        return None
+
+    def _store_bars(self, symbol: str, bars: pd.DataFrame, covered_from: date) -> None:
+        bars = bars[BAR_COLUMNS].dropna(subset=["Close"])
+        dates = pd.DatetimeIndex(bars.index).strftime("%Y-%m-%d")
+        rows = [
+            (symbol, day, *values)
+            for day, values in zip(dates, bars.to_numpy(dtype=float).tolist())
+        ]
+        with self._lock:
+            self._db.execute("BEGIN")
+            self._db.executemany(
+                "INSERT OR REPLACE INTO bars (symbol, date, open, high, low, close, volume)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            # An empty fetch only counts as fresh when earlier bars are stored; otherwise
+            # the symbol is fetched again next time instead of being cached as empty
+            if rows or self._db.execute("SELECT 1 FROM bars WHERE symbol = ? LIMIT 1", (symbol,)).fetchone():
+                self._db.execute(
+                    "INSERT OR REPLACE INTO coverage (symbol, covered_from, fetched_at) VALUES (?, ?, ?)",
+                    (symbol, covered_from.isoformat(), time.time()),
+                )
+            self._db.execute("COMMIT")
+
+    def _symbol_lock(self, symbol: str) -> threading.Lock:
+        with self._lock:
+            return self._symbol_locks.setdefault(symbol, threading.Lock())
+
+
+_store: Optional[MarketDataStore] = None
+_store_lock = threading.Lock()
+
+
+def get_market_data_store() -> MarketDataStore:
+    """
+    Return the process-wide market-data store, configured from environment variables.
+
+    Set MARKET_DATA_FIXTURES to a directory of recorded fixtures to run with no network.
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                fixtures = os.getenv("MARKET_DATA_FIXTURES")
+                _store = MarketDataStore(
+                    path=os.getenv("MARKET_DATA_PATH", ".cache/market_data.sqlite3"),
+                    fetcher=FixtureFetcher(fixtures) if fixtures else None,
+                    bar_refresh_seconds=float(os.getenv("MARKET_DATA_REFRESH_SECONDS", "3600")),
+                    info_ttl_seconds=float(os.getenv("MARKET_DATA_INFO_TTL_SECONDS", "86400")),
+                )
+    return _store
+
+
+def set_market_data_store(store: MarketDataStore) -> None:
+    """Install the process-wide store (used by benchmarks to swap in stub fetchers)."""
+    global _store
+    with _store_lock:
+        _store = store
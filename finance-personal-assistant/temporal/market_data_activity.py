@@ -0,0 +1,22 @@
+from temporalio import activity
+
+
+@activity.defn
+def refresh_market_data(risk_level: str) -> int:
+    """
+    Activity that warms the market data store for a model portfolio, so the analysis
+    agent's tools read from the store instead of waiting on Yahoo Finance.
+
+    Returns the number of symbols with price data.
+    """
+    # pandas and the store load on first use to keep worker start-up fast
+    from .market_data import get_market_data_store
+    from .portfolio_analytics import PORTFOLIOS
+
+    symbols = PORTFOLIOS[risk_level.lower()]["stocks"]
+    activity.logger.info(f"Refreshing market data for {', '.join(symbols)}")
+    store = get_market_data_store()
+    closes = store.close_matrix(symbols, period="1y")
+    for symbol in closes.columns:
+        store.info(symbol)
+    return len(closes.columns)
@@ -0,0 +1,123 @@
+"""
+Token-budgeted compaction of a request's conversation history.
+
+Before a call, the system prompt and messages are measured with the same local
+estimate the rate limiter uses. If they exceed the request's budget, the most recent
+turns that fit are kept and the older ones are either dropped or folded into a rolling
+summary. Summaries are keyed by a hash chain over the messages they cover, so the
+next, longer conversation finds the summary of its longest already-summarized prefix
+and only has to fold in the turns dropped since.
+"""
+import hashlib
+import os
+from typing import List, Optional
+
+from .models import BedrockInvocationRequest, Message, MessageContent
+from .rate_limiter import estimate_tokens
+
+# Default budget for the system prompt plus messages; 0 disables compaction
+MESSAGE_TOKEN_BUDGET = int(os.getenv("MESSAGE_TOKEN_BUDGET", "150000"))
+# Model that writes the rolling summary; a small model is enough for this. Unset, it is
+# picked from SUMMARY_MODEL_IDS by the inference-profile geography of the request's region
+MESSAGE_SUMMARY_MODEL_ID = os.getenv("MESSAGE_SUMMARY_MODEL_ID")
+SUMMARY_MODEL_IDS = {
+    "us": "us.anthropic.claude-3-5-haiku-20241022-v1:0",
+    "eu": "eu.anthropic.claude-3-haiku-20240307-v1:0",
+    "apac": "apac.anthropic.claude-3-haiku-20240307-v1:0",
+}
+# Output allowance for the summary, also reserved from the budget in summarize mode
+SUMMARY_MAX_TOKENS = 512
+# Role and framing tokens per message on top of its text
+MESSAGE_OVERHEAD_TOKENS = 4
+
+SUMMARY_SYSTEM_PROMPT = (
+    "You maintain a running summary of a conversation between a user and a personal finance "
+    "assistant. Keep figures, decisions, preferences and open questions; drop pleasantries. "
+    "Reply with the updated summary only."
+)
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+
+def message_tokens(message: Message) -> int:
+    return MESSAGE_OVERHEAD_TOKENS + sum(estimate_tokens(content.text) for content in message.content)
+
+
+def conversation_tokens(system_prompt: Optional[str], messages: List[Message]) -> int:
+    """Estimated input tokens of a system prompt and messages."""
+    return (estimate_tokens(system_prompt) if system_prompt else 0) + sum(map(message_tokens, messages))
+
+
+def token_budget(request: BedrockInvocationRequest) -> int:
+    return MESSAGE_TOKEN_BUDGET if request.max_input_tokens is None else request.max_input_tokens
+
+
+def first_kept_message(system_prompt: Optional[str], messages: List[Message], budget: int) -> int:
+    """
+    Index of the oldest message kept so that the system prompt and messages[index:] fit
+    in budget. The last message is always kept, and the kept turns start with a user
+    message as the Messages API requires.
+    """
+    used = estimate_tokens(system_prompt) if system_prompt else 0
+    start = len(messages)
+    while start > 0:
+        tokens = message_tokens(messages[start - 1])
+        if start < len(messages) and used + tokens > budget:
+            break
+        used += tokens
+        start -= 1
+    while start < len(messages) - 1 and messages[start].role != "user":
+        start += 1
+    return start
+
+
+def prefix_keys(messages: List[Message]) -> List[str]:
+    """Hash chain over the messages: keys[i] identifies messages[:i + 1]."""
+    keys = []
+    digest = hashlib.sha256(b"summary:v1")
+    for message in messages:
+        digest = digest.copy()
+        digest.update(message.model_dump_json().encode("utf-8"))
+        keys.append(f"summary:{digest.hexdigest()}")
+    return keys
+
+
+def transcript(messages: List[Message]) -> str:
+    return "\n\n".join(
+        f"{message.role.capitalize()}: " + "\n".join(content.text for content in message.content)
+        for message in messages
+    )
+
+
+def summary_model_id(region_name: str) -> Optional[str]:
+    """Summary model for a region, or None when there is no default for its geography."""
+    if MESSAGE_SUMMARY_MODEL_ID:
+        return MESSAGE_SUMMARY_MODEL_ID
+    if region_name.startswith("us-gov-"):
+        return None
+    geography = "apac" if region_name.startswith("ap-") else region_name.split("-")[0]
+    return SUMMARY_MODEL_IDS.get(geography)
+
+
+def summary_request(
+    request: BedrockInvocationRequest, previous_summary: Optional[str], messages: List[Message], model_id: str
+) -> BedrockInvocationRequest:
+    """Request that folds messages into the previous summary."""
+    prompt = f"Summary so far:\n{previous_summary}\n\n" if previous_summary else ""
+    prompt += f"New messages:\n{transcript(messages)}"
+    return BedrockInvocationRequest(
+        prompt=prompt,
+        system_prompt=SUMMARY_SYSTEM_PROMPT,
+        model_id=model_id,
+        region_name=request.region_name,
+        max_tokens=SUMMARY_MAX_TOKENS,
+        temperature=0,
+        max_input_tokens=0,
+        cache_system_prompt=False,
+    )
+
+
+def with_summary(messages: List[Message], summary: str) -> List[Message]:
+    """Messages with the summary prepended as a text block of the first (user) message."""
+    first = messages[0]
+    block = MessageContent(text=SUMMARY_PREFIX + summary)
+    return [first.model_copy(update={"content": [block, *first.content]}), *messages[1:]]
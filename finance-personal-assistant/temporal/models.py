@@ -1,4 +1,4 @@
-from typing import Optional, List
+from typing import Literal, Optional, List
 from pydantic import BaseModel, Field
 
 
@@ -66,4 +66,272 @@ class BedrockInvocationRequest(BaseModel):
         default=None,
         description="Optional temperature setting for the model"
     )
+    use_cache: bool = Field(
+        default=False,
+        description="Serve identical requests from the local response cache"
+    )
+    report_step: Optional[str] = Field(
+        default=None,
+        description="Workflow report step that receives partial text while a streaming call runs"
+    )
+    cache_system_prompt: Optional[bool] = Field(
+        default=None,
+        description="Mark the system prompt as a Bedrock prompt-cache checkpoint (None follows the worker's "
+                    "BEDROCK_PROMPT_CACHING)"
+    )
+    max_input_tokens: Optional[int] = Field(
+        default=None,
+        description="Estimated token budget for the system prompt and messages; older turns are "
+                    "compacted to fit (None uses MESSAGE_TOKEN_BUDGET, 0 disables compaction)"
+    )
+    compaction: Literal["drop", "summarize"] = Field(
+        default="drop",
+        description="How turns outside the budget are compacted: dropped, or replaced by a rolling summary"
+    )
+
+
+class ModelUsage(BaseModel):
+    """Tokens and model time spent by the Bedrock calls of one activity."""
+    model_id: str = Field(default="", description="Bedrock model ID")
+    model_calls: int = Field(default=0, description="Number of model requests (agent turns)")
+    input_tokens: int = Field(default=0, description="Input tokens across all requests")
+    output_tokens: int = Field(default=0, description="Output tokens across all requests")
+    cache_read_input_tokens: int = Field(default=0, description="Input tokens read from the prompt cache")
+    cache_write_input_tokens: int = Field(default=0, description="Input tokens written to the prompt cache")
+    latency_seconds: float = Field(default=0.0, description="Time spent waiting on the model")
+    cached: bool = Field(default=False, description="Served from the response cache without a model call")
+
+
+class MessageCompaction(BaseModel):
+    """How a request's conversation history was compacted to fit its token budget."""
+    mode: str = Field(description="'drop' or 'summarize'")
+    messages_before: int
+    messages_after: int
+    tokens_before: int = Field(description="Estimated input tokens before compaction")
+    tokens_after: int = Field(description="Estimated input tokens after compaction")
+    tokens_saved: int = Field(description="tokens_before - tokens_after")
+    summary_cached: bool = Field(default=False, description="The rolling summary came from the cache")
+
+
+class BedrockInvocationResult(BaseModel):
+    """Text and usage returned by the Bedrock invocation activities."""
+    text: str = Field(description="The model's response")
+    usage: ModelUsage = Field(default_factory=ModelUsage)
+    compaction: Optional[MessageCompaction] = Field(
+        default=None, description="Set when older messages were compacted before the call"
+    )
+    summary_usage: Optional[ModelUsage] = Field(
+        default=None, description="Usage of the call that summarized the compacted messages, on its own model"
+    )
+
+
+class BudgetAgentResult(BaseModel):
+    """Report and usage returned by the budget agent activity."""
+    report: FinancialReport
+    usage: ModelUsage = Field(default_factory=ModelUsage)
+
+
+class FinancialAnalysisResult(BaseModel):
+    """Analysis text and usage returned by the financial analysis activity."""
+    text: str
+    usage: ModelUsage = Field(default_factory=ModelUsage)
+
+
+class StepUsage(BaseModel):
+    """Accumulated usage of one workflow step."""
+    step: str
+    model_id: str = ""
+    model_calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_input_tokens: int = 0
+    cache_write_input_tokens: int = 0
+    model_latency_seconds: float = Field(default=0.0, description="Time the step's activities spent waiting on the model")
+    duration_seconds: float = Field(default=0.0, description="Wall-clock time of the step in the workflow")
+    estimated_cost_usd: float = 0.0
+
+
+class UsageReport(BaseModel):
+    """Usage of a workflow, per step and in total."""
+    steps: List[StepUsage] = Field(default_factory=list)
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_input_tokens: int = 0
+    cache_write_input_tokens: int = 0
+    estimated_cost_usd: float = 0.0
+
+
+class ReportChunk(BaseModel):
+    """Newly generated text for one step of a report, sent to the workflow while streaming."""
+    step: str = Field(description="Report step the text belongs to")
+    offset: int = Field(description="Character offset of the text within the step")
+    text: str = Field(description="Text generated since the previous chunk")
+    attempt: int = Field(
+        default=1,
+        description="Activity attempt that generated the text; text from earlier attempts is discarded"
+    )
+
+
+class PartialReport(BaseModel):
+    """Snapshot of the report text produced so far."""
+    stage: str = Field(description="Current workflow stage")
+    text: str = Field(description="Report text accumulated so far")
+
+
+class BatchPrompt(BaseModel):
+    """One entry of a batch run: a prompt plus the investment amount to answer with."""
+    prompt: str = Field(description="Prompt for the financial assistant workflow")
+    investment_amount: float = Field(
+        default=0,
+        description="Amount sent with the set_investment_amount signal (0 skips the analysis)"
+    )
+    id: Optional[str] = Field(
+        default=None,
+        description="Caller-supplied identifier, used in the child workflow ID"
+    )
+
+
+class BatchFailure(BaseModel):
+    """A batch entry whose child workflow failed."""
+    index: int = Field(description="Position of the entry in the batch")
+    workflow_id: str = Field(description="Child workflow ID")
+    error: str = Field(description="Failure message")
+
+
+class BatchSummary(BaseModel):
+    """Aggregated outcome of a batch run."""
+    total: int = Field(default=0, description="Entries processed")
+    succeeded: int = Field(default=0, description="Child workflows that completed")
+    failed: int = Field(default=0, description="Child workflows that failed")
+    failures: List[BatchFailure] = Field(
+        default_factory=list,
+        description="First failures, capped to keep history small"
+    )
+
+
+class BatchPage(BaseModel):
+    """Slice of a JSONL prompt file to load."""
+    path: str = Field(description="Path to the JSONL file on the worker host")
+    offset: int = Field(description="Index of the first line to load")
+    limit: int = Field(description="Maximum number of lines to load")
+
+
+class BatchInput(BaseModel):
+    """Input for FinancialAssistantBatchWorkflow."""
+    prompts: List[BatchPrompt] = Field(
+        default_factory=list,
+        description="Inline prompts not yet processed (ignored when jsonl_path is set)"
+    )
+    jsonl_path: Optional[str] = Field(
+        default=None,
+        description="JSONL file of BatchPrompt entries, read by the worker"
+    )
+    start_index: int = Field(default=0, description="Batch index of the next entry to process")
+    max_in_flight: int = Field(default=20, description="Maximum concurrent child workflows")
+    continue_as_new_every: int = Field(
+        default=500,
+        description="Child workflows per run before continuing as new"
+    )
+    summary: BatchSummary = Field(
+        default_factory=BatchSummary,
+        description="Summary carried over from previous runs"
+    )
+
+
+class PortfolioAllocation(BaseModel):
+    """Weight and dollar amount of one holding."""
+    symbol: str = Field(description="Ticker symbol")
+    weight: float = Field(description="Portfolio weight (0-1)")
+    amount: float = Field(description="Dollar amount allocated")
+
+
+class FrontierPoint(BaseModel):
+    """One point on the efficient frontier."""
+    expected_return_pct: float = Field(description="Annualized expected return in percent")
+    volatility_pct: float = Field(description="Annualized volatility in percent")
+
+
+class PortfolioAnalytics(BaseModel):
+    """Risk and return analytics for a weighted portfolio."""
+    risk_level: str = Field(description="Portfolio risk level")
+    allocations: List[PortfolioAllocation] = Field(description="Holdings with weights and amounts")
+    expected_return_pct: float = Field(description="Annualized expected return in percent")
+    volatility_pct: float = Field(description="Annualized volatility in percent")
+    sharpe_ratio: float = Field(description="Sharpe ratio against the risk-free rate")
+    max_drawdown_pct: float = Field(description="Maximum historical drawdown in percent")
+    covariance: List[List[float]] = Field(description="Annualized covariance matrix, in allocation order")
+    max_sharpe_weights: List[float] = Field(description="Weights of the highest-Sharpe sampled portfolio")
+    efficient_frontier: List[FrontierPoint] = Field(description="Lowest-volatility portfolio per return level")
+    missing_symbols: List[str] = Field(default_factory=list, description="Symbols with no price data")
+
+
+class FinancialAssistantOptions(BaseModel):
+    """Optional settings for FinancialAssistantWorkflow."""
+    speculative_analysis: bool = Field(
+        default=True,
+        description="Start the financial analysis for the recommended amount while waiting for the user"
+    )
+    formatting_mode: Literal["llm", "template"] = Field(
+        default="llm",
+        description="Format reports with an LLM call or with the local template renderer"
+    )
+    risk_level: Literal["conservative", "moderate", "aggressive"] = Field(
+        default="moderate",
+        description="Risk profile of the portfolio the financial analysis builds"
+    )
+
+
+class SpeculationStats(BaseModel):
+    """Outcome of the speculative financial analysis."""
+    speculated: bool = Field(default=False, description="Whether a speculative analysis was started")
+    amount: Optional[float] = Field(default=None, description="Amount the analysis was speculated for")
+    hit: Optional[bool] = Field(default=None, description="Whether the user confirmed the speculated amount")
+    latency_saved_seconds: float = Field(default=0, description="Analysis time already spent when the user answered")
+
+
+class SessionTurn(BaseModel):
+    """One exchange in a FinancialAssistantSessionWorkflow, as kept in its state."""
+    kind: Literal["ask", "invest"] = Field(description="Whether the turn was a prompt or an investment amount")
+    request: str = Field(description="The user's prompt, or the investment amount")
+    reply: str = Field(description="The reply, truncated to keep session state small")
+    digest: str = Field(description="One-line summary kept once the turn is compacted")
+
+
+class SessionState(BaseModel):
+    """Compacted conversation state, carried across continue-as-new."""
+    turn_count: int = Field(default=0, description="Turns answered over the whole session")
+    summary: List[str] = Field(
+        default_factory=list,
+        description="One line per turn that has been compacted out of recent_turns"
+    )
+    recent_turns: List[SessionTurn] = Field(default_factory=list, description="Latest turns, kept in full")
+    financial_report: Optional[FinancialReport] = Field(default=None, description="Latest budget report")
+    input_tokens: int = Field(default=0, description="Input tokens over the whole session")
+    output_tokens: int = Field(default=0, description="Output tokens over the whole session")
+    estimated_cost_usd: float = Field(default=0.0, description="Estimated cost of the whole session")
+
+
+class SessionInput(BaseModel):
+    """Input for FinancialAssistantSessionWorkflow."""
+    user_id: str = Field(description="User the session belongs to")
+    state: SessionState = Field(
+        default_factory=SessionState,
+        description="State carried over from previous runs"
+    )
+    max_recent_turns: int = Field(default=6, description="Turns kept in full before older ones are compacted")
+    max_history_events: int = Field(
+        default=2000,
+        description="History length after which the session continues as new"
+    )
+    idle_timeout_seconds: float = Field(
+        default=7 * 24 * 3600,
+        description="The session completes after this long without a turn"
+    )
+
 
+class SessionReply(BaseModel):
+    """Result of an ask or invest update."""
+    turn: int = Field(description="Turn number within the session")
+    text: str = Field(description="Rendered reply")
+    financial_report: Optional[FinancialReport] = Field(default=None, description="Budget report, for ask turns")
+    usage: ModelUsage = Field(default_factory=ModelUsage)
@@ -0,0 +1,169 @@
+"""
+Payload codecs that keep large values out of workflow history.
+
+Reports, prompts and analysis text are compressed once they pass a size threshold, and
+payloads that are still large after compression are moved to the blob store with only
+a blob:// reference kept in history. Clients and workers must use the same converter,
+so both get it from data_converter(). Claim-checked payloads are read back from the
+blob store by whichever process decodes them, so the claim check only runs when the
+blob store was configured explicitly (BLOB_STORE_URL or set_blob_store) to one that
+every client and worker shares; otherwise large payloads stay in history, compressed.
+"""
+import asyncio
+import dataclasses
+import gzip
+import hashlib
+import os
+from typing import List, Optional, Sequence
+
+from temporalio.api.common.v1 import Payload
+from temporalio.contrib.pydantic import pydantic_data_converter
+from temporalio.converter import DataConverter, PayloadCodec
+
+from .blob_store import blob_store_is_shared, get_blob_store
+
+# "gzip", "zstd" (needs the zstd extra on every client and worker) or "none"
+PAYLOAD_COMPRESSION = os.getenv("PAYLOAD_COMPRESSION", "gzip")
+PAYLOAD_COMPRESSION_THRESHOLD_BYTES = int(os.getenv("PAYLOAD_COMPRESSION_THRESHOLD_BYTES", "2048"))
+# 0 disables claim-check storage, as does a blob store that is not configured explicitly
+PAYLOAD_CLAIM_CHECK_THRESHOLD_BYTES = int(os.getenv("PAYLOAD_CLAIM_CHECK_THRESHOLD_BYTES", str(128 * 1024)))
+
+ZSTD_ENCODING = b"binary/zstd"
+GZIP_ENCODING = b"binary/gzip"
+CLAIM_CHECK_ENCODING = b"binary/claim-check"
+CLAIM_CHECK_NAMESPACE = "payloads"
+
+
+def _zstd():
+    """The zstandard module, or None when it is not installed."""
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+
+class CompressionCodec(PayloadCodec):
+    """
+    Compresses payloads of at least threshold bytes with zstd or gzip. A payload is
+    left as is when compression does not make it smaller. Decoding accepts both
+    encodings whatever this codec is configured to write.
+    """
+
+    def __init__(self, algorithm: str = "gzip", threshold: int = PAYLOAD_COMPRESSION_THRESHOLD_BYTES):
+        if algorithm not in ("zstd", "gzip"):
+            raise ValueError(f"Unknown compression algorithm '{algorithm}'")
+        if algorithm == "zstd" and _zstd() is None:
+            algorithm = "gzip"
+        self.algorithm = algorithm
+        self.threshold = threshold
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.algorithm == "zstd":
+            return _zstd().ZstdCompressor(level=3).compress(data)
+        return gzip.compress(data, compresslevel=6, mtime=0)
+
+    async def encode(self, payloads: Sequence[Payload]) -> List[Payload]:
+        encoded = []
+        for payload in payloads:
+            data = payload.SerializeToString()
+            if len(data) >= self.threshold:
+                compressed = self._compress(data)
+                if len(compressed) < len(data):
+                    encoding = ZSTD_ENCODING if self.algorithm == "zstd" else GZIP_ENCODING
+                    payload = Payload(metadata={"encoding": encoding}, data=compressed)
+            encoded.append(payload)
+        return encoded
+
+    async def decode(self, payloads: Sequence[Payload]) -> List[Payload]:
+        decoded = []
+        for payload in payloads:
+            encoding = payload.metadata.get("encoding")
+            if encoding == ZSTD_ENCODING:
+                zstandard = _zstd()
+                if zstandard is None:
+                    raise RuntimeError(
+                        "Payload is zstd-compressed but the zstandard package is not installed;"
+                        " install the zstd extra or set PAYLOAD_COMPRESSION=gzip on every client and worker"
+                    )
+                payload = Payload.FromString(zstandard.ZstdDecompressor().decompress(payload.data))
+            elif encoding == GZIP_ENCODING:
+                payload = Payload.FromString(gzip.decompress(payload.data))
+            decoded.append(payload)
+        return decoded
+
+
+class ClaimCheckCodec(PayloadCodec):
+    """
+    Stores payloads of at least threshold bytes in the blob store, keyed by content
+    hash, and replaces them with a reference. Identical payloads are stored once.
+    """
+
+    def __init__(self, threshold: int = PAYLOAD_CLAIM_CHECK_THRESHOLD_BYTES):
+        self.threshold = threshold
+
+    async def encode(self, payloads: Sequence[Payload]) -> List[Payload]:
+        encoded = []
+        for payload in payloads:
+            data = payload.SerializeToString()
+            if len(data) >= self.threshold:
+                ref = await asyncio.to_thread(self._put, data)
+                payload = Payload(metadata={"encoding": CLAIM_CHECK_ENCODING}, data=ref.encode())
+            encoded.append(payload)
+        return encoded
+
+    async def decode(self, payloads: Sequence[Payload]) -> List[Payload]:
+        decoded = []
+        for payload in payloads:
+            if payload.metadata.get("encoding") == CLAIM_CHECK_ENCODING:
+                data = await asyncio.to_thread(get_blob_store().get, payload.data.decode())
+                payload = Payload.FromString(data)
+            decoded.append(payload)
+        return decoded
+
+    @staticmethod
+    def _put(data: bytes) -> str:
+        # Identical payloads share a key; writing again restarts the blob's retention period
+        return get_blob_store().put(CLAIM_CHECK_NAMESPACE, hashlib.sha256(data).hexdigest(), data)
+
+
+class CodecChain(PayloadCodec):
+    """Applies codecs in order when encoding and in reverse order when decoding."""
+
+    def __init__(self, codecs: Sequence[PayloadCodec]):
+        self.codecs = list(codecs)
+
+    async def encode(self, payloads: Sequence[Payload]) -> List[Payload]:
+        encoded = list(payloads)
+        for codec in self.codecs:
+            encoded = await codec.encode(encoded)
+        return encoded
+
+    async def decode(self, payloads: Sequence[Payload]) -> List[Payload]:
+        decoded = list(payloads)
+        for codec in reversed(self.codecs):
+            decoded = await codec.decode(decoded)
+        return decoded
+
+
+def build_payload_codec(
+    compression: str = PAYLOAD_COMPRESSION,
+    compression_threshold: int = PAYLOAD_COMPRESSION_THRESHOLD_BYTES,
+    claim_check_threshold: int = PAYLOAD_CLAIM_CHECK_THRESHOLD_BYTES,
+) -> Optional[PayloadCodec]:
+    """
+    Compression followed by claim-check, so only payloads large even compressed are
+    offloaded. The claim check needs a shared blob store (see blob_store_is_shared).
+    """
+    codecs: List[PayloadCodec] = []
+    if compression != "none":
+        codecs.append(CompressionCodec(compression, compression_threshold))
+    # A blob store local to one host would leave payloads other hosts cannot decode
+    if claim_check_threshold > 0 and blob_store_is_shared():
+        codecs.append(ClaimCheckCodec(claim_check_threshold))
+    return CodecChain(codecs) if codecs else None
+
+
+def data_converter(**codec_options) -> DataConverter:
+    """The pydantic data converter with this module's payload codec, shared by clients and workers."""
+    return dataclasses.replace(pydantic_data_converter, payload_codec=build_payload_codec(**codec_options))
@@ -0,0 +1,110 @@
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from .market_data import TRADING_DAYS_PER_YEAR
+from .models import FrontierPoint, PortfolioAllocation, PortfolioAnalytics
+
+# Model portfolios by risk level
+PORTFOLIOS: Dict[str, dict] = {
+    "conservative": {
+        "stocks": ["AAPL", "MSFT", "JNJ", "PG", "KO"],
+        "weights": [0.25, 0.25, 0.20, 0.15, 0.15],
+        "description": "Focus on large-cap, dividend-paying stocks",
+    },
+    "moderate": {
+        "stocks": ["AAPL", "GOOGL", "AMZN", "TSLA", "NVDA"],
+        "weights": [0.30, 0.25, 0.20, 0.15, 0.10],
+        "description": "Balanced mix of growth and stability",
+    },
+    "aggressive": {
+        "stocks": ["TSLA", "NVDA", "AMZN", "GOOGL", "META"],
+        "weights": [0.30, 0.25, 0.20, 0.15, 0.10],
+        "description": "High-growth potential stocks",
+    },
+}
+
+RISK_FREE_RATE = 0.04
+
+
+def analyze_portfolio(
+    risk_level: str,
+    investment_amount: float,
+    closes: pd.DataFrame,
+    risk_free_rate: float = RISK_FREE_RATE,
+    frontier_samples: int = 5000,
+    frontier_points: int = 10,
+    seed: int = 0,
+) -> PortfolioAnalytics:
+    """
+    Compute portfolio analytics for a model portfolio in one vectorized pass.
+
+    Args:
+        risk_level: Key into PORTFOLIOS
+        investment_amount: Dollar amount to allocate
+        closes: Date-aligned close matrix (dates x symbols) covering the portfolio
+        risk_free_rate: Annual risk-free rate used for the Sharpe ratio
+        frontier_samples: Random long-only portfolios sampled for the frontier sweep
+        frontier_points: Return levels reported on the efficient frontier
+        seed: Seed for the frontier sampler, so results are reproducible
+
+    Returns:
+        PortfolioAnalytics; symbols without price data are dropped and the remaining
+        weights renormalized.
+    """
+    portfolio = PORTFOLIOS[risk_level.lower()]
+    symbols: List[str] = [s for s in portfolio["stocks"] if s in closes.columns]
+    missing = [s for s in portfolio["stocks"] if s not in closes.columns]
+    if not symbols:
+        raise ValueError(f"No price data for any of: {', '.join(portfolio['stocks'])}")
+    weights = np.array([w for s, w in zip(portfolio["stocks"], portfolio["weights"]) if s in symbols])
+    weights = weights / weights.sum()
+
+    # T x N matrix of daily returns on aligned prices
+    daily = closes[symbols].ffill().pct_change(fill_method=None).dropna().to_numpy()
+    mean = daily.mean(axis=0) * TRADING_DAYS_PER_YEAR
+    cov = np.atleast_2d(np.cov(daily, rowvar=False)) * TRADING_DAYS_PER_YEAR
+
+    expected_return = float(weights @ mean)
+    volatility = float(np.sqrt(weights @ cov @ weights))
+    value = np.cumprod(1 + daily @ weights)
+    max_drawdown = float((value / np.maximum.accumulate(value) - 1).min()) if len(value) else 0.0
+
+    # Efficient-frontier sweep over random long-only portfolios (K x N)
+    rng = np.random.default_rng(seed)
+    sampled = rng.dirichlet(np.ones(len(symbols)), size=frontier_samples)
+    sampled_returns = sampled @ mean
+    sampled_vols = np.sqrt(np.einsum("ij,jk,ik->i", sampled, cov, sampled))
+    sharpe = (sampled_returns - risk_free_rate) / sampled_vols
+    max_sharpe_weights = sampled[np.argmax(sharpe)]
+
+    # Lowest volatility within each return bucket at or above the minimum-variance portfolio
+    min_variance_return = sampled_returns[np.argmin(sampled_vols)]
+    edges = np.linspace(min_variance_return, sampled_returns.max(), frontier_points + 1)
+    buckets = np.clip(np.digitize(sampled_returns, edges) - 1, 0, frontier_points - 1)
+    order = np.lexsort((sampled_vols, buckets))
+    _, first = np.unique(buckets[order], return_index=True)
+    frontier = [i for i in order[first] if sampled_returns[i] >= min_variance_return]
+
+    return PortfolioAnalytics(
+        risk_level=risk_level.lower(),
+        allocations=[
+            PortfolioAllocation(symbol=s, weight=round(float(w), 4), amount=round(float(w) * investment_amount, 2))
+            for s, w in zip(symbols, weights)
+        ],
+        expected_return_pct=round(expected_return * 100, 2),
+        volatility_pct=round(volatility * 100, 2),
+        sharpe_ratio=round((expected_return - risk_free_rate) / volatility, 3) if volatility else 0.0,
+        max_drawdown_pct=round(max_drawdown * 100, 2),
+        covariance=np.round(cov, 5).tolist(),
+        max_sharpe_weights=np.round(max_sharpe_weights, 4).tolist(),
+        efficient_frontier=[
+            FrontierPoint(
+                expected_return_pct=round(float(sampled_returns[i]) * 100, 2),
+                volatility_pct=round(float(sampled_vols[i]) * 100, 2),
+            )
+            for i in frontier
+        ],
+        missing_symbols=missing,
+    )
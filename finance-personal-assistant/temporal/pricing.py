@@ -0,0 +1,49 @@
+"""
+Bedrock on-demand prices used for cost estimates.
+
+Plain data with no I/O, so workflows can import it. Update the table when prices
+change; models that are not listed are estimated at zero cost.
+"""
+
+# USD per million tokens: (input, output)
+MODEL_PRICING = {
+    "anthropic.claude-3-7-sonnet-20250219-v1:0": (3.00, 15.00),
+    "anthropic.claude-3-5-sonnet-20241022-v2:0": (3.00, 15.00),
+    "anthropic.claude-3-5-haiku-20241022-v1:0": (0.80, 4.00),
+    "anthropic.claude-3-haiku-20240307-v1:0": (0.25, 1.25),
+    "anthropic.claude-sonnet-4-20250514-v1:0": (3.00, 15.00),
+}
+
+# Prompt-cache reads and writes are billed as multiples of the input price
+CACHE_READ_PRICE_FACTOR = 0.1
+CACHE_WRITE_PRICE_FACTOR = 1.25
+
+# Cross-region inference profiles prefix the model ID with a geography
+INFERENCE_PROFILE_PREFIXES = ("us.", "eu.", "apac.", "global.")
+
+
+def base_model_id(model_id: str) -> str:
+    """Model ID without a cross-region inference profile prefix."""
+    for prefix in INFERENCE_PROFILE_PREFIXES:
+        if model_id.startswith(prefix):
+            return model_id[len(prefix):]
+    return model_id
+
+
+def estimate_cost(
+    model_id: str,
+    input_tokens: int,
+    output_tokens: int,
+    cache_read_input_tokens: int = 0,
+    cache_write_input_tokens: int = 0,
+) -> float:
+    """
+    Estimated cost in USD of the given token counts. Bedrock reports cached input
+    tokens separately from input_tokens, so the counts do not overlap.
+    """
+    input_price, output_price = MODEL_PRICING.get(base_model_id(model_id), (0.0, 0.0))
+    cached_input = (
+        cache_read_input_tokens * CACHE_READ_PRICE_FACTOR
+        + cache_write_input_tokens * CACHE_WRITE_PRICE_FACTOR
+    )
+    return ((input_tokens + cached_input) * input_price + output_tokens * output_price) / 1_000_000
@@ -0,0 +1,71 @@
+import json
+import time
+from typing import Any, AsyncGenerator, Optional
+
+from strands.models import BedrockModel
+from strands.types.content import Messages
+from strands.types.streaming import StreamEvent
+from strands.types.tools import ToolSpec
+
+from .rate_limiter import RateLimiter, estimate_tokens, get_rate_limiter
+from .telemetry import record_bedrock_call
+from .usage import add_usage
+
+# Output allowance reserved when the model config does not set max_tokens
+DEFAULT_MAX_TOKENS = 4096
+
+
+class RateLimitedBedrockModel(BedrockModel):
+    """
+    BedrockModel whose calls go through the process-wide limiter for its model and
+    region, shared with invoke_bedrock_model. Tool loops and structured output both
+    call stream(), so every agent request is covered.
+    """
+
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        return get_rate_limiter(self.config["model_id"], self.client.meta.region_name)
+
+    async def stream(
+        self,
+        messages: Messages,
+        tool_specs: Optional[list[ToolSpec]] = None,
+        system_prompt: Optional[str] = None,
+        **kwargs: Any,
+    ) -> AsyncGenerator[StreamEvent, None]:
+        limiter = self.rate_limiter
+        reserved = estimate_tokens(
+            json.dumps([messages, tool_specs, system_prompt], default=str)
+        ) + (self.config.get("max_tokens") or DEFAULT_MAX_TOKENS)
+        await limiter.acquire_async(reserved)
+
+        started = time.monotonic()
+        try:
+            async for event in super().stream(messages, tool_specs, system_prompt, **kwargs):
+                usage = event.get("metadata", {}).get("usage")
+                if usage:
+                    limiter.settle(reserved, usage.get("totalTokens", reserved))
+                    latency = time.monotonic() - started
+                    record_bedrock_call(
+                        self.config["model_id"],
+                        "converse",
+                        latency,
+                        usage.get("inputTokens"),
+                        usage.get("outputTokens"),
+                        usage.get("cacheReadInputTokens"),
+                        usage.get("cacheWriteInputTokens"),
+                    )
+                    add_usage(
+                        self.config["model_id"],
+                        usage.get("inputTokens", 0),
+                        usage.get("outputTokens", 0),
+                        latency,
+                        usage.get("cacheReadInputTokens", 0),
+                        usage.get("cacheWriteInputTokens", 0),
+                    )
+                yield event
+        except Exception as e:
+            # Strands retries throttled calls itself; each attempt comes back through here
+            limiter.record_error(e)
+            raise
+        limiter.on_success()
@@ -0,0 +1,190 @@
+import asyncio
+import os
+import threading
+import time
+from datetime import timedelta
+from typing import Dict, Optional, Tuple
+
+from temporalio.exceptions import ApplicationError
+
+# Default quota per (model, region); set these to the account's Bedrock service quotas
+BEDROCK_REQUESTS_PER_MINUTE = float(os.getenv("BEDROCK_REQUESTS_PER_MINUTE", "200"))
+BEDROCK_TOKENS_PER_MINUTE = float(os.getenv("BEDROCK_TOKENS_PER_MINUTE", "400000"))
+
+# Seconds of quota that may be spent in a burst
+BURST_SECONDS = 10.0
+
+# Error codes that will not succeed on retry
+NON_RETRYABLE_ERROR_CODES = {"ValidationException", "AccessDeniedException"}
+THROTTLING_ERROR_CODES = {"ThrottlingException", "throttlingException"}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token) used before a call is made."""
+    return len(text) // 4 + 1
+
+
+class RateLimiter:
+    """
+    Token buckets for one model and region, covering requests and tokens per minute.
+
+    Callers reserve capacity before a call and sleep for the returned delay, so waiting
+    callers queue up in order instead of polling. The rate adapts AIMD-style: every
+    throttle halves it, every successful call adds back a small fraction of the quota.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = BEDROCK_REQUESTS_PER_MINUTE,
+        tokens_per_minute: float = BEDROCK_TOKENS_PER_MINUTE,
+        increase: float = 0.02,
+        decrease: float = 0.5,
+        min_scale: float = 0.05,
+        retry_delay_seconds: float = 2.0,
+    ):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.increase = increase
+        self.decrease = decrease
+        self.min_scale = min_scale
+        self.retry_delay_seconds = retry_delay_seconds
+        self.scale = 1.0
+        self._lock = threading.Lock()
+        self._requests = self._capacity(requests_per_minute)
+        self._tokens = self._capacity(tokens_per_minute)
+        self._updated = time.monotonic()
+        self._throttles = 0
+        self._waited = 0.0
+
+    def reserve(self, tokens: int) -> float:
+        """Take one request and `tokens` tokens; return how long to wait before calling."""
+        with self._lock:
+            self._refill()
+            self._requests -= 1
+            self._tokens -= tokens
+            delay = max(
+                0.0,
+                -self._requests / self._rate(self.requests_per_minute),
+                -self._tokens / self._rate(self.tokens_per_minute),
+            )
+            self._waited += delay
+            return delay
+
+    def acquire(self, tokens: int) -> None:
+        """Blocking reserve-and-wait."""
+        delay = self.reserve(tokens)
+        if delay:
+            time.sleep(delay)
+
+    async def acquire_async(self, tokens: int) -> None:
+        """Reserve-and-wait without blocking the event loop."""
+        delay = self.reserve(tokens)
+        if delay:
+            await asyncio.sleep(delay)
+
+    def settle(self, reserved: int, used: int) -> None:
+        """Return tokens that were reserved but not used (or charge extra ones)."""
+        with self._lock:
+            self._tokens += reserved - used
+
+    def on_success(self) -> None:
+        """Additive increase."""
+        with self._lock:
+            self.scale = min(1.0, self.scale + self.increase)
+
+    def on_throttle(self) -> None:
+        """Multiplicative decrease; empties the buckets so callers back off immediately."""
+        with self._lock:
+            self._refill()
+            self.scale = max(self.min_scale, self.scale * self.decrease)
+            self._requests = min(self._requests, 0.0)
+            self._tokens = min(self._tokens, 0.0)
+            self._throttles += 1
+
+    def record_error(self, error: BaseException) -> None:
+        """Back off if a failed call was throttled."""
+        if bedrock_error_code(error) in THROTTLING_ERROR_CODES:
+            self.on_throttle()
+
+    def retry_delay(self) -> timedelta:
+        """Delay before retrying a throttled call; doubles each time the rate is halved."""
+        return timedelta(seconds=min(60.0, self.retry_delay_seconds / self.scale))
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "scale": round(self.scale, 3),
+                "requests_per_minute": round(self.requests_per_minute * self.scale, 1),
+                "tokens_per_minute": round(self.tokens_per_minute * self.scale, 1),
+                "throttles": self._throttles,
+                "waited_seconds": round(self._waited, 3),
+            }
+
+    def _rate(self, per_minute: float) -> float:
+        return per_minute * self.scale / 60.0
+
+    def _capacity(self, per_minute: float) -> float:
+        return self._rate(per_minute) * BURST_SECONDS
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        self._requests = min(
+            self._capacity(self.requests_per_minute),
+            self._requests + elapsed * self._rate(self.requests_per_minute),
+        )
+        self._tokens = min(
+            self._capacity(self.tokens_per_minute),
+            self._tokens + elapsed * self._rate(self.tokens_per_minute),
+        )
+
+
+_limiters: Dict[Tuple[str, str], RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(model_id: str, region_name: str) -> RateLimiter:
+    """Return the process-wide limiter for a model and region."""
+    key = (model_id, region_name)
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = _limiters[key] = RateLimiter()
+        return limiter
+
+
+def set_rate_limiter(model_id: str, region_name: str, limiter: RateLimiter) -> None:
+    """Install a limiter for a model and region (used by benchmarks to change the limits)."""
+    with _limiters_lock:
+        _limiters[(model_id, region_name)] = limiter
+
+
+def bedrock_error_code(error: BaseException) -> Optional[str]:
+    """Bedrock error code of a botocore ClientError, following wrapping exceptions."""
+    while error is not None:
+        response = getattr(error, "response", None)
+        details = response.get("Error") if isinstance(response, dict) else None
+        code = details.get("Code") if isinstance(details, dict) else None
+        if code:
+            return code
+        error = error.__cause__
+    return None
+
+
+def bedrock_application_error(error: BaseException, limiter: RateLimiter) -> Optional[ApplicationError]:
+    """
+    Translate a Bedrock failure for Temporal's retry policy. Throttles are retried after
+    the limiter's current backoff; invalid requests fail without retrying. Returns None
+    for other errors, which keep the default retry behaviour.
+    """
+    code = bedrock_error_code(error)
+    if code in THROTTLING_ERROR_CODES:
+        return ApplicationError(
+            f"Bedrock throttled the request: {error}",
+            type="ThrottlingException",
+            next_retry_delay=limiter.retry_delay(),
+        )
+    if code in NON_RETRYABLE_ERROR_CODES:
+        return ApplicationError(str(error), type=code, non_retryable=True)
+    return None
@@ -0,0 +1,64 @@
+"""
+Deterministic local rendering of financial reports.
+
+The templates are plain format strings built once at import time, so rendering takes
+microseconds and needs no model call. The module has no I/O and is safe to use
+directly inside workflow code.
+"""
+from .models import FinancialReport
+
+_REPORT_TEMPLATE = """\
+# 📊 Financial Report
+
+**Monthly income:** ${monthly_income:,.2f}
+**Financial health score:** {financial_health_score}/10
+
+## Budget Breakdown
+
+{categories}
+
+## Recommendations
+
+{recommendations}
+
+## Investing
+
+{investment}""".format
+
+_CATEGORY_TEMPLATE = "- **{name}:** ${amount:,.2f} ({percentage:.1f}%)".format
+_RECOMMENDATION_TEMPLATE = "{number}. {text}".format
+_INVEST_TEMPLATE = "You are in a position to invest. Recommended investment amount: **${amount:,.2f}** per month.".format
+_SAVE_TEXT = "Focus on building savings before investing; no investment amount is recommended yet."
+
+_ANALYSIS_TEMPLATE = """\
+# 📈 Financial Analysis
+
+{analysis}
+
+⚠️ This analysis is for educational purposes only. Consult a financial advisor before investing.""".format
+
+
+def render_financial_report(report: FinancialReport) -> str:
+    """Render a FinancialReport as Markdown."""
+    return _REPORT_TEMPLATE(
+        monthly_income=report.monthly_income,
+        financial_health_score=report.financial_health_score,
+        categories="\n".join(
+            _CATEGORY_TEMPLATE(name=c.name, amount=c.amount, percentage=c.percentage)
+            for c in report.budget_categories
+        ),
+        recommendations="\n".join(
+            _RECOMMENDATION_TEMPLATE(number=i, text=text)
+            for i, text in enumerate(report.recommendations, 1)
+        ),
+        investment=(
+            _INVEST_TEMPLATE(amount=report.recommended_investment_amount)
+            if report.recommended_investment_amount > 0
+            else _SAVE_TEXT
+        ),
+    )
+
+
+def render_financial_analysis(analysis: str) -> str:
+    """Wrap the analysis agent's text in the report layout."""
+    return _ANALYSIS_TEMPLATE(analysis=analysis.strip())
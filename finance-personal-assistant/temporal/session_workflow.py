@@ -0,0 +1,188 @@
+import asyncio
+from datetime import timedelta
+from temporalio import workflow
+from .financial_assistant_workflow import BEDROCK_RETRY_POLICY
+from .models import (
+    BudgetAgentResult,
+    FinancialAnalysisResult,
+    FinancialReport,
+    ModelUsage,
+    SessionInput,
+    SessionReply,
+    SessionState,
+    SessionTurn,
+)
+from .pricing import estimate_cost
+from .report_templates import render_financial_analysis, render_financial_report
+from .task_queues import AGENT_TASK_QUEUE
+
+# Characters of each reply kept in session state and passed back as context
+MAX_REPLY_CHARS = 2000
+# Compacted turns kept in the summary; older ones are dropped
+MAX_SUMMARY_LINES = 50
+
+
+@workflow.defn
+class FinancialAssistantSessionWorkflow:
+    """
+    Long-running conversation with one user. Each prompt or investment amount arrives
+    as an update and is answered by a single agent activity, with the reply rendered
+    locally and returned as the update's result. Older turns are compacted to one line
+    each, and the session continues as new once its history grows past a threshold.
+    """
+
+    @workflow.init
+    def __init__(self, session: SessionInput):
+        self.session = session
+        self.state = session.state
+        self.ended = False
+        # Turns run one at a time so each one sees the previous turn's context
+        self.turn_lock = asyncio.Lock()
+
+    @workflow.update
+    async def ask(self, prompt: str) -> SessionReply:
+        """Run the budget agent on a prompt, with the conversation so far as context."""
+        async with self.turn_lock:
+            result: BudgetAgentResult = await workflow.execute_activity(
+                "budget_agent_activity",
+                args=[self._contextual_prompt(prompt)],
+                task_queue=AGENT_TASK_QUEUE,
+                start_to_close_timeout=timedelta(seconds=30),
+                retry_policy=BEDROCK_RETRY_POLICY,
+                result_type=BudgetAgentResult,
+            )
+            self.state.financial_report = result.report
+            return self._complete_turn(
+                "ask", prompt, render_financial_report(result.report), _report_digest(result.report),
+                result.usage, financial_report=result.report,
+            )
+
+    @ask.validator
+    def validate_ask(self, prompt: str) -> None:
+        if self.ended:
+            raise ValueError("Session has ended")
+        if not prompt.strip():
+            raise ValueError("Prompt must not be empty")
+
+    @workflow.update
+    async def invest(self, amount: float) -> SessionReply:
+        """Run the financial analysis for an investment amount."""
+        async with self.turn_lock:
+            result: FinancialAnalysisResult = await workflow.execute_activity(
+                "financial_analysis_activity",
+                args=[amount],
+                task_queue=AGENT_TASK_QUEUE,
+                start_to_close_timeout=timedelta(seconds=30),
+                retry_policy=BEDROCK_RETRY_POLICY,
+                result_type=FinancialAnalysisResult,
+            )
+            digest = next(
+                (line.strip() for line in result.text.splitlines() if line.strip() and not line.startswith("#")),
+                "",
+            )
+            return self._complete_turn(
+                "invest", f"{amount:,.2f}", render_financial_analysis(result.text),
+                f"analysis for ${amount:,.2f}: {digest[:200]}", result.usage,
+            )
+
+    @invest.validator
+    def validate_invest(self, amount: float) -> None:
+        if self.ended:
+            raise ValueError("Session has ended")
+        if amount <= 0:
+            raise ValueError("Investment amount must be positive")
+
+    @workflow.signal
+    def end_session(self) -> None:
+        """Complete the session once the current turns finish."""
+        self.ended = True
+
+    @workflow.query
+    def get_state(self) -> SessionState:
+        """Query handler to get the compacted session state and usage totals."""
+        return self.state
+
+    @workflow.run
+    async def run(self, session: SessionInput) -> SessionState:
+        workflow.logger.info(f"🚀 Session for {session.user_id} at turn {self.state.turn_count}")
+        idle_timeout = timedelta(seconds=session.idle_timeout_seconds)
+        while not self.ended:
+            turns = self.state.turn_count
+            try:
+                await workflow.wait_condition(
+                    lambda: self.ended or self.state.turn_count != turns or self._should_continue_as_new(),
+                    timeout=idle_timeout,
+                )
+            except asyncio.TimeoutError:
+                if self.turn_lock.locked():
+                    continue
+                workflow.logger.info("💤 Session idle, ending")
+                break
+
+            if self._should_continue_as_new() and not self.ended:
+                # Let in-flight turns reply before handing the state to the next run
+                await workflow.wait_condition(workflow.all_handlers_finished)
+                workflow.logger.info(f"🔁 Continuing session as new after turn {self.state.turn_count}")
+                workflow.continue_as_new(session.model_copy(update={"state": self.state}))
+
+        await workflow.wait_condition(workflow.all_handlers_finished)
+        workflow.logger.info("✅ Session finished")
+        return self.state
+
+    def _should_continue_as_new(self) -> bool:
+        info = workflow.info()
+        return (
+            info.is_continue_as_new_suggested()
+            or info.get_current_history_length() > self.session.max_history_events
+        )
+
+    def _contextual_prompt(self, prompt: str) -> str:
+        """The prompt, preceded by the compacted summary and the recent turns."""
+        if not self.state.summary and not self.state.recent_turns:
+            return prompt
+        lines = ["Conversation so far:"]
+        lines += [f"- {line}" for line in self.state.summary]
+        for turn in self.state.recent_turns:
+            request = turn.request if turn.kind == "ask" else f"Analyze investing ${turn.request}"
+            lines += [f"User: {request}", f"Assistant: {turn.reply}"]
+        lines += ["", f"Current request: {prompt}"]
+        return "\n".join(lines)
+
+    def _complete_turn(
+        self,
+        kind: str,
+        request: str,
+        text: str,
+        digest: str,
+        usage: ModelUsage,
+        financial_report: FinancialReport | None = None,
+    ) -> SessionReply:
+        """Record a finished turn, compact the oldest turns and add up usage."""
+        self.state.turn_count += 1
+        self.state.recent_turns.append(
+            SessionTurn(kind=kind, request=request, reply=text[:MAX_REPLY_CHARS], digest=digest)
+        )
+        while len(self.state.recent_turns) > self.session.max_recent_turns:
+            turn = self.state.recent_turns.pop(0)
+            self.state.summary.append(f"{turn.kind} {turn.request[:200]} -> {turn.digest}")
+        del self.state.summary[:-MAX_SUMMARY_LINES]
+
+        self.state.input_tokens += usage.input_tokens
+        self.state.output_tokens += usage.output_tokens
+        self.state.estimated_cost_usd += estimate_cost(
+            usage.model_id,
+            usage.input_tokens,
+            usage.output_tokens,
+            usage.cache_read_input_tokens,
+            usage.cache_write_input_tokens,
+        )
+        return SessionReply(
+            turn=self.state.turn_count, text=text, financial_report=financial_report, usage=usage
+        )
+
+
+def _report_digest(report: FinancialReport) -> str:
+    return (
+        f"income ${report.monthly_income:,.0f}/month, health score {report.financial_health_score}/10, "
+        f"recommended investment ${report.recommended_investment_amount or 0:,.0f}"
+    )
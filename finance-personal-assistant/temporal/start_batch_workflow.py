@@ -0,0 +1,75 @@
+import argparse
+import asyncio
+import json
+import os
+import uuid
+
+from temporalio.client import Client
+
+from .models import BatchInput, BatchPrompt, BatchSummary
+from .payload_codec import data_converter
+from .task_queues import WORKFLOW_TASK_QUEUE
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Start a FinancialAssistantBatchWorkflow over a JSONL file of prompts."
+    )
+    parser.add_argument("jsonl_path", help='JSONL file with {"prompt": ..., "investment_amount": ..., "id": ...} lines')
+    parser.add_argument("--inline", action="store_true",
+                        help="Send the prompts in the workflow input instead of having the worker read the file")
+    parser.add_argument("--max-in-flight", type=int, default=20, help="Maximum concurrent child workflows")
+    parser.add_argument("--continue-as-new-every", type=int, default=500,
+                        help="Child workflows per run before continuing as new")
+    args = parser.parse_args()
+    if args.max_in_flight < 1 or args.continue_as_new_every < 1:
+        parser.error("--max-in-flight and --continue-as-new-every must be at least 1")
+
+    if args.inline:
+        with open(args.jsonl_path, encoding="utf-8") as f:
+            prompts = [BatchPrompt(**json.loads(line)) for line in f if line.strip()]
+        batch = BatchInput(prompts=prompts)
+    else:
+        batch = BatchInput(jsonl_path=os.path.abspath(args.jsonl_path))
+    batch.max_in_flight = args.max_in_flight
+    batch.continue_as_new_every = args.continue_as_new_every
+
+    # Get Temporal configuration from environment variables
+    temporal_address = os.getenv("TEMPORAL_ADDRESS", "us-east-1.aws.api.temporal.io:7233")
+    temporal_namespace = os.getenv("TEMPORAL_NAMESPACE", "default")
+    temporal_api_key = os.getenv("TEMPORAL_API_KEY")
+
+    print(f"Connecting to Temporal Cloud at {temporal_address}...")
+    client = await Client.connect(
+        temporal_address,
+        namespace=temporal_namespace,
+        tls=True,  # Enable TLS for cloud connection
+        rpc_metadata={
+            "authorization": f"Bearer {temporal_api_key}"
+        },
+        data_converter=data_converter()
+    )
+    print("✅ Connected to Temporal Cloud")
+
+    workflow_id = f"financial-assistant-batch-{uuid.uuid4()}"
+    workflow_handle = await client.start_workflow(
+        "FinancialAssistantBatchWorkflow",
+        batch,
+        id=workflow_id,
+        task_queue=WORKFLOW_TASK_QUEUE,
+        result_type=BatchSummary,
+    )
+    print(f"✅ Started batch workflow: {workflow_id}")
+
+    summary = await workflow_handle.result()
+    print("\n" + "="*80)
+    print("✅ Batch completed!")
+    print("="*80)
+    print(f"Total: {summary.total}  Succeeded: {summary.succeeded}  Failed: {summary.failed}")
+    for failure in summary.failures:
+        print(f"• #{failure.index} {failure.workflow_id}: {failure.error}")
+    print("="*80)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
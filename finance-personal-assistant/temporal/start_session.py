@@ -0,0 +1,122 @@
+import argparse
+import asyncio
+import os
+import time
+from typing import Any
+
+from temporalio.client import Client, WithStartWorkflowOperation
+from temporalio.common import WorkflowIDConflictPolicy, WorkflowIDReusePolicy
+from temporalio.exceptions import WorkflowAlreadyStartedError
+
+# Workflows are referenced by name so the client does not import workflow code
+from .models import SessionInput, SessionReply, SessionState
+from .payload_codec import data_converter
+from .start_workflow import AsyncLineReader
+from .task_queues import WORKFLOW_TASK_QUEUE
+
+
+def session_workflow_id(user_id: str) -> str:
+    return f"financial-assistant-session-{user_id}"
+
+
+async def run_turn(client: Client, user_id: str, update: str, arg: Any, new_session: bool = False) -> SessionReply:
+    """
+    Send one turn as an update and wait for its reply. The session is started by the
+    same request if it is not already running.
+
+    Once the user's session has ended, its state is gone, so a turn raises
+    WorkflowAlreadyStartedError instead of silently starting over with empty state.
+    Pass new_session to start a new session in that case.
+    """
+    start = WithStartWorkflowOperation(
+        "FinancialAssistantSessionWorkflow",
+        SessionInput(user_id=user_id),
+        id=session_workflow_id(user_id),
+        id_conflict_policy=WorkflowIDConflictPolicy.USE_EXISTING,
+        id_reuse_policy=(
+            WorkflowIDReusePolicy.ALLOW_DUPLICATE if new_session else WorkflowIDReusePolicy.REJECT_DUPLICATE
+        ),
+        task_queue=WORKFLOW_TASK_QUEUE,
+    )
+    return await client.execute_update_with_start_workflow(
+        update, arg, start_workflow_operation=start, result_type=SessionReply
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Chat with a FinancialAssistantSessionWorkflow.")
+    parser.add_argument("user_id", nargs="?", help="User whose session to join; prompted for if omitted")
+    parser.add_argument("--new", action="store_true",
+                        help="Start a new session, with empty state, if this user's previous one has ended")
+    args = parser.parse_args()
+
+    stdin = AsyncLineReader()
+    user_id = args.user_id or await stdin.readline("User ID: ")
+    new_session = args.new
+
+    # Get Temporal configuration from environment variables
+    temporal_address = os.getenv("TEMPORAL_ADDRESS", "us-east-1.aws.api.temporal.io:7233")
+    temporal_namespace = os.getenv("TEMPORAL_NAMESPACE", "default")
+    temporal_api_key = os.getenv("TEMPORAL_API_KEY")
+
+    print(f"Connecting to Temporal Cloud at {temporal_address}...")
+    client = await Client.connect(
+        temporal_address,
+        namespace=temporal_namespace,
+        tls=True,  # Enable TLS for cloud connection
+        rpc_metadata={
+            "authorization": f"Bearer {temporal_api_key}"
+        },
+        data_converter=data_converter()
+    )
+    print(f"✅ Connected to Temporal Cloud, session {session_workflow_id(user_id)}")
+
+    print("\nCommands:")
+    print("  - Enter a question to get a budget report")
+    print("  - Enter a number to get an investment analysis for that amount")
+    print("  - 'usage' to show the session's tokens and estimated cost")
+    print("  - 'end' to end the session, 'quit' or 'exit' to leave it running and exit")
+    while True:
+        try:
+            user_input = await stdin.readline("> ")
+            if not user_input:
+                continue
+            if user_input.lower() in ['quit', 'exit', 'q']:
+                break
+            if user_input.lower() == 'end':
+                await client.get_workflow_handle(session_workflow_id(user_id)).signal("end_session")
+                print("✅ Session ended")
+                break
+            if user_input.lower() == 'usage':
+                state = await client.get_workflow_handle(session_workflow_id(user_id)).query(
+                    "get_state", result_type=SessionState
+                )
+                print(
+                    f"{state.turn_count} turns, {state.input_tokens} input / {state.output_tokens} output tokens,"
+                    f" ${state.estimated_cost_usd:.4f}"
+                )
+                continue
+
+            try:
+                update, arg = "invest", float(user_input)
+            except ValueError:
+                update, arg = "ask", user_input
+            started = time.perf_counter()
+            reply = await run_turn(client, user_id, update, arg, new_session)
+            # Only the first turn may start over; a session ended later is reported below
+            new_session = False
+            print(reply.text)
+            print(f"⏱️  Turn {reply.turn} answered in {time.perf_counter() - started:.1f}s")
+        except WorkflowAlreadyStartedError:
+            print(f"❌ Session {session_workflow_id(user_id)} has ended and its state is gone."
+                  " Run again with --new to start a new session.")
+            break
+        except (KeyboardInterrupt, EOFError):
+            print("\nExiting...")
+            break
+        except Exception as e:
+            print(f"❌ Error: {e}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,12 +1,62 @@
+import argparse
 import asyncio
+import json
 import os
+import statistics
 import sys
+import threading
+import time
 import uuid
+from typing import List, Optional
 
+from pydantic import ValidationError
 from temporalio.client import Client
 
-from .financial_assistant_workflow import FinancialAssistantWorkflow
-from temporalio.contrib.pydantic import pydantic_data_converter
+# Workflows are referenced by name so the client does not import workflow code
+from .models import BatchPrompt, FinancialAssistantOptions, PartialReport, UsageReport
+from .payload_codec import data_converter
+from .task_queues import WORKFLOW_TASK_QUEUE
+
+# How often to poll the workflow for newly streamed report text
+STREAM_POLL_INTERVAL_SECONDS = 0.2
+
+DEFAULT_PROMPT = "Generate a comprehensive financial report for someone earning $6000/month with $800 dining expenses."
+
+
+class AsyncLineReader:
+    """
+    Reads stdin lines without blocking the event loop. The blocking read runs on a
+    daemon thread, so a read still waiting when the program exits does not hold it
+    open. A pending read is kept across calls, so giving up on a line (for example
+    because the workflow finished first) never loses input.
+    """
+
+    def __init__(self):
+        self._pending: Optional[asyncio.Future] = None
+
+    def next_line(self) -> asyncio.Future:
+        """Future for the next line, or "" at end of input."""
+        if self._pending is None or self._pending.done():
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+
+            def read() -> None:
+                line = sys.stdin.readline()
+                try:
+                    loop.call_soon_threadsafe(lambda: future.done() or future.set_result(line))
+                except RuntimeError:
+                    pass  # The event loop has already closed
+
+            threading.Thread(target=read, name="stdin", daemon=True).start()
+            self._pending = future
+        return self._pending
+
+    async def readline(self, prompt: str = "") -> str:
+        print(prompt, end="", flush=True)
+        line = await self.next_line()
+        if not line:
+            raise EOFError
+        return line.strip()
 
 
 def is_guid(s: str) -> bool:
@@ -18,38 +68,64 @@ def is_guid(s: str) -> bool:
         return False
 
 
-async def main():
-    # Get input string from command line argument or prompt
-    if len(sys.argv) > 1:
-        input_string = sys.argv[1]
-    else:
-        input_string = input("Enter a string (GUID to connect to existing workflow, or any string to start new): ").strip()
+async def stream_report(workflow_handle, result_task, stop_stages: set[str], printed: int = 0) -> int:
+    """
+    Print report text as the workflow streams it, until the workflow reaches one of
+    stop_stages or finishes. Returns the number of characters printed so far.
+    """
+    while True:
+        try:
+            partial = await workflow_handle.query(
+                "get_partial_report", result_type=PartialReport
+            )
+        except Exception as e:
+            print(f"\n⚠️  Could not query partial report: {e}")
+            return printed
+        if len(partial.text) > printed:
+            print(partial.text[printed:], end="", flush=True)
+            printed = len(partial.text)
+        if partial.stage in stop_stages or result_task.done():
+            print()
+            return printed
+        await asyncio.sleep(STREAM_POLL_INTERVAL_SECONDS)
 
-    # Get Temporal configuration from environment variables
-    temporal_address = os.getenv("TEMPORAL_ADDRESS", "us-east-1.aws.api.temporal.io:7233")
-    temporal_namespace = os.getenv("TEMPORAL_NAMESPACE", "default")
-    temporal_api_key = os.getenv("TEMPORAL_API_KEY") 
 
-    print(f"Connecting to Temporal Cloud at {temporal_address}...")
-    client = await Client.connect(
-        temporal_address,
-        namespace=temporal_namespace,
-        tls=True,  # Enable TLS for cloud connection
-        rpc_metadata={
-            "authorization": f"Bearer {temporal_api_key}"
-        },
-        data_converter=pydantic_data_converter
+async def print_usage(workflow_handle) -> None:
+    """Print the workflow's token usage and estimated cost per step."""
+    usage = await workflow_handle.query("get_usage", result_type=UsageReport)
+    print(
+        f"{'step':<38} {'calls':>5} {'input':>8} {'cache r':>8} {'cache w':>8} {'output':>8}"
+        f" {'seconds':>8} {'cost $':>8}"
     )
-    print("✅ Connected to Temporal Cloud")
+    for step in usage.steps:
+        print(
+            f"{step.step:<38} {step.model_calls:>5} {step.input_tokens:>8} {step.cache_read_input_tokens:>8}"
+            f" {step.cache_write_input_tokens:>8} {step.output_tokens:>8}"
+            f" {step.duration_seconds:>8.1f} {step.estimated_cost_usd:>8.4f}"
+        )
+    print(
+        f"{'total':<38} {'':>5} {usage.input_tokens:>8} {usage.cache_read_input_tokens:>8}"
+        f" {usage.cache_write_input_tokens:>8} {usage.output_tokens:>8} {'':>8} {usage.estimated_cost_usd:>8.4f}"
+    )
+
+
+def print_result(result: str) -> None:
+    print("\n" + "="*80)
+    print("✅ Workflow completed!")
+    print("="*80)
+    print(result)
+    print("="*80)
+
 
-    workflow_id = None
-    workflow_handle = None
+async def interactive(client: Client, target: Optional[str], options: FinancialAssistantOptions) -> None:
+    """Start or attach to one workflow and drive it from the terminal."""
+    stdin = AsyncLineReader()
+    if target is None:
+        target = await stdin.readline("Enter a string (GUID to connect to existing workflow, or a prompt to start new): ")
 
-    if is_guid(input_string):
+    if is_guid(target):
         # Get handle to existing workflow that ends with this GUID
-        # We'll search for workflows with this GUID suffix
-        # For now, we'll construct the workflow ID assuming it ends with the GUID
-        workflow_id = f"financial-assistant-workflow-{input_string}"
+        workflow_id = f"financial-assistant-workflow-{target}"
         workflow_handle = client.get_workflow_handle(workflow_id)
         print(f"✅ Connected to existing workflow: {workflow_id}")
         
@@ -64,43 +140,50 @@ async def main():
             print(f"⚠️  Could not query recommended investment amount: {e}")
     else:
         # Start a new workflow with a new GUID appended to the workflow ID
-        new_guid = str(uuid.uuid4())
-        workflow_id = f"financial-assistant-workflow-{new_guid}"
-        
+        workflow_id = f"financial-assistant-workflow-{uuid.uuid4()}"
         workflow_handle = await client.start_workflow(
-            FinancialAssistantWorkflow.run,
-            "Generate a comprehensive financial report for someone earning $6000/month with $800 dining expenses.",
+            "FinancialAssistantWorkflow",
+            args=[target or DEFAULT_PROMPT, options],
             id=workflow_id,
-            task_queue="financial-assistant-task-queue",
+            task_queue=WORKFLOW_TASK_QUEUE,
         )
         print(f"✅ Started new workflow: {workflow_id}")
 
     # Start a background task to wait for workflow completion
     workflow_result_task = asyncio.create_task(workflow_handle.result())
+
+    # Print the budget report as it is generated
+    print("\n📝 Budget report:")
+    printed = await stream_report(
+        workflow_handle, workflow_result_task, {"awaiting_investment_amount", "completed"}
+    )
     
     # Enter loop waiting for user input
     print("\nCommands:")
     print("  - Enter a number to send as a signal to the workflow")
     print("  - 'query' or 'recommended' to get the recommended investment amount")
+    print("  - 'usage' to show tokens and estimated cost per step")
     print("  - 'quit' or 'exit' to exit")
+    print("> ", end="", flush=True)
     while True:
         try:
-            # Check if workflow has completed
+            # Wait for a line or for the workflow to finish, whichever comes first
+            line = stdin.next_line()
+            await asyncio.wait({line, workflow_result_task}, return_when=asyncio.FIRST_COMPLETED)
             if workflow_result_task.done():
                 try:
-                    result = await workflow_result_task
-                    print("\n" + "="*80)
-                    print("✅ Workflow completed!")
-                    print("="*80)
-                    print(result)
-                    print("="*80)
-                    break
+                    print_result(await workflow_result_task)
                 except Exception as e:
                     print(f"\n❌ Workflow completed with error: {e}")
-                    break
-            
-            user_input = input("> ").strip()
-            
+                break
+
+            user_input = line.result()
+            if not user_input:
+                print("\nExiting...")
+                workflow_result_task.cancel()
+                break
+            user_input = user_input.strip()
+
             if user_input.lower() in ['quit', 'exit', 'q']:
                 print("Exiting...")
                 workflow_result_task.cancel()
@@ -116,30 +199,26 @@ async def main():
                         print("ℹ️  Recommended investment amount not yet available")
                 except Exception as e:
                     print(f"⚠️  Could not query recommended investment amount: {e}")
-                continue
-            
-            # Try to parse as a number
-            try:
-                number = float(user_input)
-                # Send signal to the workflow
-                await workflow_handle.signal("set_investment_amount", number)
-                print(f"✅ Sent signal with number: {number}")
-                
-                # Check again if workflow completed after sending signal
-                if workflow_result_task.done():
-                    try:
-                        result = await workflow_result_task
-                        print("\n" + "="*80)
-                        print("✅ Workflow completed!")
-                        print("="*80)
-                        print(result)
-                        print("="*80)
-                        break
-                    except Exception as e:
-                        print(f"\n❌ Workflow completed with error: {e}")
-                        break
-            except ValueError:
-                print(f"⚠️  '{user_input}' is not a valid number. Please enter a number, 'query', or 'quit' to exit.")
+            elif user_input.lower() == 'usage':
+                try:
+                    await print_usage(workflow_handle)
+                except Exception as e:
+                    print(f"⚠️  Could not query usage: {e}")
+            else:
+                try:
+                    number = float(user_input)
+                except ValueError:
+                    print(f"⚠️  '{user_input}' is not a valid number. Please enter a number, 'query', or 'quit' to exit.")
+                else:
+                    # Send signal to the workflow
+                    await workflow_handle.signal("set_investment_amount", number)
+                    print(f"✅ Sent signal with number: {number}")
+
+                    # Print the financial analysis as it is generated
+                    printed = await stream_report(
+                        workflow_handle, workflow_result_task, {"completed"}, printed
+                    )
+            print("> ", end="", flush=True)
         except KeyboardInterrupt:
             print("\nExiting...")
             break
@@ -147,5 +226,128 @@ async def main():
             print(f"❌ Error: {e}")
 
 
+def _percentiles(values: List[float]) -> str:
+    if len(values) < 2:
+        return " ".join(f"{v:.2f}s" for v in values) or "-"
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return f"p50 {cuts[49]:.2f}s  p95 {cuts[94]:.2f}s  p99 {cuts[98]:.2f}s  max {max(values):.2f}s"
+
+
+async def bulk(client: Client, args: argparse.Namespace, options: FinancialAssistantOptions) -> None:
+    """
+    Run one workflow per JSONL line with at most args.concurrency in flight. Each
+    workflow is started together with its investment amount signal in one request
+    (signal-with-start), and each result is written to args.output as it completes.
+    """
+    semaphore = asyncio.Semaphore(args.concurrency)
+    start_latencies: List[float] = []
+    latencies: List[float] = []
+    failed = 0
+
+    with open(args.bulk, encoding="utf-8") as prompts, open(args.output, "w", encoding="utf-8") as output:
+        def write(record: dict) -> None:
+            output.write(json.dumps(record) + "\n")
+            output.flush()
+
+        async def run_one(index: int, entry: BatchPrompt) -> None:
+            nonlocal failed
+            workflow_id = f"financial-assistant-workflow-{entry.id or uuid.uuid4()}"
+            record = {"index": index, "id": entry.id, "workflow_id": workflow_id}
+            started = time.perf_counter()
+            try:
+                handle = await client.start_workflow(
+                    "FinancialAssistantWorkflow",
+                    args=[entry.prompt, options],
+                    id=workflow_id,
+                    task_queue=WORKFLOW_TASK_QUEUE,
+                    start_signal="set_investment_amount",
+                    start_signal_args=[entry.investment_amount],
+                )
+                start_latencies.append(time.perf_counter() - started)
+                record["result"] = await handle.result()
+                latencies.append(time.perf_counter() - started)
+            except Exception as e:
+                failed += 1
+                record["error"] = f"{type(e).__name__}: {e}"
+            finally:
+                semaphore.release()
+            record["seconds"] = round(time.perf_counter() - started, 3)
+            write(record)
+
+        started = time.perf_counter()
+        tasks = []
+        try:
+            for index, line in enumerate(prompts):
+                if not line.strip():
+                    continue
+                # A malformed line is recorded as failed and the rest of the file still runs
+                try:
+                    entry = BatchPrompt.model_validate_json(line)
+                except ValidationError as e:
+                    failed += 1
+                    write({"index": index, "error": f"Invalid entry: {e}"})
+                    continue
+                # Read the file lazily so only the in-flight entries are held in memory
+                await semaphore.acquire()
+                try:
+                    tasks.append(asyncio.create_task(run_one(index, entry)))
+                except BaseException:
+                    semaphore.release()
+                    raise
+                tasks = [task for task in tasks if not task.done()]
+        finally:
+            # Even if reading the file fails, wait for the workflows already started
+            await asyncio.gather(*tasks, return_exceptions=True)
+        elapsed = time.perf_counter() - started
+
+    completed = len(latencies)
+    print(f"✅ {completed} completed, {failed} failed in {elapsed:.1f}s ({completed / elapsed:.2f} workflows/s)")
+    print(f"Start latency:      {_percentiles(start_latencies)}")
+    print(f"End-to-end latency: {_percentiles(latencies)}")
+    print(f"Results written to {args.output}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Run FinancialAssistantWorkflow interactively or in bulk.")
+    parser.add_argument("target", nargs="?",
+                        help="GUID of a workflow to connect to, or a prompt to start a new one with")
+    parser.add_argument("--bulk", metavar="JSONL",
+                        help='Run one workflow per {"prompt": ..., "investment_amount": ..., "id": ...} line')
+    parser.add_argument("--output", default="results.jsonl", help="Where bulk mode writes one result per line")
+    parser.add_argument("--concurrency", type=int, default=50, help="Workflows in flight at once in bulk mode")
+    args = parser.parse_args()
+
+    options = FinancialAssistantOptions(
+        formatting_mode=os.getenv("REPORT_FORMATTING_MODE", "llm"),
+        risk_level=os.getenv("RISK_LEVEL", "moderate"),
+    )
+
+    # Get Temporal configuration from environment variables
+    temporal_address = os.getenv("TEMPORAL_ADDRESS", "us-east-1.aws.api.temporal.io:7233")
+    temporal_namespace = os.getenv("TEMPORAL_NAMESPACE", "default")
+    temporal_api_key = os.getenv("TEMPORAL_API_KEY") 
+
+    print(f"Connecting to Temporal Cloud at {temporal_address}...")
+    client = await Client.connect(
+        temporal_address,
+        namespace=temporal_namespace,
+        tls=True,  # Enable TLS for cloud connection
+        rpc_metadata={
+            "authorization": f"Bearer {temporal_api_key}"
+        },
+        data_converter=data_converter()
+    )
+    print("✅ Connected to Temporal Cloud")
+
+    if args.bulk:
+        # The amount is signalled at start, so there is nothing to speculate on
+        await bulk(client, args, options.model_copy(update={"speculative_analysis": False}))
+    else:
+        try:
+            await interactive(client, args.target, options)
+        except EOFError:
+            print("\nExiting...")
+
+
 if __name__ == "__main__":
     asyncio.run(main())
@@ -0,0 +1,12 @@
+"""
+Task queue names.
+
+Workflows run on WORKFLOW_TASK_QUEUE. Activities are routed to a queue per kind of
+work, so slow agent sessions, short formatting calls and market-data I/O each get
+their own pollers and slots and never wait behind one another.
+"""
+
+WORKFLOW_TASK_QUEUE = "financial-assistant-task-queue"
+AGENT_TASK_QUEUE = "financial-assistant-agent"
+LLM_FORMAT_TASK_QUEUE = "financial-assistant-llm-format"
+MARKET_DATA_TASK_QUEUE = "financial-assistant-market-data"
@@ -0,0 +1,197 @@
+"""
+Metrics for the worker, exported through the Temporal runtime's Prometheus endpoint.
+
+The worker installs a runtime with a Prometheus exporter before connecting. Temporal's
+own metrics (including activity schedule-to-start latency) and the custom metrics
+recorded here are then scraped from the same local address. Code that runs without
+that runtime, such as the benchmarks, records into a no-op meter.
+"""
+import functools
+import os
+import time
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+from temporalio import activity
+from temporalio.client import Interceptor as ClientInterceptor
+from temporalio.common import MetricMeter
+from temporalio.runtime import PrometheusConfig, Runtime, TelemetryConfig
+from temporalio.worker import (
+    ActivityInboundInterceptor,
+    ExecuteActivityInput,
+    Interceptor,
+)
+
+METRICS_BIND_ADDRESS = os.getenv("METRICS_BIND_ADDRESS", "127.0.0.1:9464")
+
+# LLM calls and agent sessions take seconds to minutes, beyond the default buckets
+LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120]
+
+
+def install_runtime(bind_address: str = METRICS_BIND_ADDRESS) -> Runtime:
+    """Create the process-wide Temporal runtime with a Prometheus scrape endpoint."""
+    runtime = Runtime(
+        telemetry=TelemetryConfig(
+            metrics=PrometheusConfig(
+                bind_address=bind_address,
+                durations_as_seconds=True,
+                histogram_bucket_overrides={
+                    "financial_assistant_bedrock_request_latency": LATENCY_BUCKETS,
+                    "financial_assistant_activity_latency": LATENCY_BUCKETS,
+                    "financial_assistant_activity_schedule_to_start_latency": LATENCY_BUCKETS,
+                },
+            )
+        )
+    )
+    Runtime.set_default(runtime)
+    return runtime
+
+
+def _meter() -> MetricMeter:
+    return Runtime.default().metric_meter
+
+
+@functools.lru_cache(maxsize=None)
+def histogram(name: str, description: str, unit: str = "s"):
+    return _meter().create_histogram_float(name, description, unit)
+
+
+@functools.lru_cache(maxsize=None)
+def counter(name: str, description: str, unit: Optional[str] = None):
+    return _meter().create_counter(name, description, unit)
+
+
+@functools.lru_cache(maxsize=None)
+def gauge(name: str, description: str, unit: Optional[str] = None):
+    return _meter().create_gauge(name, description, unit)
+
+
+def record_bedrock_call(
+    model_id: str,
+    operation: str,
+    latency_seconds: float,
+    input_tokens: Optional[int] = None,
+    output_tokens: Optional[int] = None,
+    cache_read_input_tokens: Optional[int] = None,
+    cache_write_input_tokens: Optional[int] = None,
+) -> None:
+    """Record one Bedrock request's latency and, when the response reports it, its usage."""
+    attributes = {"model_id": model_id, "operation": operation}
+    histogram(
+        "financial_assistant_bedrock_request_latency", "Bedrock request latency"
+    ).record(latency_seconds, attributes)
+    if input_tokens is not None:
+        counter(
+            "financial_assistant_bedrock_input_tokens", "Bedrock input tokens", "tokens"
+        ).add(input_tokens, attributes)
+    if output_tokens is not None:
+        counter(
+            "financial_assistant_bedrock_output_tokens", "Bedrock output tokens", "tokens"
+        ).add(output_tokens, attributes)
+    if cache_read_input_tokens:
+        counter(
+            "financial_assistant_bedrock_cache_read_tokens", "Bedrock input tokens read from the prompt cache", "tokens"
+        ).add(cache_read_input_tokens, attributes)
+    if cache_write_input_tokens:
+        counter(
+            "financial_assistant_bedrock_cache_write_tokens", "Bedrock input tokens written to the prompt cache", "tokens"
+        ).add(cache_write_input_tokens, attributes)
+
+
+def record_compaction(model_id: str, mode: str, tokens_saved: int) -> None:
+    """Count a conversation compaction and the estimated input tokens it saved."""
+    attributes = {"model_id": model_id, "mode": mode}
+    counter("financial_assistant_message_compactions", "Requests whose messages were compacted").add(1, attributes)
+    counter(
+        "financial_assistant_compaction_tokens_saved", "Estimated input tokens removed by compaction", "tokens"
+    ).add(max(tokens_saved, 0), attributes)
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    """Count a cache lookup; the hit rate is hits / (hits + misses)."""
+    name = "financial_assistant_cache_hits" if hit else "financial_assistant_cache_misses"
+    counter(name, f"Cache {'hits' if hit else 'misses'}").add(1, {"cache": cache})
+
+
+def record_agent_pool(pool: str, stats: Dict[str, int]) -> None:
+    """Set an agent pool's size gauges from its current stats."""
+    attributes = {"pool": pool}
+    gauge("financial_assistant_agent_pool_size", "Maximum agents in the pool").set(stats["size"], attributes)
+    gauge("financial_assistant_agent_pool_created", "Agents the pool has built").set(stats["created"], attributes)
+    gauge("financial_assistant_agent_pool_in_use", "Agents checked out of the pool").set(stats["in_use"], attributes)
+    gauge("financial_assistant_agent_pool_idle", "Agents idle in the pool").set(stats["idle"], attributes)
+
+
+def record_agent_checkout(pool: str, waited: bool) -> None:
+    """Count an agent checkout, and whether it had to wait for a free agent."""
+    attributes = {"pool": pool}
+    counter("financial_assistant_agent_pool_checkouts", "Agent pool checkouts").add(1, attributes)
+    if waited:
+        counter("financial_assistant_agent_pool_waits", "Agent pool checkouts that waited for an agent").add(1, attributes)
+
+
+class ToolMetricsHook:
+    """Strands hook provider that records each tool call's count and duration."""
+
+    def __init__(self, agent_name: str):
+        self.agent_name = agent_name
+
+    def register_hooks(self, registry: Any, **kwargs: Any) -> None:
+        from strands.hooks import AfterToolCallEvent
+
+        registry.add_callback(AfterToolCallEvent, self._after_tool_call)
+
+    def _after_tool_call(self, event: Any) -> None:
+        attributes = {
+            "agent": self.agent_name,
+            "tool": event.tool_use.get("name", "unknown"),
+            "outcome": "error" if event.exception else "success",
+        }
+        counter("financial_assistant_tool_calls", "Agent tool calls").add(1, attributes)
+        if event.duration is not None:
+            histogram(
+                "financial_assistant_tool_call_duration", "Agent tool call duration"
+            ).record(event.duration, attributes)
+
+
+class TelemetryInterceptor(Interceptor):
+    """Worker interceptor that records per-activity latency and schedule-to-start time."""
+
+    def intercept_activity(self, next: ActivityInboundInterceptor) -> ActivityInboundInterceptor:
+        return _ActivityTelemetry(next)
+
+
+class _ActivityTelemetry(ActivityInboundInterceptor):
+    async def execute_activity(self, input: ExecuteActivityInput) -> Any:
+        info = activity.info()
+        meter = activity.metric_meter()
+        attributes = {"activity_type": info.activity_type, "task_queue": info.task_queue}
+        schedule_to_start = info.started_time - info.current_attempt_scheduled_time
+        meter.create_histogram_timedelta(
+            "financial_assistant_activity_schedule_to_start_latency",
+            "Time activities wait in the task queue",
+            "s",
+        ).record(max(schedule_to_start, timedelta(0)), attributes)
+
+        started = time.monotonic()
+        outcome = "failure"
+        try:
+            result = await self.next.execute_activity(input)
+            outcome = "success"
+            return result
+        finally:
+            meter.create_histogram_float(
+                "financial_assistant_activity_latency", "Activity execution latency", "s"
+            ).record(time.monotonic() - started, {**attributes, "outcome": outcome})
+
+
+def client_interceptors(otel_tracing: bool = False) -> List[ClientInterceptor]:
+    """
+    Client interceptors: OpenTelemetry tracing if requested (requires opentelemetry).
+    Workers created from the client pick it up as well.
+    """
+    if not otel_tracing:
+        return []
+    from temporalio.contrib.opentelemetry import TracingInterceptor
+
+    return [TracingInterceptor()]
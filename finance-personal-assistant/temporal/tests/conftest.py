@@ -0,0 +1,18 @@
+import pytest
+
+from temporal import bedrock_client, llm_cache
+from temporal.fake_bedrock import FakeBedrockConfig, FakeBedrockServer, Latency
+from temporal.llm_cache import ResponseCache
+
+
+@pytest.fixture
+def fake_bedrock(monkeypatch):
+    """A local fake Bedrock server that every region's client talks to, and an empty response cache."""
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "fake")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "fake")
+    monkeypatch.setattr(llm_cache, "_cache", ResponseCache())
+    config = FakeBedrockConfig(latency=Latency("fixed", [0.0]), chunk_interval=Latency("fixed", [0.0]), seed=0)
+    with FakeBedrockServer(config) as server:
+        monkeypatch.setattr(bedrock_client, "_clients", {})
+        monkeypatch.setattr(bedrock_client, "BEDROCK_ENDPOINT_URL", server.url)
+        yield server.fake
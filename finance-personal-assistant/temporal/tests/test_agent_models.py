@@ -0,0 +1,22 @@
+from temporal import bedrock_client
+from temporal.agent_models import get_bedrock_model
+
+MODEL_ID = "us.anthropic.claude-3-7-sonnet-20250219-v1:0"
+
+
+def build_model(monkeypatch, prompt_caching: bool):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "test")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "test")
+    monkeypatch.setattr(bedrock_client, "_clients", {})
+    # Bypass the shared-model cache so each test builds its own
+    return get_bedrock_model.__wrapped__(MODEL_ID, "us-west-2", prompt_caching=prompt_caching)
+
+
+def test_prompt_caching_sets_cache_config(monkeypatch):
+    config = build_model(monkeypatch, prompt_caching=True).config
+    assert config["cache_config"].strategy == "auto"
+    assert config["cache_config"].tools_ttl is True
+
+
+def test_no_cache_config_without_prompt_caching(monkeypatch):
+    assert "cache_config" not in build_model(monkeypatch, prompt_caching=False).config
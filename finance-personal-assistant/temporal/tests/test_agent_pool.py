@@ -0,0 +1,46 @@
+import pytest
+from temporalio.runtime import BUFFERED_METRIC_KIND_COUNTER, MetricBuffer, Runtime, TelemetryConfig
+
+from temporal import telemetry
+from temporal.agent_pool import AgentPool
+
+
+@pytest.fixture
+def metrics(monkeypatch):
+    """Point the telemetry meter at a runtime whose metrics are buffered for inspection."""
+    buffer = MetricBuffer(1000)
+    runtime = Runtime(telemetry=TelemetryConfig(metrics=buffer))
+    monkeypatch.setattr(Runtime, "default", staticmethod(lambda: runtime))
+    telemetry.gauge.cache_clear()
+    telemetry.counter.cache_clear()
+    yield buffer
+    telemetry.gauge.cache_clear()
+    telemetry.counter.cache_clear()
+
+
+def pool_metrics(buffer: MetricBuffer) -> dict:
+    """Latest gauge values and counter increments since the last call, by short name."""
+    values = {}
+    for update in buffer.retrieve_updates():
+        name = update.metric.name.removeprefix("financial_assistant_agent_pool_")
+        if update.metric.kind == BUFFERED_METRIC_KIND_COUNTER:
+            values[name] = values.get(name, 0) + update.value
+        else:
+            values[name] = update.value
+    return values
+
+
+def test_pool_sizes_are_exported_as_gauges(metrics, monkeypatch):
+    monkeypatch.setattr(AgentPool, "_reset", staticmethod(lambda agent: None))
+    pool = AgentPool("test", object, size=2)
+
+    with pool.checkout(), pool.checkout():
+        assert pool_metrics(metrics) == {"checkouts": 2, "size": 2, "created": 2, "in_use": 2, "idle": 0}
+        with pytest.raises(TimeoutError):
+            with pool.checkout(timeout=0.01):
+                pass
+        assert pool_metrics(metrics) == {"checkouts": 1, "waits": 1}
+    assert pool_metrics(metrics) == {"size": 2, "created": 2, "in_use": 0, "idle": 2}
+
+    pool.resize(1)
+    assert pool_metrics(metrics) == {"size": 1, "created": 2, "in_use": 0, "idle": 2}
@@ -0,0 +1,61 @@
+import asyncio
+import uuid
+
+import pytest
+from temporalio import workflow
+from temporalio.client import WorkflowFailureError
+from temporalio.exceptions import ApplicationError
+from temporalio.worker import UnsandboxedWorkflowRunner, Worker
+
+from temporal.batch_workflow import FinancialAssistantBatchWorkflow
+from temporal.models import BatchInput, BatchPrompt, BatchSummary
+
+from .workflow_env import start_time_skipping_env
+
+
+@workflow.defn(name="FinancialAssistantWorkflow")
+class FakeAssistantWorkflow:
+    def __init__(self):
+        self.amount = None
+
+    @workflow.signal
+    def set_investment_amount(self, amount: float) -> None:
+        self.amount = amount
+
+    @workflow.run
+    async def run(self, prompt: str) -> str:
+        if prompt == "fail":
+            raise ApplicationError("cannot build a budget", non_retryable=True)
+        await workflow.wait_condition(lambda: self.amount is not None)
+        return f"{prompt}: {self.amount}"
+
+
+async def run_batch(batch: BatchInput) -> BatchSummary:
+    env = await start_time_skipping_env()
+    async with env:
+        task_queue = f"batch-{uuid.uuid4()}"
+        async with Worker(
+            env.client,
+            task_queue=task_queue,
+            workflows=[FinancialAssistantBatchWorkflow, FakeAssistantWorkflow],
+            workflow_runner=UnsandboxedWorkflowRunner(),
+        ):
+            return await env.client.execute_workflow(
+                FinancialAssistantBatchWorkflow.run, batch, id=f"batch-{uuid.uuid4()}", task_queue=task_queue
+            )
+
+
+def test_failed_children_are_counted_across_continue_as_new():
+    prompts = [BatchPrompt(prompt=prompt, investment_amount=100) for prompt in ("first", "fail", "last")]
+    summary = asyncio.run(run_batch(BatchInput(prompts=prompts, max_in_flight=1, continue_as_new_every=2)))
+    assert (summary.total, summary.succeeded, summary.failed) == (3, 2, 1)
+    assert [failure.index for failure in summary.failures] == [1]
+
+
+@pytest.mark.parametrize("limits", [{"max_in_flight": 0}, {"continue_as_new_every": 0}])
+def test_limits_below_one_fail_the_batch(limits):
+    batch = BatchInput(prompts=[BatchPrompt(prompt="first")], **limits)
+    with pytest.raises(WorkflowFailureError) as failure:
+        asyncio.run(run_batch(batch))
+    assert isinstance(failure.value.cause, ApplicationError)
+    assert failure.value.cause.type == "InvalidBatchInput"
@@ -0,0 +1,13 @@
+import importlib
+import pkgutil
+
+import pytest
+
+from temporal import benchmarks
+
+MODULES = [module.name for module in pkgutil.iter_modules(benchmarks.__path__)]
+
+
+@pytest.mark.parametrize("name", MODULES)
+def test_benchmark_imports(name):
+    importlib.import_module(f"temporal.benchmarks.{name}")
@@ -0,0 +1,34 @@
+import pytest
+from temporalio.exceptions import CancelledError
+from temporalio.testing import ActivityEnvironment
+
+from temporal.financial_analysis_activity import heartbeat_callback_handler
+
+
+def test_callback_heartbeats_on_every_event():
+    env = ActivityEnvironment()
+    heartbeats = []
+    env.on_heartbeat = lambda *details: heartbeats.append(details)
+
+    def events():
+        heartbeat_callback_handler(data="Apple ")
+        heartbeat_callback_handler(data="stock")
+
+    env.run(events)
+    assert len(heartbeats) == 2
+
+
+def test_callback_stops_cancelled_activity():
+    env = ActivityEnvironment()
+
+    def cancelled():
+        heartbeat_callback_handler(data="Apple ")
+        env.cancel()
+        heartbeat_callback_handler(data="stock")
+
+    with pytest.raises(CancelledError):
+        env.run(cancelled)
+
+
+def test_callback_outside_activity_is_a_no_op():
+    heartbeat_callback_handler(data="Apple")
@@ -0,0 +1,142 @@
+import os
+from datetime import date, timedelta
+from typing import Dict, List
+
+import pandas as pd
+import pytest
+
+from temporal import market_data
+from temporal.market_data import BAR_COLUMNS, FixtureFetcher, MarketDataStore, record_fixtures
+
+# Bars for AAPL and MSFT from 2026-04-01 to 2026-09-30 in the record_fixtures format
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "market_data")
+# Periods are measured back from the day after the last fixture bar
+FIXTURE_TODAY = date(2026, 10, 1)
+
+
+def bars(days: int, end: date) -> pd.DataFrame:
+    index = pd.DatetimeIndex([end - timedelta(days=i) for i in reversed(range(days))], name="Date")
+    return pd.DataFrame({column: 100.0 for column in BAR_COLUMNS}, index=index)
+
+
+class CountingFetcher:
+    """Serves canned bars and counts requests per symbol."""
+
+    def __init__(self, data: Dict[str, pd.DataFrame]):
+        self.data = data
+        self.requests: List[str] = []
+
+    def history(self, symbol: str, start: date) -> pd.DataFrame:
+        self.requests.append(symbol)
+        frame = self.data.get(symbol, pd.DataFrame(columns=BAR_COLUMNS, index=pd.DatetimeIndex([])))
+        return frame[frame.index >= pd.Timestamp(start)]
+
+    def history_many(self, symbols: List[str], start: date) -> Dict[str, pd.DataFrame]:
+        fetched = {symbol: self.history(symbol, start) for symbol in symbols}
+        return {symbol: frame for symbol, frame in fetched.items() if not frame.empty}
+
+    def info(self, symbol: str) -> dict:
+        return {}
+
+
+def test_empty_fetch_is_not_cached():
+    fetcher = CountingFetcher({})
+    store = MarketDataStore(":memory:", fetcher)
+    assert store.close_matrix(["NEW"], "1m").empty
+    assert store.history("NEW", "1m").empty
+
+    # Once the symbol has data, the next request fetches it instead of serving the empty result
+    fetcher.data["NEW"] = bars(20, FIXTURE_TODAY)
+    assert len(store.close_matrix(["NEW"], "1m")) == 20
+    assert fetcher.requests == ["NEW", "NEW", "NEW"]
+
+
+class RecordingFixtureFetcher(FixtureFetcher):
+    """FixtureFetcher that records the (symbols, start) of every request."""
+
+    def __init__(self, directory: str = FIXTURES):
+        super().__init__(directory)
+        self.requests: List[tuple] = []
+
+    def history(self, symbol: str, start: date) -> pd.DataFrame:
+        self.requests.append(([symbol], start))
+        return super().history(symbol, start)
+
+    def history_many(self, symbols: List[str], start: date) -> Dict[str, pd.DataFrame]:
+        self.requests.append((symbols, start))
+        return {
+            symbol: FixtureFetcher.history(self, symbol, start)
+            for symbol in symbols
+            if os.path.exists(os.path.join(self.directory, f"{symbol.upper()}.csv"))
+        }
+
+
+@pytest.fixture(autouse=True)
+def fixture_today(monkeypatch):
+    period_start = market_data.period_start
+    monkeypatch.setattr(market_data, "period_start", lambda period, today=None: period_start(period, FIXTURE_TODAY))
+
+
+def test_cached_history_is_served_without_fetching():
+    fetcher = RecordingFixtureFetcher()
+    store = MarketDataStore(":memory:", fetcher)
+    three_months = store.history("AAPL", "3m")
+    assert len(three_months) == 66
+    assert three_months.equals(store.history("aapl", "3m"))
+    # A shorter period is already covered
+    assert len(store.history("AAPL", "1m")) == 23
+    assert fetcher.requests == [(["AAPL"], date(2026, 7, 1))]
+
+    # Only the symbol that is not cached yet is fetched for the matrix
+    matrix = store.close_matrix(["AAPL", "MSFT"], "3m")
+    assert list(matrix.columns) == ["AAPL", "MSFT"]
+    assert matrix["AAPL"].equals(three_months["Close"].rename("AAPL"))
+    assert fetcher.requests[1:] == [(["MSFT"], date(2026, 7, 1))]
+
+
+def test_stale_bars_are_refreshed_from_the_last_stored_date():
+    fetcher = RecordingFixtureFetcher()
+    store = MarketDataStore(":memory:", fetcher, bar_refresh_seconds=0)
+    first = store.history("MSFT", "3m")
+    assert store.history("MSFT", "3m").equals(first)
+    assert fetcher.requests == [(["MSFT"], date(2026, 7, 1)), (["MSFT"], date(2026, 9, 30))]
+
+    # A longer period than the store covers is fetched in full
+    assert len(store.history("MSFT", "6m")) == 131
+    assert fetcher.requests[2] == (["MSFT"], date(2026, 4, 1))
+
+
+def test_symbol_without_fixture_is_refetched():
+    fetcher = RecordingFixtureFetcher()
+    store = MarketDataStore(":memory:", fetcher)
+    assert list(store.close_matrix(["AAPL", "NOPE"], "1m").columns) == ["AAPL"]
+    assert list(store.close_matrix(["AAPL", "NOPE"], "1m").columns) == ["AAPL"]
+    assert [symbols for symbols, _ in fetcher.requests] == [["AAPL", "NOPE"], ["NOPE"]]
+
+
+def test_fixture_info():
+    store = MarketDataStore(":memory:", FixtureFetcher(FIXTURES))
+    assert store.info("AAPL")["longName"] == "Apple Inc."
+    assert store.info("NOPE") == {}
+
+
+def test_record_fixtures_round_trip(monkeypatch, tmp_path):
+    class FakeYFinanceFetcher:
+        """Serves the fixtures the way yfinance returns them: tz-aware, with extra columns."""
+
+        def history(self, symbol: str, start: date) -> pd.DataFrame:
+            bars = FixtureFetcher(FIXTURES).history(symbol, start)
+            bars.index = bars.index.tz_localize("America/New_York")
+            return bars.assign(Dividends=0.0, **{"Stock Splits": 0.0})
+
+        def info(self, symbol: str) -> dict:
+            return FixtureFetcher(FIXTURES).info(symbol)
+
+    monkeypatch.setattr(market_data, "YFinanceFetcher", FakeYFinanceFetcher)
+    record_fixtures(["AAPL", "MSFT"], str(tmp_path), period="3m")
+
+    recorded, committed = FixtureFetcher(str(tmp_path)), FixtureFetcher(FIXTURES)
+    start = date(2026, 7, 1)
+    for symbol in ("AAPL", "MSFT"):
+        assert recorded.history(symbol, start).equals(committed.history(symbol, start))
+        assert recorded.info(symbol) == committed.info(symbol)
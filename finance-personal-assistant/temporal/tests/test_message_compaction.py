@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+from temporalio.testing import ActivityEnvironment
+
+from temporal import message_compaction
+from temporal.llm_activity import invoke_bedrock_model
+from temporal.message_compaction import SUMMARY_MODEL_IDS, summary_model_id
+from temporal.models import BedrockInvocationRequest, Message, MessageContent
+
+MODEL_ID = "us.anthropic.claude-3-7-sonnet-20250219-v1:0"
+
+
+@pytest.mark.parametrize("region, model_id", [
+    ("us-west-2", SUMMARY_MODEL_IDS["us"]),
+    ("eu-central-1", SUMMARY_MODEL_IDS["eu"]),
+    ("ap-northeast-1", SUMMARY_MODEL_IDS["apac"]),
+    ("ca-central-1", None),
+    ("us-gov-west-1", None),
+])
+def test_summary_model_follows_the_region(monkeypatch, region, model_id):
+    monkeypatch.setattr(message_compaction, "MESSAGE_SUMMARY_MODEL_ID", None)
+    assert summary_model_id(region) == model_id
+
+
+def test_configured_summary_model_wins(monkeypatch):
+    monkeypatch.setattr(message_compaction, "MESSAGE_SUMMARY_MODEL_ID", "custom-model")
+    assert summary_model_id("ca-central-1") == "custom-model"
+
+
+def conversation(turns: int) -> list:
+    return [
+        Message(role=role, content=[MessageContent(text=f"{role} turn {turn}: " + "budget details " * 40)])
+        for turn in range(turns)
+        for role in ("user", "assistant")
+    ] + [Message(role="user", content=[MessageContent(text="How much can I invest?")])]
+
+
+def test_summary_usage_is_returned_on_its_own_model(monkeypatch, fake_bedrock):
+    monkeypatch.setattr(message_compaction, "MESSAGE_SUMMARY_MODEL_ID", None)
+    fake_bedrock.set_script([{"text": "The user earns $6000 a month."}, {"text": "About $800 a month."}])
+    request = BedrockInvocationRequest(
+        messages=conversation(6), model_id=MODEL_ID, region_name="us-west-2", max_tokens=200,
+        max_input_tokens=600, compaction="summarize",
+    )
+    result = asyncio.run(ActivityEnvironment().run(invoke_bedrock_model, request))
+
+    assert result.text == "About $800 a month."
+    assert result.compaction.mode == "summarize"
+    assert (result.usage.model_id, result.usage.model_calls) == (MODEL_ID, 1)
+    assert (result.summary_usage.model_id, result.summary_usage.model_calls) == (SUMMARY_MODEL_IDS["us"], 1)
+    assert result.summary_usage.input_tokens > 0
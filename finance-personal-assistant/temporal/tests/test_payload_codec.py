@@ -0,0 +1,65 @@
+import asyncio
+import os
+import time
+
+import pytest
+from temporalio.api.common.v1 import Payload
+
+from temporal import blob_store
+from temporal.blob_store import LocalBlobStore, S3BlobStore, blob_store_from_url, set_blob_store
+from temporal.payload_codec import CLAIM_CHECK_ENCODING, GZIP_ENCODING, build_payload_codec
+
+
+@pytest.fixture
+def unconfigured_blob_store(monkeypatch):
+    monkeypatch.setattr(blob_store, "_store", None)
+    monkeypatch.setattr(blob_store, "_store_shared", False)
+
+
+def payload(size: int) -> Payload:
+    # Compressible text that stays well over 1 KiB compressed at the sizes used here
+    return Payload(metadata={"encoding": b"json/plain"}, data=" ".join(map(str, range(size // 4))).encode()[:size])
+
+
+def encode(codec, payloads):
+    return asyncio.run(codec.encode(payloads))
+
+
+def test_default_codec_gzips_and_round_trips(unconfigured_blob_store):
+    codec = build_payload_codec(compression_threshold=1024, claim_check_threshold=1024)
+    small, large = payload(100), payload(200_000)
+    encoded = encode(codec, [small, large])
+    assert encoded[0] == small
+    # No shared blob store is configured, so the large payload stays inline, compressed
+    assert encoded[1].metadata["encoding"] == GZIP_ENCODING
+    assert asyncio.run(codec.decode(encoded)) == [small, large]
+
+
+def test_claim_check_with_a_configured_store(unconfigured_blob_store, tmp_path):
+    set_blob_store(LocalBlobStore(str(tmp_path)))
+    codec = build_payload_codec(compression_threshold=1024, claim_check_threshold=1024)
+    large = payload(200_000)
+    encoded = encode(codec, [large, large])
+    assert [p.metadata["encoding"] for p in encoded] == [CLAIM_CHECK_ENCODING] * 2
+    assert encoded[0].data == encoded[1].data
+    assert len(os.listdir(tmp_path / "payloads")) == 1
+    assert asyncio.run(codec.decode(encoded)) == [large, large]
+
+
+def test_cleanup_deletes_only_expired_blobs(tmp_path):
+    store = LocalBlobStore(str(tmp_path))
+    store.put("payloads", "old", b"old")
+    store.put("charts", "new", b"new")
+    week_ago = time.time() - 7 * 86400
+    os.utime(tmp_path / "payloads" / "old", (week_ago, week_ago))
+    assert store.cleanup(86400) == 1
+    assert not store.exists("payloads", "old")
+    assert store.get(store.ref("charts", "new")) == b"new"
+
+
+def test_blob_store_from_url(tmp_path):
+    assert blob_store_from_url(f"file://{tmp_path}").root == str(tmp_path)
+    assert blob_store_from_url(str(tmp_path)).root == str(tmp_path)
+    s3 = blob_store_from_url("s3://bucket/fpa/blobs")
+    assert isinstance(s3, S3BlobStore)
+    assert (s3.bucket, s3.prefix) == ("bucket", "fpa/blobs")
@@ -0,0 +1,49 @@
+import asyncio
+
+from temporalio.testing import ActivityEnvironment
+
+from temporal import llm_activity
+from temporal.fake_bedrock import FakeBedrock
+from temporal.llm_activity import build_request_body, invoke_bedrock_model
+from temporal.models import BedrockInvocationRequest
+
+# About 1500 estimated tokens, above the fake server's 1024-token checkpoint minimum
+LONG_SYSTEM_PROMPT = "You are a careful personal finance assistant. " * 130
+
+
+def request(**kwargs) -> BedrockInvocationRequest:
+    return BedrockInvocationRequest(prompt="Summarize my budget.", system_prompt=LONG_SYSTEM_PROMPT, **kwargs)
+
+
+def test_cache_system_prompt_follows_setting(monkeypatch):
+    monkeypatch.setattr(llm_activity, "BEDROCK_PROMPT_CACHING", True)
+    assert "cache_control" in build_request_body(request())["system"][0]
+    assert isinstance(build_request_body(request(cache_system_prompt=False))["system"], str)
+
+    monkeypatch.setattr(llm_activity, "BEDROCK_PROMPT_CACHING", False)
+    assert isinstance(build_request_body(request())["system"], str)
+    assert "cache_control" in build_request_body(request(cache_system_prompt=True))["system"][0]
+
+
+def test_invoke_writes_then_reads_system_prompt_cache(fake_bedrock: FakeBedrock):
+    env = ActivityEnvironment()
+    first = asyncio.run(env.run(invoke_bedrock_model, request(cache_system_prompt=True)))
+    second = asyncio.run(env.run(invoke_bedrock_model, request(cache_system_prompt=True)))
+
+    written = first.usage.cache_write_input_tokens
+    assert written > 1024
+    assert first.usage.cache_read_input_tokens == 0
+    assert second.usage.cache_read_input_tokens == written
+    assert second.usage.cache_write_input_tokens == 0
+    assert second.usage.input_tokens == first.usage.input_tokens
+    assert fake_bedrock.stats["cache_write_tokens"] == written
+    assert fake_bedrock.stats["cache_read_tokens"] == written
+
+
+def test_uncached_invoke_reports_no_cache_tokens(fake_bedrock: FakeBedrock):
+    env = ActivityEnvironment()
+    for _ in range(2):
+        result = asyncio.run(env.run(invoke_bedrock_model, request(cache_system_prompt=False)))
+        assert result.usage.cache_read_input_tokens == result.usage.cache_write_input_tokens == 0
+    assert fake_bedrock.stats["cache_write_tokens"] == fake_bedrock.stats["cache_read_tokens"] == 0
+
@@ -0,0 +1,82 @@
+import pytest
+from botocore.exceptions import ClientError
+
+from temporal import bedrock_client
+from temporal.bedrock_client import get_bedrock_runtime_client
+from temporal.rate_limiter import RateLimiter, bedrock_application_error, bedrock_error_code
+
+
+def throttle() -> ClientError:
+    return ClientError({"Error": {"Code": "ThrottlingException", "Message": "slow down"}}, "InvokeModel")
+
+
+def test_error_code_follows_wrapping_exceptions():
+    try:
+        try:
+            raise throttle()
+        except ClientError as e:
+            raise RuntimeError("agent failed") from e
+    except RuntimeError as wrapped:
+        assert bedrock_error_code(wrapped) == "ThrottlingException"
+
+
+def test_error_code_ignores_errors_without_a_response_dict():
+    class ResponseNone(Exception):
+        response = None
+
+    class ResponseText(Exception):
+        response = "502 Bad Gateway"
+
+    assert bedrock_error_code(ResponseNone()) is None
+    assert bedrock_error_code(ResponseText()) is None
+    assert bedrock_application_error(ResponseNone(), RateLimiter()) is None
+
+
+def test_bedrock_client_leaves_retries_to_the_limiter(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "test")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "test")
+    monkeypatch.setattr(bedrock_client, "_clients", {})
+    client = get_bedrock_runtime_client("eu-central-1")
+    assert client.meta.config.retries["total_max_attempts"] == 1
+
+
+def test_throttle_halves_the_rate_and_backs_off():
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=6000)
+    base_delay = limiter.retry_delay()
+    assert limiter.reserve(10) == 0
+
+    limiter.record_error(throttle())
+    assert limiter.scale == 0.5
+    assert limiter.retry_delay() == base_delay * 2
+    assert limiter.stats()["throttles"] == 1
+    # The buckets were emptied, so the next call waits for a refill at the halved rate
+    assert limiter.reserve(10) == pytest.approx(2.0, abs=0.01)
+
+    error = bedrock_application_error(throttle(), limiter)
+    assert error.type == "ThrottlingException"
+    assert error.next_retry_delay == limiter.retry_delay()
+
+
+def test_rate_recovers_additively_up_to_the_quota():
+    limiter = RateLimiter(increase=0.1, min_scale=0.2)
+    for _ in range(4):
+        limiter.on_throttle()
+    assert limiter.scale == 0.2
+
+    limiter.on_success()
+    assert limiter.scale == pytest.approx(0.3)
+    for _ in range(20):
+        limiter.on_success()
+    assert limiter.scale == 1.0
+
+
+def test_settle_returns_unused_tokens_and_charges_extra_ones():
+    # 100 tokens of burst capacity
+    limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=600)
+    assert limiter.reserve(100) == 0
+    limiter.settle(reserved=100, used=40)
+    assert limiter.reserve(50) == 0
+
+    limiter.settle(reserved=50, used=100)
+    # 10 tokens left before the overrun; 40 over at 10 tokens per second
+    assert limiter.reserve(0) == pytest.approx(4.0, abs=0.01)
@@ -0,0 +1,60 @@
+import asyncio
+import dataclasses
+
+from temporalio.testing import ActivityEnvironment
+
+from temporal.fake_bedrock import FakeBedrock
+from temporal.financial_assistant_workflow import FinancialAssistantWorkflow
+from temporal.llm_activity import StreamingBedrockActivities
+from temporal.llm_cache import cache_key, get_response_cache
+from temporal.models import BedrockInvocationRequest, ReportChunk
+
+
+class SignalRecorder:
+    """Stands in for the Temporal client, keeping the report chunks signalled to the workflow."""
+
+    def __init__(self):
+        self.chunks: list[ReportChunk] = []
+
+    def get_workflow_handle(self, workflow_id: str, run_id: str):
+        return self
+
+    async def signal(self, name: str, chunk: ReportChunk) -> None:
+        self.chunks.append(chunk)
+
+
+def chunk(offset: int, text: str, attempt: int = 1) -> ReportChunk:
+    return ReportChunk(step="budget_report", offset=offset, text=text, attempt=attempt)
+
+
+def test_chunks_append_and_resent_text_is_ignored():
+    workflow = FinancialAssistantWorkflow()
+    workflow.append_report_chunk(chunk(0, "Your spending "))
+    workflow.append_report_chunk(chunk(0, "Your spending "))
+    workflow.append_report_chunk(chunk(14, "is too high"))
+    assert workflow.report_sections["budget_report"] == "Your spending is too high"
+
+
+def test_retry_discards_partial_text_of_earlier_attempt():
+    workflow = FinancialAssistantWorkflow()
+    workflow.append_report_chunk(chunk(0, "Your spending is too high, cut"))
+    # Reset marker, then a different completion from the retried attempt
+    workflow.append_report_chunk(chunk(0, "", attempt=2))
+    assert workflow.report_sections["budget_report"] == ""
+    workflow.append_report_chunk(chunk(0, "You can invest", attempt=2))
+    # A late signal from the first attempt must not be spliced in
+    workflow.append_report_chunk(chunk(30, " back on dining", attempt=1))
+    assert workflow.report_sections["budget_report"] == "You can invest"
+
+
+def test_retry_served_from_cache_resets_before_sending_cached_text(fake_bedrock: FakeBedrock):
+    request = BedrockInvocationRequest(prompt="Format my budget.", report_step="budget_report", use_cache=True)
+    get_response_cache().put(cache_key(request), "Your budget is balanced")
+    recorder = SignalRecorder()
+    env = ActivityEnvironment()
+    env.info = dataclasses.replace(env.info, attempt=2)
+
+    result = asyncio.run(env.run(StreamingBedrockActivities(recorder).invoke_bedrock_model_streaming, request))
+
+    assert result.usage.cached
+    assert recorder.chunks == [chunk(0, "", attempt=2), chunk(0, "Your budget is balanced", attempt=2)]
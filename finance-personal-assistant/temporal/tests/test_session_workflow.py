@@ -0,0 +1,134 @@
+import asyncio
+import uuid
+
+import pytest
+from temporalio import activity
+from temporalio.client import WorkflowUpdateFailedError
+from temporalio.exceptions import WorkflowAlreadyStartedError
+from temporalio.worker import UnsandboxedWorkflowRunner, Worker
+
+from temporal import session_workflow
+from temporal.benchmarks.report_formatting import REPORT
+from temporal.models import BudgetAgentResult, FinancialAnalysisResult, ModelUsage, SessionInput, SessionState
+from temporal.session_workflow import FinancialAssistantSessionWorkflow
+from temporal.start_session import run_turn, session_workflow_id
+from temporal.task_queues import AGENT_TASK_QUEUE, WORKFLOW_TASK_QUEUE
+
+from .workflow_env import start_local_env
+
+USAGE = ModelUsage(model_id="us.anthropic.claude-3-7-sonnet-20250219-v1:0", model_calls=1, input_tokens=100,
+                   output_tokens=20)
+
+
+def session(**kwargs) -> FinancialAssistantSessionWorkflow:
+    return FinancialAssistantSessionWorkflow(SessionInput(user_id="alice", **kwargs))
+
+
+def test_validators_reject_empty_prompts_bad_amounts_and_ended_sessions():
+    workflow = session()
+    with pytest.raises(ValueError, match="empty"):
+        workflow.validate_ask("  ")
+    with pytest.raises(ValueError, match="positive"):
+        workflow.validate_invest(0)
+    workflow.validate_ask("How should I budget?")
+    workflow.validate_invest(500)
+
+    workflow.end_session()
+    with pytest.raises(ValueError, match="ended"):
+        workflow.validate_ask("How should I budget?")
+    with pytest.raises(ValueError, match="ended"):
+        workflow.validate_invest(500)
+
+
+def test_complete_turn_compacts_oldest_turns_and_adds_up_usage(monkeypatch):
+    monkeypatch.setattr(session_workflow, "MAX_SUMMARY_LINES", 2)
+    workflow = session(max_recent_turns=2)
+    for i in range(5):
+        reply = workflow._complete_turn("ask", f"prompt {i}", f"reply {i}", f"digest {i}", USAGE)
+        assert reply.turn == i + 1
+
+    state = workflow.state
+    assert [turn.request for turn in state.recent_turns] == ["prompt 3", "prompt 4"]
+    assert state.summary == ["ask prompt 1 -> digest 1", "ask prompt 2 -> digest 2"]
+    assert (state.turn_count, state.input_tokens, state.output_tokens) == (5, 500, 100)
+    assert state.estimated_cost_usd > 0
+
+    prompt = workflow._contextual_prompt("What next?")
+    assert prompt.splitlines()[:3] == [
+        "Conversation so far:", "- ask prompt 1 -> digest 1", "- ask prompt 2 -> digest 2"
+    ]
+    assert "User: prompt 4\nAssistant: reply 4" in prompt
+    assert prompt.endswith("Current request: What next?")
+
+
+@activity.defn(name="budget_agent_activity")
+async def fake_budget_agent_activity(prompt: str) -> BudgetAgentResult:
+    return BudgetAgentResult(report=REPORT, usage=USAGE)
+
+
+@activity.defn(name="financial_analysis_activity")
+async def fake_financial_analysis_activity(amount: float, risk_level: str = "moderate") -> FinancialAnalysisResult:
+    return FinancialAnalysisResult(text=f"# Analysis\nInvest ${amount:,.0f} in index funds.", usage=USAGE)
+
+
+async def run_session(test) -> None:
+    # The time-skipping test server does not support updates
+    env = await start_local_env()
+    async with env:
+        async with Worker(
+            env.client,
+            task_queue=WORKFLOW_TASK_QUEUE,
+            workflows=[FinancialAssistantSessionWorkflow],
+            workflow_runner=UnsandboxedWorkflowRunner(),
+        ), Worker(
+            env.client,
+            task_queue=AGENT_TASK_QUEUE,
+            activities=[fake_budget_agent_activity, fake_financial_analysis_activity],
+        ):
+            await test(env.client, f"user-{uuid.uuid4()}")
+
+
+def test_updates_are_validated_and_turns_after_end_are_rejected():
+    async def test(client, user_id):
+        reply = await run_turn(client, user_id, "ask", "How should I budget $6000 a month?")
+        assert reply.turn == 1 and reply.financial_report == REPORT
+        with pytest.raises(WorkflowUpdateFailedError):
+            await run_turn(client, user_id, "invest", -5.0)
+
+        handle = client.get_workflow_handle(session_workflow_id(user_id))
+        await handle.signal("end_session")
+        state = await handle.result(result_type=SessionState)
+        assert state.turn_count == 1
+
+        with pytest.raises(WorkflowAlreadyStartedError):
+            await run_turn(client, user_id, "ask", "Are you still there?")
+        reply = await run_turn(client, user_id, "ask", "Start over", new_session=True)
+        assert reply.turn == 1
+
+    asyncio.run(run_session(test))
+
+
+def test_state_is_compacted_and_carried_across_continue_as_new():
+    async def test(client, user_id):
+        first = await client.start_workflow(
+            FinancialAssistantSessionWorkflow.run,
+            SessionInput(user_id=user_id, max_recent_turns=2, max_history_events=30),
+            id=session_workflow_id(user_id),
+            task_queue=WORKFLOW_TASK_QUEUE,
+        )
+        for i in range(6):
+            update, arg = ("invest", 1000.0 * (i + 1)) if i % 2 else ("ask", f"prompt {i}")
+            reply = await run_turn(client, user_id, update, arg)
+            assert reply.turn == i + 1
+
+        handle = client.get_workflow_handle(session_workflow_id(user_id))
+        assert (await handle.describe()).run_id != first.result_run_id
+        await handle.signal("end_session")
+        state = await handle.result(result_type=SessionState)
+        assert state.turn_count == 6
+        assert [turn.request for turn in state.recent_turns] == ["prompt 4", "6,000.00"]
+        assert len(state.summary) == 4
+        assert state.summary[0] == "ask prompt 0 -> " + session_workflow._report_digest(REPORT)
+        assert (state.input_tokens, state.output_tokens) == (600, 120)
+
+    asyncio.run(run_session(test))
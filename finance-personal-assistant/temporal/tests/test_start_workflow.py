@@ -0,0 +1,50 @@
+import argparse
+import asyncio
+import json
+
+from temporal.models import FinancialAssistantOptions
+from temporal.start_workflow import bulk
+
+
+class FakeHandle:
+    def __init__(self, prompt: str):
+        self.prompt = prompt
+
+    async def result(self) -> str:
+        if self.prompt == "fail":
+            raise RuntimeError("workflow failed")
+        return f"report for {self.prompt}"
+
+
+class FakeClient:
+    def __init__(self):
+        self.started = []
+
+    async def start_workflow(self, workflow, args, **kwargs) -> FakeHandle:
+        self.started.append(args[0])
+        return FakeHandle(args[0])
+
+
+def test_bulk_records_bad_lines_and_failures_and_keeps_going(tmp_path):
+    prompts = tmp_path / "prompts.jsonl"
+    prompts.write_text("\n".join([
+        json.dumps({"prompt": "first", "id": "a"}),
+        "{not json",
+        json.dumps({"investment_amount": 100}),
+        json.dumps({"prompt": "fail", "id": "b"}),
+        "",
+        json.dumps({"prompt": "last", "id": "c"}),
+    ]) + "\n")
+    output = tmp_path / "results.jsonl"
+    client = FakeClient()
+    args = argparse.Namespace(bulk=str(prompts), output=str(output), concurrency=1)
+
+    asyncio.run(bulk(client, args, FinancialAssistantOptions()))
+
+    records = {record["index"]: record for record in map(json.loads, output.read_text().splitlines())}
+    assert client.started == ["first", "fail", "last"]
+    assert records[0]["result"] == "report for first"
+    assert records[1]["error"].startswith("Invalid entry")
+    assert records[2]["error"].startswith("Invalid entry")
+    assert records[3]["error"] == "RuntimeError: workflow failed"
+    assert records[5]["result"] == "report for last"
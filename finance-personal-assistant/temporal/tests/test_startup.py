@@ -0,0 +1,10 @@
+import pytest
+
+from temporal.benchmarks.startup_time import DEFERRED_MODULES, ENTRY_POINTS, STARTUP_BUDGET_MS, import_times
+
+
+@pytest.mark.parametrize("entry_point", ENTRY_POINTS)
+def test_entry_point_cold_start(entry_point):
+    times = import_times(entry_point)
+    assert [name for name in DEFERRED_MODULES if name in times] == []
+    assert times[entry_point] / 1000 <= STARTUP_BUDGET_MS
@@ -0,0 +1,19 @@
+import pytest
+from temporalio.contrib.pydantic import pydantic_data_converter
+from temporalio.testing import WorkflowEnvironment
+
+
+async def start_time_skipping_env() -> WorkflowEnvironment:
+    """Time-skipping test environment with the pydantic converter; skips when the test server is unavailable."""
+    try:
+        return await WorkflowEnvironment.start_time_skipping(data_converter=pydantic_data_converter)
+    except RuntimeError as e:
+        pytest.skip(f"Temporal test server unavailable: {e}")
+
+
+async def start_local_env() -> WorkflowEnvironment:
+    """Local dev server environment with the pydantic converter, for workflows that use updates; skips when unavailable."""
+    try:
+        return await WorkflowEnvironment.start_local(data_converter=pydantic_data_converter)
+    except RuntimeError as e:
+        pytest.skip(f"Temporal dev server unavailable: {e}")
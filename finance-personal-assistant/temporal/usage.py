@@ -0,0 +1,44 @@
+import contextvars
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from .models import ModelUsage
+
+_current_usage: contextvars.ContextVar[Optional[ModelUsage]] = contextvars.ContextVar(
+    "model_usage", default=None
+)
+
+
+@contextmanager
+def track_usage() -> Iterator[ModelUsage]:
+    """
+    Collect the usage of every model call made in this context, including calls made
+    by Strands agents (which run on threads that inherit the context).
+    """
+    usage = ModelUsage()
+    token = _current_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _current_usage.reset(token)
+
+
+def add_usage(
+    model_id: str,
+    input_tokens: int,
+    output_tokens: int,
+    latency_seconds: float,
+    cache_read_input_tokens: int = 0,
+    cache_write_input_tokens: int = 0,
+) -> None:
+    """Add one model call to the usage being tracked, if any."""
+    usage = _current_usage.get()
+    if usage is None:
+        return
+    usage.model_id = model_id
+    usage.model_calls += 1
+    usage.input_tokens += input_tokens
+    usage.output_tokens += output_tokens
+    usage.cache_read_input_tokens += cache_read_input_tokens
+    usage.cache_write_input_tokens += cache_write_input_tokens
+    usage.latency_seconds += latency_seconds
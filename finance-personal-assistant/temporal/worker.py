@@ -1,17 +1,182 @@
+import argparse
 import asyncio
 import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from typing import List, Optional
 
 from temporalio.client import Client
-from temporalio.worker import Worker
+from temporalio.worker import ResourceBasedSlotConfig, Worker, WorkerTuner
 
 from .financial_assistant_workflow import FinancialAssistantWorkflow
-from .budget_agent_activity import budget_agent_activity
-from .financial_analysis_activity import financial_analysis_activity
-from .llm_activity import invoke_bedrock_model
-from temporalio.contrib.pydantic import pydantic_data_converter
+from .batch_workflow import FinancialAssistantBatchWorkflow
+from .session_workflow import FinancialAssistantSessionWorkflow
+from .batch_activity import load_batch_prompts
+from .blob_store import expire_blobs
+from .budget_agent_activity import budget_agent_activity, budget_agent_pool
+from .financial_analysis_activity import financial_analysis_activity, financial_analysis_agent_pool
+from .llm_activity import invoke_bedrock_model, StreamingBedrockActivities
+from .market_data_activity import refresh_market_data
+from .payload_codec import data_converter
+from .telemetry import METRICS_BIND_ADDRESS, TelemetryInterceptor, client_interceptors, install_runtime
+from .task_queues import (
+    AGENT_TASK_QUEUE,
+    LLM_FORMAT_TASK_QUEUE,
+    MARKET_DATA_TASK_QUEUE,
+    WORKFLOW_TASK_QUEUE,
+)
+
+QUEUES = ["workflow", "agent", "llm-format", "market-data"]
+
+
+def _optional_int(name: str) -> Optional[int]:
+    value = os.getenv(name)
+    return int(value) if value else None
+
+
+def slot_options(args: argparse.Namespace, max_activities: Optional[int]) -> dict:
+    """
+    Slot settings for one worker: fixed limits, or a resource-based tuner that adds
+    slots while CPU and memory stay under the targets, capped at the same limits.
+    """
+    if not args.resource_tuner:
+        return {
+            "max_concurrent_activities": max_activities,
+            "max_concurrent_workflow_tasks": args.max_concurrent_workflow_tasks,
+        }
+    return {
+        "tuner": WorkerTuner.create_resource_based(
+            target_memory_usage=args.target_memory_usage,
+            target_cpu_usage=args.target_cpu_usage,
+            workflow_config=ResourceBasedSlotConfig(maximum_slots=args.max_concurrent_workflow_tasks),
+            activity_config=ResourceBasedSlotConfig(maximum_slots=max_activities),
+        )
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Worker command-line options; every default can also be set through the environment."""
+    parser = argparse.ArgumentParser(description="Run the financial assistant worker.")
+    parser.add_argument(
+        "--queues",
+        nargs="+",
+        choices=QUEUES,
+        default=QUEUES,
+        help="Task queues this process polls; run several processes to scale queues independently",
+    )
+    parser.add_argument(
+        "--agent-concurrency",
+        type=int,
+        default=int(os.getenv("AGENT_CONCURRENCY", "16")),
+        help="Agent sessions run in parallel (threads in the activity executor and activity slots)",
+    )
+    parser.add_argument(
+        "--llm-format-concurrency",
+        type=int,
+        default=int(os.getenv("LLM_FORMAT_CONCURRENCY", "64")),
+        help="Concurrent formatting calls on the llm-format queue",
+    )
+    parser.add_argument(
+        "--market-data-concurrency",
+        type=int,
+        default=int(os.getenv("MARKET_DATA_CONCURRENCY", "8")),
+        help="Concurrent market data refreshes (threads and activity slots)",
+    )
+    parser.add_argument(
+        "--max-concurrent-workflow-tasks",
+        type=int,
+        default=_optional_int("MAX_CONCURRENT_WORKFLOW_TASKS"),
+        help="Workflow task slots on the workflow queue (SDK default if unset)",
+    )
+    parser.add_argument(
+        "--resource-tuner",
+        action="store_true",
+        default=os.getenv("RESOURCE_TUNER", "") == "1",
+        help="Size slots by CPU and memory usage instead of fixed limits",
+    )
+    parser.add_argument("--target-memory-usage", type=float, default=0.8)
+    parser.add_argument("--target-cpu-usage", type=float, default=0.9)
+    parser.add_argument(
+        "--metrics-address",
+        default=METRICS_BIND_ADDRESS,
+        help="Address of the Prometheus scrape endpoint (METRICS_BIND_ADDRESS)",
+    )
+    parser.add_argument(
+        "--otel-tracing",
+        action="store_true",
+        default=os.getenv("OTEL_TRACING", "") == "1",
+        help="Add the OpenTelemetry tracing interceptor (requires opentelemetry)",
+    )
+    return parser
+
+
+def build_workers(client: Client, args: argparse.Namespace, stack: ExitStack) -> List[Worker]:
+    """
+    Create a worker per task queue in args.queues. Activity thread pools are entered
+    on `stack`, so they shut down when the caller's stack closes.
+    """
+    interceptors = [TelemetryInterceptor()]
+    workers = []
+    if "workflow" in args.queues:
+        workers.append(Worker(
+            client,
+            task_queue=WORKFLOW_TASK_QUEUE,
+            workflows=[
+                FinancialAssistantWorkflow,
+                FinancialAssistantBatchWorkflow,
+                FinancialAssistantSessionWorkflow,
+            ],
+            activities=[load_batch_prompts],
+            interceptors=interceptors,
+            **slot_options(args, None),
+        ))
+    if "agent" in args.queues:
+        # Synchronous agent activities run on this pool; slots match it so none wait for a thread
+        budget_agent_pool.resize(args.agent_concurrency)
+        financial_analysis_agent_pool.resize(args.agent_concurrency)
+        agent_executor = stack.enter_context(ThreadPoolExecutor(
+            max_workers=args.agent_concurrency, thread_name_prefix="agent"
+        ))
+        workers.append(Worker(
+            client,
+            task_queue=AGENT_TASK_QUEUE,
+            activities=[budget_agent_activity, financial_analysis_activity],
+            activity_executor=agent_executor,
+            interceptors=interceptors,
+            **slot_options(args, args.agent_concurrency),
+        ))
+    if "llm-format" in args.queues:
+        # Async activities; blocking Bedrock I/O runs on the shared Bedrock executor
+        workers.append(Worker(
+            client,
+            task_queue=LLM_FORMAT_TASK_QUEUE,
+            activities=[
+                invoke_bedrock_model,
+                StreamingBedrockActivities(client).invoke_bedrock_model_streaming,
+            ],
+            interceptors=interceptors,
+            **slot_options(args, args.llm_format_concurrency),
+        ))
+    if "market-data" in args.queues:
+        market_data_executor = stack.enter_context(ThreadPoolExecutor(
+            max_workers=args.market_data_concurrency, thread_name_prefix="market-data"
+        ))
+        workers.append(Worker(
+            client,
+            task_queue=MARKET_DATA_TASK_QUEUE,
+            activities=[refresh_market_data],
+            activity_executor=market_data_executor,
+            interceptors=interceptors,
+            **slot_options(args, args.market_data_concurrency),
+        ))
+    return workers
 
 
 async def main():
+    args = build_parser().parse_args()
+
+    # Metrics are served locally at http://<metrics-address>/metrics
+    runtime = install_runtime(args.metrics_address)
 
     # Get Temporal configuration from environment variables
     temporal_address = os.getenv("TEMPORAL_ADDRESS", "us-east-1.aws.api.temporal.io:7233")
@@ -26,23 +191,27 @@ async def main():
         rpc_metadata={
             "authorization": f"Bearer {temporal_api_key}"
         },
-        data_converter=pydantic_data_converter
+        data_converter=data_converter(),
+        runtime=runtime,
+        interceptors=client_interceptors(args.otel_tracing),
     )
     print("✅ Connected to Temporal Cloud")
+    print(f"📈 Serving metrics at http://{args.metrics_address}/metrics")
 
-    worker = Worker(
-        client,
-        task_queue="financial-assistant-task-queue",
-        workflows=[
-            FinancialAssistantWorkflow,
-        ],
-        activities=[
-            budget_agent_activity,
-            invoke_bedrock_model,
-            financial_analysis_activity,
-        ],
-    )
-    await worker.run()
+    with ExitStack() as stack:
+        workers = build_workers(client, args, stack)
+        print(
+            f"Running workers for {', '.join(args.queues)} "
+            f"(agent: {args.agent_concurrency}, llm-format: {args.llm_format_concurrency}, "
+            f"market-data: {args.market_data_concurrency}, "
+            f"{'resource-based tuner' if args.resource_tuner else 'fixed slots'})"
+        )
+        # Expired charts and claim-checked payloads are deleted while the workers run
+        cleanup = asyncio.create_task(expire_blobs())
+        try:
+            await asyncio.gather(*(worker.run() for worker in workers))
+        finally:
+            cleanup.cancel()
 
 
 if __name__ == "__main__":